@@ -0,0 +1,151 @@
+from bisect import bisect_left, insort
+from enum import Enum
+from heapq import merge
+from enumtypes import EthernetSpeed
+from partcharacteristics import EthernetCable
+
+# Speed tiers, slowest first
+_SPEED_TIERS = {speed: tier for tier, speed in enumerate(EthernetSpeed)}
+
+_INDEXED_ATTRIBUTES = frozenset(("alpha_type", "beta_type", "speed", "length", "quantity"))
+
+def _entryLength(entry):
+    return entry[0]
+
+def connectorPair(first, second):
+    """
+    Get the unordered key of a pair of connectors, so a cable matches whichever way round it is used.
+
+    Args:
+        first: A connector gender: an EthernetAlphaType or EthernetBetaType member, or "male"/"female".
+        second: The other connector gender.
+
+    Returns:
+        tuple: The two genders as lowercase strings, in sorted order.
+
+    Raises:
+        ValueError: If a connector is not "male" or "female".
+    """
+    genders = []
+    for connector in (first, second):
+        gender = connector.value if isinstance(connector, Enum) else str(connector).strip().lower()
+        if gender not in ("male", "female"):
+            raise ValueError(f"Invalid connector '{connector}'.")
+        genders.append(gender)
+    return tuple(sorted(genders))
+
+class CableIndex:
+    """
+    An index of the in-stock Ethernet cables by connector pair and speed tier, for compatibility queries.
+
+    Each bucket holds the (length, sku) pairs of the in-stock cables with one unordered connector pair and one
+    speed, sorted by length. A query for a connector pair, a minimum speed and a minimum length bisects the
+    bucket of each adequate speed tier and merges them, so it takes O(log n + k) time for k results. The index
+    is an inventory listener: adds, deletes and changes of the connectors, speed, length or quantity (including
+    addInventory) move a cable between buckets as they happen, and cables out of stock are left out.
+
+    Attributes:
+        inventoryManager (InventoryManager): The indexed inventory.
+    """
+
+    def __init__(self, inventoryManager):
+        """
+        Initializes a new instance of the CableIndex class.
+
+        Args:
+            inventoryManager (InventoryManager): The inventory to index; call attach to build the index.
+        """
+        self.inventoryManager = inventoryManager
+        self._buckets = {}  # (connector pair, speed tier) -> sorted [(length, sku)]
+        self._entries = {}  # sku -> (bucket key, (length, sku))
+
+    def attach(self):
+        """
+        Index the current inventory and register with the inventory manager as a listener.
+        """
+        for part in self.inventoryManager.inventory.values():
+            if isinstance(part, EthernetCable):
+                self._index(part)
+        self.inventoryManager.addListener(self)
+
+    def detach(self):
+        """
+        Unregister from the inventory manager.
+        """
+        self.inventoryManager.removeListener(self)
+
+    def compatible(self, first, second, minSpeed=None, minLength=0, limit=None):
+        """
+        Find the in-stock cables with a pair of connectors, at least a speed and at least a length.
+
+        Args:
+            first: One connector the cable must have: an EthernetAlphaType or EthernetBetaType member, or
+                "male"/"female". (A male port takes a female connector.)
+            second: The connector the cable must have at its other end.
+            minSpeed (EthernetSpeed): The slowest acceptable speed, or None for any speed.
+            minLength (float): The shortest acceptable length.
+            limit (int): The maximum number of cables to return, or None for all of them.
+
+        Returns:
+            list: The matching cables, shortest first (ties by SKU).
+
+        Raises:
+            ValueError: If a connector or the speed is invalid.
+        """
+        pair = connectorPair(first, second)
+        if minSpeed is None:
+            lowest = 0
+        elif minSpeed in _SPEED_TIERS:
+            lowest = _SPEED_TIERS[minSpeed]
+        else:
+            raise ValueError("Invalid ethernet speed.")
+        runs = []
+        for tier in range(lowest, len(_SPEED_TIERS)):
+            entries = self._buckets.get((pair, tier))
+            if entries:
+                start = bisect_left(entries, minLength, key=_entryLength)
+                runs.append(entries[start:start + limit] if limit is not None else entries[start:])
+        inventory = self.inventoryManager.inventory
+        matches = runs[0] if len(runs) == 1 else merge(*runs)
+        results = []
+        for _, sku in matches:
+            if limit is not None and len(results) == limit:
+                break
+            results.append(inventory[sku])
+        return results
+
+    def __call__(self, event, part, name, old, new):
+        """
+        Inventory listener that moves cables between buckets.
+        """
+        if not isinstance(part, EthernetCable):
+            return
+        if event == "delete":
+            self._unindex(part.sku)
+        elif event == "add" or (name in _INDEXED_ATTRIBUTES and old != new):
+            self._index(part)
+
+    def _index(self, part):
+        """
+        Put a cable in the bucket matching its current attributes, or leave it out if it is out of stock.
+        """
+        sku = part.sku
+        self._unindex(sku)
+        if part.quantity <= 0:
+            return
+        key = (connectorPair(part.alpha_type, part.beta_type), _SPEED_TIERS[part.speed])
+        entry = (part.length, sku)
+        insort(self._buckets.setdefault(key, []), entry)
+        self._entries[sku] = (key, entry)
+
+    def _unindex(self, sku):
+        """
+        Remove a cable from its bucket, if it is in one.
+        """
+        indexed = self._entries.pop(sku, None)
+        if indexed is not None:
+            key, entry = indexed
+            entries = self._buckets[key]
+            del entries[bisect_left(entries, entry)]
+            if not entries:
+                del self._buckets[key]
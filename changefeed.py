@@ -0,0 +1,175 @@
+import threading
+import time
+from bisect import bisect_right
+from partcharacteristics import Part
+
+def _entrySeq(entry):
+    return entry[0]
+
+class ChangeFeed:
+    """
+    A sequenced log of inventory changes that downstream replicas and caches can pull deltas from.
+
+    Every add, attribute change (including quantity changes from addInventory) and delete is given the next
+    sequence number. Deletes are kept as tombstones. The log keeps only the latest change of each SKU, so
+    changesSince returns at most one change per SKU however often it changed: the part as it is now, or None
+    if it was deleted.
+
+    Retention is bounded by maxEntries and/or retention seconds. Dropping old changes advances the horizon;
+    a consumer whose cursor is older than the horizon has missed changes and must resynchronize from a full
+    export (e.g., inventoryio.exportParts) before continuing from lastSeq.
+
+    Attributes:
+        inventoryManager (InventoryManager): The inventory whose changes are logged.
+        maxEntries (int): The maximum number of SKUs with a retained change, or None for no limit.
+        retention (float): The number of seconds a change is retained, or None for no limit.
+        compactionRatio (float): How many superseded log entries are tolerated per retained change before the
+            log is compacted.
+    """
+
+    def __init__(self, inventoryManager, maxEntries=None, retention=None, compactionRatio=2.0):
+        """
+        Initializes a new instance of the ChangeFeed class.
+
+        Args:
+            inventoryManager (InventoryManager): The inventory to log; call attach to start logging it.
+            maxEntries (int): The maximum number of SKUs with a retained change, or None for no limit.
+            retention (float): The number of seconds a change is retained, or None for no limit.
+            compactionRatio (float): How many superseded log entries are tolerated per retained change.
+        """
+        self.inventoryManager = inventoryManager
+        self.maxEntries = maxEntries
+        self.retention = retention
+        self.compactionRatio = compactionRatio
+        self._seq = 0
+        self._horizon = 0
+        self._log = []  # (seq, sku, monotonic time), in sequence order, from _head on
+        self._head = 0
+        self._latest = {}  # sku -> (seq, part or None)
+        self._lock = threading.Lock()
+
+    def attach(self, timeIndex=True):
+        """
+        Register with the inventory manager as a listener.
+
+        Args:
+            timeIndex (bool): Whether to create a sorted index over last_updated for updatedSince.
+        """
+        if timeIndex:
+            self.inventoryManager.createSortedIndex(Part, "last_updated")
+        self.inventoryManager.addListener(self)
+
+    def detach(self):
+        """
+        Unregister from the inventory manager. The time index is left in place.
+        """
+        self.inventoryManager.removeListener(self)
+
+    @property
+    def lastSeq(self):
+        """
+        int: The sequence number of the most recent change; a consumer that has just exported the whole
+        inventory continues from here.
+        """
+        return self._seq
+
+    @property
+    def horizon(self):
+        """
+        int: The oldest cursor changesSince still accepts.
+        """
+        return self._horizon
+
+    def changesSince(self, seq, limit=None):
+        """
+        Get the changes made after a cursor.
+
+        Args:
+            seq (int): The cursor: 0 or a cursor returned by an earlier call, or lastSeq.
+            limit (int): The maximum number of changes to return, or None for all of them.
+
+        Returns:
+            tuple: (changes, cursor), where changes lists (seq, sku, part) tuples in sequence order, with part
+            None for a deleted SKU, and cursor is the value to pass to the next call.
+
+        Raises:
+            ValueError: If the cursor is older than the retained history.
+        """
+        with self._lock:
+            if seq < self._horizon:
+                raise ValueError("Error, Change feed cursor is older than the retained history.")
+            log = self._log
+            latest = self._latest
+            changes = []
+            cursor = seq
+            for position in range(bisect_right(log, seq, lo=self._head, key=_entrySeq), len(log)):
+                entry_seq, sku, _ = log[position]
+                current = latest.get(sku)
+                if current is None or current[0] != entry_seq:
+                    continue  # Superseded by a later change of the same SKU
+                if limit is not None and len(changes) >= limit:
+                    return changes, cursor
+                changes.append((entry_seq, sku, current[1]))
+                cursor = entry_seq
+            return changes, self._seq
+
+    def updatedSince(self, timestamp):
+        """
+        Get the parts whose last_updated is at or after a timestamp, using the time index.
+
+        Args:
+            timestamp (datetime): The earliest last updated timestamp.
+
+        Returns:
+            list: The parts, oldest update first.
+        """
+        return self.inventoryManager.search(Part, last_updated__gte=timestamp)
+
+    def compact(self):
+        """
+        Drop superseded entries from the log.
+        """
+        with self._lock:
+            self._compact()
+
+    def __call__(self, event, part, name, old, new):
+        """
+        Inventory listener that logs each change.
+        """
+        if event == "update" and old == new:
+            return
+        with self._lock:
+            self._seq += 1
+            sku = part.sku
+            self._latest[sku] = (self._seq, None if event == "delete" else part)
+            self._log.append((self._seq, sku, time.monotonic()))
+            self._trim()
+
+    def _trim(self):
+        """
+        Enforce the retention limits and compact the log when superseded entries pile up.
+        """
+        log = self._log
+        latest = self._latest
+        expiry = time.monotonic() - self.retention if self.retention is not None else None
+        while self._head < len(log):
+            entry_seq, sku, changed = log[self._head]
+            current = latest.get(sku)
+            live = current is not None and current[0] == entry_seq
+            if live and not ((self.maxEntries is not None and len(latest) > self.maxEntries) or
+                             (expiry is not None and changed < expiry)):
+                break
+            if live:
+                del latest[sku]
+                self._horizon = entry_seq
+            self._head += 1
+        if len(log) - self._head > self.compactionRatio * len(latest) + 1024:
+            self._compact()
+
+    def _compact(self):
+        """
+        Rebuild the log from the latest change of each SKU.
+        """
+        latest = self._latest
+        self._log = [entry for entry in self._log[self._head:] if latest.get(entry[1], (None,))[0] == entry[0]]
+        self._head = 0
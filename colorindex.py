@@ -0,0 +1,190 @@
+import heapq
+from partcharacteristics import DisplayCable, parseColor
+
+# Each channel is split into 2 ** (8 - _CELL_BITS) slices, so the grid has 16 x 16 x 16 cells of 16 x 16 x 16 colors
+_CELL_BITS = 4
+_CELL_SIZE = 1 << _CELL_BITS
+_GRID_SIZE = 256 >> _CELL_BITS
+
+# Below this many indexed cables a query checks them all instead of walking the grid
+_SCAN_LIMIT = 256
+
+_INDEXED_ATTRIBUTES = frozenset(("cable_type", "color"))
+
+def _channels(rgb):
+    return rgb >> 16, (rgb >> 8) & 0xFF, rgb & 0xFF
+
+def _cell(rgb):
+    red, green, blue = _channels(rgb)
+    return red >> _CELL_BITS, green >> _CELL_BITS, blue >> _CELL_BITS
+
+def _shell(x, y, z, radius):
+    """
+    Yield the grid cells whose largest coordinate offset from (x, y, z) is exactly radius.
+    """
+    for dx in range(-radius, radius + 1):
+        cx = x + dx
+        if not 0 <= cx < _GRID_SIZE:
+            continue
+        for dy in range(-radius, radius + 1):
+            cy = y + dy
+            if not 0 <= cy < _GRID_SIZE:
+                continue
+            if abs(dx) == radius or abs(dy) == radius:
+                offsets = range(-radius, radius + 1)
+            else:
+                offsets = (-radius, radius)
+            for dz in offsets:
+                cz = z + dz
+                if 0 <= cz < _GRID_SIZE:
+                    yield cx, cy, cz
+
+def colorDistance(first, second):
+    """
+    Get the squared Euclidean distance between two packed RGB colors.
+
+    Args:
+        first (int): A packed 0xRRGGBB color.
+        second (int): Another packed color.
+
+    Returns:
+        int: The squared distance; 0 for the same color.
+    """
+    red, green, blue = _channels(first)
+    other_red, other_green, other_blue = _channels(second)
+    return (red - other_red) ** 2 + (green - other_green) ** 2 + (blue - other_blue) ** 2
+
+class ColorIndex:
+    """
+    A grid index of the display cables by color, one grid per DisplayType, for nearest-color queries.
+
+    RGB space is divided into cubic cells. A query visits the cells around the query color in shells of growing
+    radius and stops as soon as no unvisited cell can hold a closer cable than the k found so far, so it only
+    looks at cables with nearby colors. The index is an inventory listener: adds, deletes and changes of a
+    cable's type or color move it between cells as they happen. Stock and length are checked when querying, so
+    quantity changes cost nothing.
+
+    Attributes:
+        inventoryManager (InventoryManager): The indexed inventory.
+    """
+
+    def __init__(self, inventoryManager):
+        """
+        Initializes a new instance of the ColorIndex class.
+
+        Args:
+            inventoryManager (InventoryManager): The inventory to index; call attach to build the index.
+        """
+        self.inventoryManager = inventoryManager
+        self._grids = {}  # DisplayType -> {cell: {sku: part}}
+        self._counts = {}  # DisplayType -> number of indexed cables
+        self._entries = {}  # sku -> (DisplayType, cell)
+
+    def attach(self):
+        """
+        Index the current inventory and register with the inventory manager as a listener.
+        """
+        for part in self.inventoryManager.inventory.values():
+            if isinstance(part, DisplayCable):
+                self._index(part)
+        self.inventoryManager.addListener(self)
+
+    def detach(self):
+        """
+        Unregister from the inventory manager.
+        """
+        self.inventoryManager.removeListener(self)
+
+    def nearest(self, color, k=1, displayType=None, minLength=None, inStock=True):
+        """
+        Find the display cables whose colors are closest to a color.
+
+        Args:
+            color: The color, as "#RGB"/"#RRGGBB" or a packed 0xRRGGBB integer.
+            k (int): The number of cables to return.
+            displayType (DisplayType): Only consider cables of this type; None considers every type.
+            minLength (float): Only consider cables at least this long; None for any length.
+            inStock (bool): Only consider cables with a positive quantity.
+
+        Returns:
+            list: Up to k cables, closest color first (ties by SKU).
+
+        Raises:
+            ValueError: If the color is not in hexadecimal format.
+        """
+        rgb = color if isinstance(color, int) and not isinstance(color, bool) else parseColor(color)
+        if not 0 <= rgb <= 0xFFFFFF:
+            raise ValueError("Invalid color format")
+        if k <= 0:
+            return []
+        types = [displayType] if displayType is not None else list(self._grids)
+        grids = [self._grids[kind] for kind in types if kind in self._grids]
+        best = []  # Max-heap of the k closest so far, as (-distance, -sku, part)
+
+        def consider(cables):
+            for sku, part in cables.items():
+                if inStock and part.quantity <= 0:
+                    continue
+                if minLength is not None and part.length < minLength:
+                    continue
+                entry = (-colorDistance(rgb, part.rgb), -sku, part)
+                if len(best) < k:
+                    heapq.heappush(best, entry)
+                elif entry[:2] > best[0][:2]:
+                    heapq.heapreplace(best, entry)
+
+        if sum(self._counts.get(kind, 0) for kind in types) <= _SCAN_LIMIT:
+            for grid in grids:
+                for cables in grid.values():
+                    consider(cables)
+        else:
+            x, y, z = _cell(rgb)
+            for radius in range(_GRID_SIZE):
+                # Every cell at this radius or beyond is at least radius * _CELL_SIZE - (_CELL_SIZE - 1) away
+                bound = radius * _CELL_SIZE - (_CELL_SIZE - 1)
+                if len(best) == k and bound > 0 and -best[0][0] < bound * bound:
+                    break
+                for cell in _shell(x, y, z, radius):
+                    for grid in grids:
+                        cables = grid.get(cell)
+                        if cables:
+                            consider(cables)
+        best.sort(reverse=True)
+        return [part for _, _, part in best]
+
+    def __call__(self, event, part, name, old, new):
+        """
+        Inventory listener that moves cables between cells.
+        """
+        if not isinstance(part, DisplayCable):
+            return
+        if event == "delete":
+            self._unindex(part.sku)
+        elif event == "add" or (name in _INDEXED_ATTRIBUTES and old != new):
+            self._index(part)
+
+    def _index(self, part):
+        """
+        Put a cable in the cell of its current type and color.
+        """
+        sku = part.sku
+        self._unindex(sku)
+        kind = part.cable_type
+        cell = _cell(part.rgb)
+        self._grids.setdefault(kind, {}).setdefault(cell, {})[sku] = part
+        self._counts[kind] = self._counts.get(kind, 0) + 1
+        self._entries[sku] = (kind, cell)
+
+    def _unindex(self, sku):
+        """
+        Remove a cable from its cell, if it is in one.
+        """
+        indexed = self._entries.pop(sku, None)
+        if indexed is not None:
+            kind, cell = indexed
+            grid = self._grids[kind]
+            cables = grid[cell]
+            del cables[sku]
+            if not cables:
+                del grid[cell]
+            self._counts[kind] -= 1
@@ -0,0 +1,288 @@
+import threading
+from contextlib import contextmanager
+from inventorymanager import InventoryManager
+from partcharacteristics import Part
+from resistorsolver import MAX_RESISTORS
+
+class ReadWriteLock:
+    """
+    A lock that lets any number of readers in at once, or a single writer.
+
+    Waiting writers take priority over new readers so a steady stream of scans cannot starve them. The write side
+    is reentrant, and a thread holding the write lock may also read.
+    """
+
+    def __init__(self):
+        """
+        Initializes a new instance of the ReadWriteLock class.
+        """
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = None
+        self._writerDepth = 0
+        self._waitingWriters = 0
+
+    @contextmanager
+    def reading(self):
+        """
+        Hold the lock as a reader for the duration of a with block.
+        """
+        condition = self._condition
+        with condition:
+            if self._writer == threading.get_ident():
+                owned = True
+            else:
+                owned = False
+                while self._writer is not None or self._waitingWriters:
+                    condition.wait()
+                self._readers += 1
+        try:
+            yield
+        finally:
+            if not owned:
+                with condition:
+                    self._readers -= 1
+                    if not self._readers:
+                        condition.notify_all()
+
+    @contextmanager
+    def writing(self):
+        """
+        Hold the lock as the single writer for the duration of a with block.
+        """
+        condition = self._condition
+        me = threading.get_ident()
+        with condition:
+            if self._writer == me:
+                self._writerDepth += 1
+            else:
+                self._waitingWriters += 1
+                while self._writer is not None or self._readers:
+                    condition.wait()
+                self._waitingWriters -= 1
+                self._writer = me
+                self._writerDepth = 1
+        try:
+            yield
+        finally:
+            with condition:
+                self._writerDepth -= 1
+                if not self._writerDepth:
+                    self._writer = None
+                    condition.notify_all()
+
+class ConcurrentInventoryManager(InventoryManager):
+    """
+    An InventoryManager that can be shared between threads.
+
+    Quantity updates lock only the stripe of the SKU being updated, so addInventory calls on different SKUs run
+    without contending on a shared lock. Structural changes (adding and deleting parts, index management) take
+    a reader/writer lock as the writer, and search and getInventory take it as readers, so scans never see the
+    inventory change size underneath them and do not block each other.
+
+    When indexes or listeners are registered, each attribute change also takes the write lock while the
+    indexes and listeners are updated, since those structures are shared by every SKU.
+
+    Attributes:
+        stripeCount (int): The number of SKU lock stripes.
+    """
+
+    def __init__(self, stripeCount=64):
+        """
+        Initializes a new instance of the ConcurrentInventoryManager class.
+
+        Args:
+            stripeCount (int): The number of SKU lock stripes.
+        """
+        super().__init__()
+        self.stripeCount = stripeCount
+        self._stripes = [threading.Lock() for _ in range(stripeCount)]
+        self._lock = ReadWriteLock()
+
+    def stripes(self):
+        """
+        Get the SKU lock stripes, so other components (e.g., StockLedger) can lock SKUs consistently with this
+        manager. The stripe of a SKU is stripes()[hash(sku) % stripeCount].
+
+        Returns:
+            list: The stripe locks; acquire several in list order to avoid deadlocks.
+        """
+        return self._stripes
+
+    def _stripe(self, sku):
+        """
+        Get the lock stripe guarding a SKU.
+        """
+        return self._stripes[hash(sku) % self.stripeCount]
+
+    @contextmanager
+    def _allStripes(self):
+        """
+        Hold every stripe lock, always acquired in the same order, for batch operations.
+        """
+        for stripe in self._stripes:
+            stripe.acquire()
+        try:
+            yield
+        finally:
+            for stripe in reversed(self._stripes):
+                stripe.release()
+
+    def addPart(self, part):
+        """
+        Add a part to the inventory, holding its SKU stripe and the write lock.
+        """
+        with self._stripe(part.sku), self._lock.writing():
+            super().addPart(part)
+
+    def addParts(self, parts):
+        """
+        Add many parts to the inventory, holding every stripe and the write lock.
+        """
+        with self._allStripes(), self._lock.writing():
+            return super().addParts(parts)
+
+    def addInventory(self, sku, quantity):
+        """
+        Add inventory for a specific part, holding only its SKU stripe.
+        """
+        with self._stripe(sku):
+            super().addInventory(sku, quantity)
+
+    def addInventoryBatch(self, items):
+        """
+        Add inventory for many parts, holding every stripe.
+        """
+        with self._allStripes():
+            return super().addInventoryBatch(items)
+
+    def deletePart(self, sku):
+        """
+        Delete a part from the inventory, holding its SKU stripe and the write lock.
+        """
+        with self._stripe(sku), self._lock.writing():
+            super().deletePart(sku)
+
+    def deleteParts(self, skus):
+        """
+        Delete many parts from the inventory, holding every stripe and the write lock.
+        """
+        with self._allStripes(), self._lock.writing():
+            return super().deleteParts(skus)
+
+    def getInventory(self):
+        """
+        Get a snapshot of the entire inventory.
+
+        Unlike InventoryManager.getInventory, this returns a copy, so it can be iterated while other threads
+        change the inventory.
+
+        Returns:
+            dict: A dictionary mapping SKUs to the parts in the inventory.
+        """
+        with self._lock.reading():
+            return dict(self.inventory)
+
+    def listParts(self, orderBy="sku", part_class=None, after=None, limit=100, descending=False):
+        """
+        Get one page of the inventory in a stable order, holding the read lock.
+        """
+        if (Part, orderBy) not in self.sortedIndexes:
+            with self._lock.writing():  # Create the sorted index before reading it
+                self._listingIndex(part_class, orderBy)
+        with self._lock.reading():
+            return super().listParts(orderBy, part_class, after, limit, descending)
+
+    def compatibleCables(self, first, second, minSpeed=None, minLength=0, limit=None):
+        """
+        Find compatible in-stock Ethernet cables, holding the read lock.
+        """
+        if self.cableIndex is None:
+            with self._lock.writing():  # Build the index before reading it
+                self._buildCableIndex()
+        with self._lock.reading():
+            return super().compatibleCables(first, second, minSpeed, minLength, limit)
+
+    def nearestColors(self, color, k=1, displayType=None, minLength=None, inStock=True):
+        """
+        Find the display cables closest to a color, holding the read lock.
+        """
+        if self.colorIndex is None:
+            with self._lock.writing():  # Build the index before reading it
+                self._buildColorIndex()
+        with self._lock.reading():
+            return super().nearestColors(color, k, displayType, minLength, inStock)
+
+    def solveResistance(self, target, tolerance=1, maxResistors=MAX_RESISTORS, limit=5):
+        """
+        Find the resistor networks closest to a target resistance. The solver guards its caches with its own lock
+        and reads the resistors from a getInventory snapshot, so only building the solver holds the write lock.
+        """
+        if self.resistorSolver is None:
+            with self._lock.writing():
+                self._buildResistorSolver()
+        return super().solveResistance(target, tolerance, maxResistors, limit)
+
+    def planCuts(self, pieces, gauge=None, solderType=None, kerf=0, exact=False, timeBudget=1.0):
+        """
+        Plan cutting pieces out of stocked spools, holding the read lock.
+        """
+        with self._lock.reading():
+            return super().planCuts(pieces, gauge, solderType, kerf, exact, timeBudget)
+
+    def search(self, part_class, **kwargs):
+        """
+        Search for parts in the inventory, holding the read lock.
+        """
+        with self._lock.reading():
+            return super().search(part_class, **kwargs)
+
+    def createIndex(self, part_class, attribute):
+        """
+        Create a secondary hash index, holding the write lock.
+        """
+        with self._lock.writing():
+            super().createIndex(part_class, attribute)
+
+    def dropIndex(self, part_class, attribute):
+        """
+        Remove a secondary index, holding the write lock.
+        """
+        with self._lock.writing():
+            super().dropIndex(part_class, attribute)
+
+    def createSortedIndex(self, part_class, attribute):
+        """
+        Create a sorted index, holding the write lock.
+        """
+        with self._lock.writing():
+            super().createSortedIndex(part_class, attribute)
+
+    def dropSortedIndex(self, part_class, attribute):
+        """
+        Remove a sorted index, holding the write lock.
+        """
+        with self._lock.writing():
+            super().dropSortedIndex(part_class, attribute)
+
+    def addListener(self, listener):
+        """
+        Register an inventory listener, holding the write lock.
+        """
+        with self._lock.writing():
+            super().addListener(listener)
+
+    def removeListener(self, listener):
+        """
+        Unregister an inventory listener, holding the write lock.
+        """
+        with self._lock.writing():
+            super().removeListener(listener)
+
+    def _onPartChanged(self, part, name, old, new):
+        """
+        Update indexes and listeners for an attribute change under the write lock.
+        """
+        if self.indexes or self.sortedIndexes or self.listeners:
+            with self._lock.writing():
+                super()._onPartChanged(part, name, old, new)
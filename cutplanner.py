@@ -0,0 +1,282 @@
+import sys
+import time
+from collections import Counter
+from bisect import bisect_left, insort
+
+# Lengths within this of each other are treated as equal, so pieces that exactly fill a spool still fit
+_EPSILON = 1e-9
+
+class _Timeout(Exception):
+    pass
+
+class SpoolCut:
+    """
+    The pieces cut from one spool.
+
+    Attributes:
+        sku (int): The SKU of the spool's part.
+        length (float): The length of the spool.
+        pieces (list): The lengths of the pieces cut from it, longest first.
+        leftover (float): The length left on the spool after the cuts (and kerfs).
+    """
+
+    def __init__(self, sku, length, pieces, leftover):
+        """
+        Initializes a new instance of the SpoolCut class.
+
+        Args:
+            sku (int): The SKU of the spool's part.
+            length (float): The length of the spool.
+            pieces (list): The lengths of the pieces cut from it.
+            leftover (float): The length left on the spool.
+        """
+        self.sku = sku
+        self.length = length
+        self.pieces = pieces
+        self.leftover = leftover
+
+    def __repr__(self):
+        return f"SpoolCut(sku={self.sku}, length={self.length:g}, pieces={len(self.pieces)}, leftover={self.leftover:g})"
+
+class CutPlan:
+    """
+    A plan for cutting pieces out of stocked spools.
+
+    Attributes:
+        spools (list): A SpoolCut for each spool opened, fullest first.
+        unplaced (list): The lengths of the pieces that no stocked spool had room for, longest first.
+        waste (float): The total length left on the opened spools.
+        optimal (bool): Whether the plan was proven to waste as little as possible (exact mode only).
+    """
+
+    def __init__(self, spools, unplaced, optimal=False):
+        """
+        Initializes a new instance of the CutPlan class.
+
+        Args:
+            spools (list): The SpoolCut of each opened spool.
+            unplaced (list): The lengths of the pieces that were not placed.
+            optimal (bool): Whether the plan is proven optimal.
+        """
+        self.spools = spools
+        self.unplaced = unplaced
+        self.waste = sum(spool.leftover for spool in spools)
+        self.optimal = optimal
+
+    def __repr__(self):
+        return f"CutPlan(spools={len(self.spools)}, waste={self.waste:g}, unplaced={len(self.unplaced)}, optimal={self.optimal})"
+
+class _Stock:
+    """
+    The available spools by capacity (length plus kerf), with the parts each capacity comes from.
+    """
+
+    def __init__(self, parts, kerf):
+        self.parts = {}  # capacity -> [part], by SKU
+        for part in sorted(parts, key=lambda part: part.sku):
+            if part.quantity > 0 and part.length > 0:
+                self.parts.setdefault(part.length + kerf, []).append(part)
+        self.capacities = sorted(self.parts)
+        self.counts = {capacity: sum(part.quantity for part in parts) for capacity, parts in self.parts.items()}
+
+def _parsePieces(pieces):
+    """
+    Get the requested piece lengths from a list of lengths or a {length: count} dict.
+    """
+    lengths = []
+    for length, count in (pieces.items() if isinstance(pieces, dict) else ((length, 1) for length in pieces)):
+        if not length > 0 or count < 0:
+            raise ValueError("Invalid piece length or count.")
+        lengths.extend([length] * count)
+    return lengths
+
+def _pack(sizes, stock, openLongest):
+    """
+    Best fit decreasing: put each piece (longest first) on the open spool it leaves the least room on, opening a
+    spool when none has room.
+
+    Args:
+        sizes (list): The piece sizes (length plus kerf), longest first.
+        stock (_Stock): The available spools.
+        openLongest (bool): Open the longest available spool, instead of the shortest that fits the piece.
+
+    Returns:
+        tuple: The (capacity, [sizes]) bins and the sizes that did not fit.
+    """
+    counts = dict(stock.counts)
+    capacities = [capacity for capacity in stock.capacities if counts[capacity]]
+    bins = []
+    spaces = []  # Sorted (room left, bin index) of the open spools
+    unplaced = []
+    for size in sizes:
+        position = bisect_left(spaces, (size - _EPSILON,))
+        if position < len(spaces):
+            room, index = spaces.pop(position)
+        else:
+            if not capacities or capacities[-1] < size - _EPSILON:
+                unplaced.append(size)
+                continue
+            capacity = capacities[-1] if openLongest else capacities[bisect_left(capacities, size - _EPSILON)]
+            counts[capacity] -= 1
+            if not counts[capacity]:
+                capacities.remove(capacity)
+            room, index = capacity, len(bins)
+            bins.append((capacity, []))
+        bins[index][1].append(size)
+        insort(spaces, (room - size, index))
+    return bins, unplaced
+
+def _downsize(bins, stock):
+    """
+    Move the contents of each bin, fullest first, to the shortest available spool they fit on.
+    """
+    counts = dict(stock.counts)
+    capacities = list(stock.capacities)
+    resized = []
+    for _, sizes in sorted(bins, key=lambda bin: -sum(bin[1])):
+        capacity = capacities[bisect_left(capacities, sum(sizes) - _EPSILON)]
+        counts[capacity] -= 1
+        if not counts[capacity]:
+            capacities.remove(capacity)
+        resized.append((capacity, sizes))
+    return resized
+
+def _waste(bins):
+    return sum(capacity - sum(sizes) for capacity, sizes in bins)
+
+class _Search:
+    """
+    An exact branch and bound search by bin completion: the longest remaining piece always starts the next spool,
+    which is then filled with a maximal set of the remaining pieces. Spools of the same capacity and pieces of
+    the same size are interchangeable, so each is only branched on once.
+    """
+
+    def __init__(self, sizes, stock, best, deadline):
+        counts = Counter(sizes)
+        self.sizes = sorted(counts, reverse=True)
+        self.remaining = [counts[size] for size in self.sizes]
+        self.counts = dict(stock.counts)
+        self.capacities = stock.capacities
+        self.best = best  # The least total capacity opened by a complete plan so far
+        self.bestBins = None
+        self.deadline = deadline
+        self.nodes = 0
+        self.bins = []
+
+    def search(self, opened, left):
+        """
+        Place the remaining pieces, whose sizes add up to left, after opening spools of total capacity opened.
+        """
+        if left <= _EPSILON:
+            if opened < self.best - _EPSILON:
+                self.best = opened
+                self.bestBins = list(self.bins)
+            return
+        if opened + left >= self.best - _EPSILON:
+            return
+        first = next(index for index, count in enumerate(self.remaining) if count)
+        size = self.sizes[first]
+        self.remaining[first] -= 1
+        for capacity in self.capacities[bisect_left(self.capacities, size - _EPSILON):]:
+            if not self.counts[capacity]:
+                continue
+            if opened + capacity >= self.best - _EPSILON:
+                break  # Longer spools only cost more
+            self.counts[capacity] -= 1
+            self._complete(first, capacity, capacity - size, [size], opened + capacity, left - size)
+            self.counts[capacity] += 1
+        self.remaining[first] += 1
+
+    def _complete(self, index, capacity, room, sizes, opened, left):
+        """
+        Fill the room left on the newest spool with pieces of the sizes from index on, then search the rest.
+        """
+        self.nodes += 1
+        if not self.nodes & 1023 and time.perf_counter() > self.deadline:
+            raise _Timeout()
+        if opened + left - (room if index < len(self.sizes) else 0) >= self.best - _EPSILON:
+            return
+        if index == len(self.sizes):
+            # A fill that still has room for a remaining piece is never better than the fill with it
+            if any(count and size <= room + _EPSILON for size, count in zip(self.sizes, self.remaining)):
+                return
+            self.bins.append((capacity, sizes))
+            self.search(opened, left)
+            self.bins.pop()
+            return
+        size = self.sizes[index]
+        most = min(self.remaining[index], int((room + _EPSILON) // size))
+        for count in range(most, -1, -1):
+            self.remaining[index] -= count
+            self._complete(index + 1, capacity, room - count * size, sizes + [size] * count, opened, left - count * size)
+            self.remaining[index] += count
+
+def optimizeCuts(parts, pieces, kerf=0, exact=False, timeBudget=1.0):
+    """
+    Plan cutting pieces out of stocked spools with as little waste as possible.
+
+    Each unit of a part's quantity is a spool of the part's length, and every cut also uses up kerf. Fast mode
+    packs the pieces longest first with best fit decreasing, once opening the longest spool whenever a new one is
+    needed and once the shortest that fits, moves each packed spool's contents to the shortest spool they fit on
+    and keeps the better plan; it takes O(n log n) for n pieces, well under a second for thousands. Exact mode
+    starts from that plan and runs a branch and bound search for the least total length of opened spools until
+    it is proven optimal or the time budget runs out, keeping the best plan found.
+
+    Args:
+        parts (list): The spool parts (e.g., Wire of one gauge); parts out of stock are ignored.
+        pieces: The piece lengths required, as a list of lengths or a {length: count} dict.
+        kerf (float): The length lost to each cut.
+        exact (bool): Search for an optimal plan after the heuristics.
+        timeBudget (float): The most seconds the exact search may take.
+
+    Returns:
+        CutPlan: The plan. Pieces no spool has room for (too long, or the stock ran out) are left unplaced.
+
+    Raises:
+        ValueError: If a piece length or count, or the kerf, is invalid.
+    """
+    if kerf < 0:
+        raise ValueError("Invalid kerf.")
+    deadline = time.perf_counter() + timeBudget
+    sizes = sorted((length + kerf for length in _parsePieces(pieces)), reverse=True)
+    stock = _Stock(parts, kerf)
+    plans = []
+    for openLongest in (True, False):
+        bins, unplaced = _pack(sizes, stock, openLongest)
+        bins = _downsize(bins, stock)
+        plans.append((len(unplaced), _waste(bins), len(bins), bins, unplaced))
+    _, _, _, bins, unplaced = min(plans, key=lambda plan: plan[:3])
+    optimal = False
+    if exact and bins:
+        # Pieces that fit no spool at all are left out; the others are all placed if the stock allows
+        placeable = [size for size in sizes if size <= stock.capacities[-1] + _EPSILON]
+        complete = len(placeable) == len(sizes) - len(unplaced)
+        search = _Search(placeable, stock, sum(capacity for capacity, _ in bins) if complete else float("inf"), deadline)
+        depth = len(bins) * (len(search.sizes) + 2)  # Frames per spool: one search and one per size considered
+        if depth < sys.getrecursionlimit() - 100:
+            try:
+                search.search(0, sum(placeable))
+                optimal = complete or search.bestBins is not None
+            except _Timeout:
+                pass
+            if search.bestBins is not None:
+                bins = search.bestBins
+                unplaced = [size for size in sizes if size > stock.capacities[-1] + _EPSILON]
+    return _plan(bins, unplaced, stock, kerf, optimal)
+
+def _plan(bins, unplaced, stock, kerf, optimal):
+    """
+    Turn (capacity, [sizes]) bins into a CutPlan, taking each capacity's spools from its parts in SKU order.
+    """
+    taken = {}
+    spools = []
+    for capacity, sizes in sorted(bins, key=lambda bin: bin[0] - sum(bin[1])):
+        count = taken.get(capacity, 0)
+        taken[capacity] = count + 1
+        for part in stock.parts[capacity]:
+            if count < part.quantity:
+                break
+            count -= part.quantity
+        pieces = sorted((size - kerf for size in sizes), reverse=True)
+        spools.append(SpoolCut(part.sku, part.length, pieces, capacity - sum(sizes)))
+    return CutPlan(spools, [size - kerf for size in unplaced], optimal)
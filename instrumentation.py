@@ -0,0 +1,362 @@
+import functools
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Operations timed by Instrumentation when attached to an inventory manager
+OPERATIONS = ("addPart", "addParts", "addInventory", "addInventoryBatch", "getQuantity", "getInventory", "getPart",
+              "search", "deletePart", "deleteParts")
+
+# Upper bounds of the latency histogram buckets, in seconds
+LATENCY_BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class _OperationStats:
+    """
+    The call counters and latency histogram of one operation.
+    """
+
+    __slots__ = ("calls", "errors", "seconds", "buckets")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+class _ThreadStats:
+    """
+    The metrics recorded by one thread, kept separately so recording needs no lock.
+    """
+
+    __slots__ = ("operations", "scans")
+
+    def __init__(self):
+        self.operations = {}  # operation -> _OperationStats
+        self.scans = {}  # part class name -> [searches, scanned, matched]
+
+class Instrumentation:
+    """
+    Metrics, hooks and an on-demand sampling profiler for an InventoryManager.
+
+    Instrumentation is attached with InventoryManager.enableInstrumentation, which shadows the manager's public
+    operations on that instance with timed wrappers. Managers without instrumentation run the plain methods, so
+    there is no overhead when it is disabled apart from one attribute check per search. Each thread records
+    into its own counters, which are merged when the metrics are read, so recording takes no lock.
+
+    For each operation it counts calls and errors and keeps a latency histogram. For each searched part class it
+    counts searches, parts scanned and parts matched, which shows whether searches are answered by an index or
+    by scanning the whole inventory. Metrics can be read with stats() or exported with exportText() in the
+    Prometheus text exposition format.
+
+    Attributes:
+        inventoryManager (InventoryManager): The instrumented inventory.
+        hooks (list): Callbacks notified after every operation (see addHook).
+    """
+
+    def __init__(self, inventoryManager):
+        """
+        Initializes a new instance of the Instrumentation class.
+
+        Args:
+            inventoryManager (InventoryManager): The inventory to instrument; call attach to start timing it.
+        """
+        self.inventoryManager = inventoryManager
+        self.hooks = []
+        self._local = threading.local()
+        self._threads = []  # Every thread's _ThreadStats, merged when the metrics are read
+        self._lock = threading.Lock()
+        self._profile = {}
+        self._profiler = None
+        self._profilerStop = None
+
+    def attach(self):
+        """
+        Shadow the inventory manager's operations with timed wrappers.
+        """
+        for name in OPERATIONS:
+            method = getattr(self.inventoryManager, name, None)
+            if method is not None:
+                setattr(self.inventoryManager, name, self._wrap(name, method))
+
+    def detach(self):
+        """
+        Remove the timed wrappers and stop the profiler, restoring the manager's own methods.
+        """
+        self.stopProfiler()
+        for name in OPERATIONS:
+            self.inventoryManager.__dict__.pop(name, None)
+
+    def _wrap(self, name, method):
+        """
+        Build a wrapper that times calls to method and records them under name.
+        """
+        record = self.record
+        clock = time.perf_counter
+
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                result = method(*args, **kwargs)
+            except BaseException:
+                record(name, clock() - start, True)
+                raise
+            record(name, clock() - start, False)
+            return result
+        return timed
+
+    def _threadStats(self):
+        """
+        Get the calling thread's metrics, registering them on first use.
+        """
+        try:
+            return self._local.stats
+        except AttributeError:
+            stats = self._local.stats = _ThreadStats()
+            with self._lock:
+                self._threads.append(stats)
+            return stats
+
+    def record(self, operation, seconds, error=False):
+        """
+        Record one call of an operation and notify the hooks.
+
+        Args:
+            operation (str): The operation name.
+            seconds (float): How long the call took.
+            error (bool): Whether the call raised an exception.
+        """
+        operations = self._threadStats().operations
+        stats = operations.get(operation)
+        if stats is None:
+            stats = operations[operation] = _OperationStats()
+        stats.calls += 1
+        stats.seconds += seconds
+        stats.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        if error:
+            stats.errors += 1
+        if self.hooks:
+            for hook in self.hooks:
+                hook(operation, seconds, error)
+
+    def recordScan(self, part_class, scanned, matched):
+        """
+        Record how many parts a search examined and how many of them matched.
+
+        Args:
+            part_class (class): The class searched for.
+            scanned (int): The number of candidate parts examined.
+            matched (int): The number of parts returned.
+        """
+        scans = self._threadStats().scans
+        counts = scans.get(part_class.__name__)
+        if counts is None:
+            counts = scans[part_class.__name__] = [0, 0, 0]
+        counts[0] += 1
+        counts[1] += scanned
+        counts[2] += matched
+
+    def _merged(self):
+        """
+        Merge the metrics of every thread.
+
+        Returns:
+            tuple: ({operation: _OperationStats}, {part class name: [searches, scanned, matched]}).
+        """
+        with self._lock:
+            threads = list(self._threads)
+        operations = {}
+        scans = {}
+        for thread in threads:
+            for name, stats in list(thread.operations.items()):
+                total = operations.get(name)
+                if total is None:
+                    total = operations[name] = _OperationStats()
+                total.calls += stats.calls
+                total.errors += stats.errors
+                total.seconds += stats.seconds
+                total.buckets = [a + b for a, b in zip(total.buckets, stats.buckets)]
+            for name, counts in list(thread.scans.items()):
+                total = scans.setdefault(name, [0, 0, 0])
+                for position in range(3):
+                    total[position] += counts[position]
+        return operations, scans
+
+    @contextmanager
+    def timed(self, operation):
+        """
+        Time a with block and record it as an operation, for layers above the inventory manager (e.g., a
+        command-line or network front end).
+
+        Args:
+            operation (str): The operation name.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.record(operation, time.perf_counter() - start, True)
+            raise
+        self.record(operation, time.perf_counter() - start, False)
+
+    def addHook(self, hook):
+        """
+        Register a callback to be notified after every recorded operation.
+
+        The callback is called as hook(operation, seconds, error) on the thread that made the call, so it should
+        be fast.
+
+        Args:
+            hook (callable): The callback to register.
+        """
+        if hook not in self.hooks:
+            self.hooks.append(hook)
+
+    def removeHook(self, hook):
+        """
+        Unregister a callback previously registered with addHook.
+
+        Args:
+            hook (callable): The callback to remove.
+        """
+        if hook in self.hooks:
+            self.hooks.remove(hook)
+
+    def reset(self):
+        """
+        Clear every counter, histogram and profile sample.
+        """
+        with self._lock:
+            for thread in self._threads:
+                thread.operations.clear()
+                thread.scans.clear()
+            self._profile.clear()
+
+    def stats(self):
+        """
+        Get the recorded metrics.
+
+        Returns:
+            dict: {"operations": {name: {calls, errors, seconds, mean_seconds}},
+            "searches": {class name: {searches, scanned, matched}}}.
+        """
+        merged_operations, merged_scans = self._merged()
+        operations = {name: {"calls": stats.calls, "errors": stats.errors, "seconds": stats.seconds,
+                             "mean_seconds": stats.seconds / stats.calls if stats.calls else 0.0}
+                      for name, stats in merged_operations.items()}
+        searches = {name: {"searches": counts[0], "scanned": counts[1], "matched": counts[2]}
+                    for name, counts in merged_scans.items()}
+        return {"operations": operations, "searches": searches}
+
+    def exportText(self):
+        """
+        Export the metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: The metrics: inventory_parts, inventory_operation_calls_total, inventory_operation_errors_total,
+            the inventory_operation_seconds histogram and the inventory_search_*_total counters.
+        """
+        merged_operations, merged_scans = self._merged()
+        operations = sorted((name, stats.calls, stats.errors, stats.seconds, stats.buckets)
+                            for name, stats in merged_operations.items())
+        scans = sorted(merged_scans.items())
+        lines = [
+            "# HELP inventory_parts Number of parts in the inventory.",
+            "# TYPE inventory_parts gauge",
+            f"inventory_parts {len(self.inventoryManager.inventory)}",
+            "# HELP inventory_operation_calls_total Inventory operation calls.",
+            "# TYPE inventory_operation_calls_total counter",
+        ]
+        lines.extend(f'inventory_operation_calls_total{{operation="{name}"}} {calls}' for name, calls, _, _, _ in operations)
+        lines.append("# HELP inventory_operation_errors_total Inventory operation calls that raised an exception.")
+        lines.append("# TYPE inventory_operation_errors_total counter")
+        lines.extend(f'inventory_operation_errors_total{{operation="{name}"}} {errors}' for name, _, errors, _, _ in operations)
+        lines.append("# HELP inventory_operation_seconds Inventory operation latency.")
+        lines.append("# TYPE inventory_operation_seconds histogram")
+        for name, calls, _, seconds, buckets in operations:
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, buckets):
+                cumulative += count
+                lines.append(f'inventory_operation_seconds_bucket{{operation="{name}",le="{bound:g}"}} {cumulative}')
+            lines.append(f'inventory_operation_seconds_bucket{{operation="{name}",le="+Inf"}} {calls}')
+            lines.append(f'inventory_operation_seconds_sum{{operation="{name}"}} {seconds!r}')
+            lines.append(f'inventory_operation_seconds_count{{operation="{name}"}} {calls}')
+        for position, (metric, help_text) in enumerate((
+                ("inventory_searches_total", "Searches by part class."),
+                ("inventory_search_scanned_total", "Parts examined by searches."),
+                ("inventory_search_matched_total", "Parts returned by searches."))):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} counter")
+            lines.extend(f'{metric}{{part_class="{name}"}} {counts[position]}' for name, counts in scans)
+        return "\n".join(lines) + "\n"
+
+    def startProfiler(self, interval=0.005):
+        """
+        Start sampling the stacks of every other thread in the background.
+
+        Each sample adds one count to the call stack each thread is running, so the profile shows where time is
+        spent across the inventory, its callers and any front end. Samples accumulate until reset is called.
+
+        Args:
+            interval (float): The number of seconds between samples.
+        """
+        if self._profiler is not None:
+            return
+        self._profilerStop = threading.Event()
+        self._profiler = threading.Thread(target=self._sample, args=(interval, self._profilerStop), daemon=True)
+        self._profiler.start()
+
+    def stopProfiler(self):
+        """
+        Stop the sampling profiler, keeping the samples collected so far.
+        """
+        if self._profiler is not None:
+            self._profilerStop.set()
+            self._profiler.join()
+            self._profiler = None
+
+    @property
+    def profiling(self):
+        """
+        bool: Whether the sampling profiler is running.
+        """
+        return self._profiler is not None
+
+    def _sample(self, interval, stop):
+        """
+        Profiler thread main loop.
+        """
+        me = threading.get_ident()
+        profile = self._profile
+        while not stop.wait(interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == me:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < 64:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                key = ";".join(reversed(stack))
+                with self._lock:
+                    profile[key] = profile.get(key, 0) + 1
+
+    def profile(self, limit=None):
+        """
+        Get the profiler samples in collapsed-stack format, as read by flame graph tools.
+
+        Args:
+            limit (int): The maximum number of stacks to return, most frequent first; None for all of them.
+
+        Returns:
+            str: One "outermost;...;innermost count" line per sampled stack.
+        """
+        with self._lock:
+            stacks = sorted(self._profile.items(), key=lambda item: item[1], reverse=True)
+        if limit is not None:
+            stacks = stacks[:limit]
+        return "".join(f"{stack} {count}\n" for stack, count in stacks)
@@ -0,0 +1,272 @@
+import argparse
+import json
+import platform
+import random
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from enumtypes import *
+from inventoryloadtest import percentile
+from inventorymanager import InventoryManager
+from partcharacteristics import *
+from sqliteinventory import SqliteInventoryManager
+
+DEFAULT_SIZES = (10000, 100000, 1000000, 5000000)
+
+# Storage backends the suite can measure: the in-memory dict, and SQLite in a temporary database file
+BACKENDS = ("memory", "sqlite")
+# An operation's p99 is only compared with at least this many timed calls; with fewer it is close to the
+# maximum, which is mostly noise, so the median is compared instead
+MIN_TAIL_SAMPLES = 1000
+
+_RESISTANCES = tuple(base * 10 ** decade for decade in range(6) for base in (10, 12, 15, 18, 22, 27, 33, 39, 47, 56, 68, 82))
+_TOLERANCES = (1, 2, 5, 10)
+_GAUGES = (10.0, 12.0, 14.0, 16.0, 18.0, 20.0, 22.0, 24.0, 26.0, 28.0, 30.0)
+_LENGTHS = (6.0, 12.0, 24.0, 36.0, 48.0, 72.0, 120.0, 240.0, 600.0, 1200.0)
+
+def generateParts(count, seed=0):
+    """
+    Generate a reproducible synthetic catalog covering all five part classes in equal shares.
+
+    Args:
+        count (int): The number of parts, with SKUs 0 to count - 1.
+        seed (int): The random seed; the same seed always produces the same catalog.
+
+    Yields:
+        Part: The parts, with random quantities.
+    """
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    solder_types = list(SolderType)
+    display_types = list(DisplayType)
+    alpha_types = list(EthernetAlphaType)
+    beta_types = list(EthernetBetaType)
+    speeds = list(EthernetSpeed)
+    for sku in range(count):
+        last_updated = start + timedelta(seconds=rng.randrange(86400 * 180))
+        kind = sku % 5
+        if kind == 0:
+            part = Resistor(sku, last_updated, rng.choice(_RESISTANCES), rng.choice(_TOLERANCES))
+        elif kind == 1:
+            part = Solder(sku, last_updated, rng.choice(solder_types), rng.choice(_LENGTHS))
+        elif kind == 2:
+            part = Wire(sku, last_updated, rng.choice(_GAUGES), rng.choice(_LENGTHS))
+        elif kind == 3:
+            part = DisplayCable(sku, last_updated, rng.choice(display_types), rng.choice(_LENGTHS), f"#{rng.randrange(1 << 24):06x}")
+        else:
+            part = EthernetCable(sku, last_updated, rng.choice(alpha_types), rng.choice(beta_types), rng.choice(speeds), rng.choice(_LENGTHS))
+        part.quantity = rng.randrange(1000)
+        yield part
+
+def _summary(count, elapsed, latencies):
+    """
+    Summarize one timed operation as throughput and latency percentiles in microseconds.
+    """
+    return {
+        "ops": count,
+        "seconds": elapsed,
+        "ops_per_second": count / elapsed if elapsed else 0.0,
+        "p50_us": percentile(latencies, 0.50) * 1e6,
+        "p90_us": percentile(latencies, 0.90) * 1e6,
+        "p99_us": percentile(latencies, 0.99) * 1e6,
+        "max_us": max(latencies, default=0.0) * 1e6,
+    }
+
+def _timeCalls(function, arguments, maxSamples=100000):
+    """
+    Call function once per argument tuple, timing the whole loop and a bounded, evenly spaced sample of calls.
+
+    Returns:
+        dict: The summary of the calls.
+    """
+    stride = max(1, len(arguments) // maxSamples)
+    latencies = []
+    clock = time.perf_counter
+    start = clock()
+    for position, args in enumerate(arguments):
+        if position % stride:
+            function(*args)
+        else:
+            call_start = clock()
+            function(*args)
+            latencies.append(clock() - call_start)
+    return _summary(len(arguments), clock() - start, latencies)
+
+def _peakRssMegabytes():
+    """
+    Get the peak resident set size of this process in megabytes.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024  # Bytes on macOS, kilobytes elsewhere
+
+def runBenchmark(size, operations=100000, searches=5, seed=0, backend="memory"):
+    """
+    Time every InventoryManager hot path against a synthetic catalog of the given size.
+
+    The operations timed are addPart (the whole catalog), getPart, getQuantity and addInventory (operations random
+    SKUs each), selective and unselective searches (searches queries each), one full iteration of getInventory
+    and finally deletePart (operations random SKUs).
+
+    Args:
+        size (int): The number of SKUs in the catalog.
+        operations (int): The number of calls timed for each point operation.
+        searches (int): The number of queries timed for each kind of search.
+        seed (int): The random seed for the catalog and the operation mix.
+        backend (str): "memory" for InventoryManager, or "sqlite" for SqliteInventoryManager on a temporary
+            database file.
+
+    Returns:
+        dict: One summary per operation (ops, seconds, ops_per_second and p50/p90/p99/max latency in
+        microseconds), plus size, backend and peak_rss_mb.
+    """
+    if backend == "sqlite":
+        with tempfile.TemporaryDirectory() as directory:
+            manager = SqliteInventoryManager(f"{directory}/inventory.db")
+            try:
+                return _runBenchmark(manager, size, operations, searches, seed, backend)
+            finally:
+                manager.close()
+    return _runBenchmark(InventoryManager(), size, operations, searches, seed, backend)
+
+def _runBenchmark(manager, size, operations, searches, seed, backend):
+    """
+    Run the benchmark operations against an empty inventory manager.
+    """
+    rng = random.Random(seed + 1)
+    parts = list(generateParts(size, seed))
+    results = {"size": size, "backend": backend}
+    results["addPart"] = _timeCalls(manager.addPart, [(part,) for part in parts])
+    del parts
+    if backend == "sqlite":
+        manager.analyze()  # As a site would after its initial load, so searches use the most selective index
+
+    skus = [(rng.randrange(size),) for _ in range(min(operations, size))]
+    results["getPart"] = _timeCalls(manager.getPart, skus)
+    results["getQuantity"] = _timeCalls(manager.getQuantity, skus)
+    results["addInventory"] = _timeCalls(manager.addInventory, [(sku, 1) for sku, in skus])
+
+    speeds = list(EthernetSpeed)
+    selective = [(Resistor, {"resistance": rng.choice(_RESISTANCES), "tolerance": rng.choice(_TOLERANCES)}) for _ in range(searches)]
+    unselective = [(EthernetCable, {"speed__ne": rng.choice(speeds)}) for _ in range(searches)]
+    search = lambda part_class, criteria: manager.search(part_class, **criteria)
+    results["search_selective"] = _timeCalls(search, selective)
+    results["search_unselective"] = _timeCalls(search, unselective)
+
+    start = time.perf_counter()
+    total = 0
+    for part in manager.getInventory().values():
+        total += part.quantity
+    elapsed = time.perf_counter() - start
+    results["getInventory_iterate"] = _summary(size, elapsed, [elapsed / size] if size else [])
+
+    deletions = rng.sample(range(size), min(operations, size))
+    results["deletePart"] = _timeCalls(manager.deletePart, [(sku,) for sku in deletions])
+    results["peak_rss_mb"] = _peakRssMegabytes()
+    return results
+
+def runSuite(sizes=DEFAULT_SIZES, operations=100000, searches=5, seed=0, isolate=True, backends=("memory",)):
+    """
+    Run the benchmark for several catalog sizes and storage backends.
+
+    Args:
+        sizes (iterable): The catalog sizes.
+        operations (int): The number of calls timed for each point operation.
+        searches (int): The number of queries timed for each kind of search.
+        seed (int): The random seed.
+        isolate (bool): Whether to run each size in a fresh process, so peak RSS and allocator state of one size
+            do not carry over to the next.
+        backends (iterable): The storage backends to measure (see BACKENDS).
+
+    Returns:
+        dict: The environment, the parameters and the results by size, ready to be saved as JSON.
+    """
+    results = []
+    for size in sizes:
+        for backend in backends:
+            if isolate:
+                with ProcessPoolExecutor(max_workers=1) as executor:
+                    results.append(executor.submit(runBenchmark, size, operations, searches, seed, backend).result())
+            else:
+                results.append(runBenchmark(size, operations, searches, seed, backend))
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "operations": operations,
+        "searches": searches,
+        "seed": seed,
+        "results": results,
+    }
+
+def compareResults(baseline, current, threshold=0.10):
+    """
+    Find the operations that got slower between two suite runs.
+
+    An operation regresses when its throughput drops, or its p99 latency rises, by more than threshold. For
+    operations timed fewer than MIN_TAIL_SAMPLES times in either run (e.g., searches), the p50 latency is compared
+    instead of the p99.
+
+    Args:
+        baseline (dict): An earlier runSuite result.
+        current (dict): A later runSuite result.
+        threshold (float): The tolerated relative change (e.g., 0.10 for 10%).
+
+    Returns:
+        list: (size, operation, metric, baseline value, current value) tuples for each regression; results are
+        compared between runs of the same size and backend.
+    """
+    previous = {(result["size"], result.get("backend", "memory")): result for result in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        old = previous.get((result["size"], result.get("backend", "memory")))
+        if old is None:
+            continue
+        for operation, summary in result.items():
+            if not isinstance(summary, dict) or not isinstance(old.get(operation), dict):
+                continue
+            before = old[operation]
+            if summary["ops_per_second"] < before["ops_per_second"] * (1 - threshold):
+                regressions.append((result["size"], operation, "ops_per_second", before["ops_per_second"], summary["ops_per_second"]))
+            metric = "p99_us" if min(summary["ops"], before["ops"]) >= MIN_TAIL_SAMPLES else "p50_us"
+            if summary[metric] > before[metric] * (1 + threshold):
+                regressions.append((result["size"], operation, metric, before[metric], summary[metric]))
+    return regressions
+
+def main():
+    """
+    Command-line entry point for the benchmark suite.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the InventoryManager hot paths.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="catalog sizes in SKUs")
+    parser.add_argument("--operations", type=int, default=100000, help="calls timed per point operation")
+    parser.add_argument("--searches", type=int, default=5, help="queries timed per kind of search")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=["memory"], help="storage backends to compare")
+    parser.add_argument("--output", help="save the results as JSON to this file")
+    parser.add_argument("--compare", help="flag regressions against the JSON results in this file")
+    parser.add_argument("--threshold", type=float, default=0.10, help="tolerated relative slowdown when comparing")
+    args = parser.parse_args()
+
+    suite = runSuite(args.sizes, args.operations, args.searches, args.seed, backends=args.backends)
+    for result in suite["results"]:
+        print(f"\n{result['size']} SKUs, {result['backend']} (peak RSS {result['peak_rss_mb']:.0f} MB)")
+        for operation, summary in result.items():
+            if isinstance(summary, dict):
+                print(f"  {operation:<22}{summary['ops_per_second']:>14,.0f} ops/s   p50 {summary['p50_us']:>10.1f} us"
+                      f"   p99 {summary['p99_us']:>10.1f} us")
+    if args.output:
+        with open(args.output, "w") as out:
+            json.dump(suite, out, indent=2)
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            regressions = compareResults(json.load(baseline_file), suite, args.threshold)
+        for size, operation, metric, before, after in regressions:
+            print(f"REGRESSION {size} SKUs {operation} {metric}: {before:,.1f} -> {after:,.1f}")
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+import csv
+import json
+from datetime import datetime
+from enum import Enum
+from itertools import islice
+from partcodec import PART_CLASSES, partFields
+from parttypes import lookupPartType, partTypeOf
+
+# Columns common to every part, followed by the type-specific fields of all part classes
+BASE_COLUMNS = ("type", "sku", "quantity", "last_updated")
+COLUMNS = BASE_COLUMNS + tuple(dict.fromkeys(field for part_class in PART_CLASSES for field in partFields(part_class)))
+
+def _formatValue(value):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def readCsv(lines):
+    """
+    Parse CSV rows into dictionaries keyed by the header row.
+
+    Empty cells are left out of the dictionaries, so they can be treated like missing JSONL keys.
+
+    Args:
+        lines (iterable): Lines of CSV text, such as an open text file.
+
+    Yields:
+        tuple: (line_number, row) for each data row.
+    """
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header is None:
+        return
+    header = [name.strip() for name in header]
+    for row in reader:
+        if row:
+            yield reader.line_num, {name: value for name, value in zip(header, row) if value != ""}
+
+def readJsonl(lines):
+    """
+    Parse JSON Lines into dictionaries.
+
+    Args:
+        lines (iterable): Lines of JSONL text, such as an open text file.
+
+    Yields:
+        tuple: (line_number, row) for each non-blank line. A line that is not a JSON object is yielded as
+        (line_number, None).
+    """
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield line_number, row if isinstance(row, dict) else None
+
+def parseParts(rows, last_updated=None):
+    """
+    Turn parsed rows into parts.
+
+    Each row needs a "type" (the part class name, e.g. "Resistor" or "Display Cable"), a "sku" and the fields of
+    that part class. "quantity" defaults to 0 and "last_updated" (ISO 8601) to last_updated.
+
+    Args:
+        rows (iterable): (line_number, row) pairs, as produced by readCsv or readJsonl.
+        last_updated (datetime): The timestamp for rows without one; defaults to the current time.
+
+    Yields:
+        tuple: (line_number, part, error) for each row, where exactly one of part and error is None.
+    """
+    if last_updated is None:
+        last_updated = datetime.now()
+    for line_number, row in rows:
+        if row is None:
+            yield line_number, None, "Invalid row."
+            continue
+        try:
+            part = partFromRow(row, last_updated)
+        except ValueError as error:
+            yield line_number, None, f"Invalid row: {error}."
+            continue
+        yield line_number, part, None
+
+def partType(name):
+    """
+    Resolve a registered part type name, ignoring case, spaces, dashes and underscores (e.g., "Display Cable").
+
+    Args:
+        name (str): The part type name.
+
+    Returns:
+        class: The part class.
+
+    Raises:
+        ValueError: If the name does not match a registered part type.
+    """
+    return lookupPartType(name).part_class
+
+def partFromRow(row, last_updated):
+    """
+    Build a part from one row dictionary, as described in parseParts.
+
+    Args:
+        row (dict): The row.
+        last_updated (datetime): The timestamp to use if the row has none.
+
+    Returns:
+        Part: The new part, with its quantity set.
+
+    Raises:
+        ValueError: If the row is missing a value or a value is invalid.
+    """
+    return lookupPartType(row.get("type", "")).fromRow(row, last_updated)
+
+def coerceCriteria(part_class, criteria):
+    """
+    Convert search criteria given as text or JSON values to the types of the part class's fields.
+
+    See PartType.coerceCriteria. Criteria for a part class that is not registered are returned unchanged.
+
+    Args:
+        part_class (class): The class of the part being searched for.
+        criteria (dict): The raw criteria.
+
+    Returns:
+        dict: The criteria with converted values.
+
+    Raises:
+        ValueError: If a value cannot be converted.
+    """
+    part_type = partTypeOf(part_class)
+    return part_type.coerceCriteria(criteria) if part_type is not None else dict(criteria)
+
+def importParts(inventoryManager, lines, format="csv", chunkSize=10000, maxErrors=1000):
+    """
+    Stream parts from CSV or JSONL text into an inventory manager.
+
+    Rows are parsed lazily and added with InventoryManager.addParts in chunks of chunkSize, so memory stays
+    bounded whatever the size of the input. Rows that cannot be turned into a part, such as rows with an unknown
+    enum name or an invalid DisplayCable color, are skipped and reported.
+
+    Args:
+        inventoryManager (InventoryManager): The inventory to add the parts to.
+        lines (iterable): Lines of text, such as an open text file.
+        format (str): "csv" or "jsonl".
+        chunkSize (int): The number of parts added per addParts call.
+        maxErrors (int): The maximum number of errors kept in the returned list; further errors are only counted.
+
+    Returns:
+        tuple: (imported, error_count, errors), where errors lists (line_number, message) pairs.
+
+    Raises:
+        ValueError: If the format is unknown.
+    """
+    if format == "csv":
+        rows = readCsv(lines)
+    elif format == "jsonl":
+        rows = readJsonl(lines)
+    else:
+        raise ValueError(f"Unknown import format '{format}'.")
+    imported = 0
+    error_count = 0
+    errors = []
+    parsed = parseParts(rows)
+    while True:
+        chunk = []
+        seen = 0
+        for line_number, part, error in islice(parsed, chunkSize):
+            seen += 1
+            if error is None:
+                chunk.append(part)
+            else:
+                error_count += 1
+                if len(errors) < maxErrors:
+                    errors.append((line_number, error))
+        if chunk:
+            inventoryManager.addParts(chunk)
+            imported += len(chunk)
+        if seen < chunkSize:
+            break
+    return imported, error_count, errors
+
+def partRow(part):
+    """
+    Get the exported values of a part as a dictionary keyed by column name.
+
+    Args:
+        part (Part): The part to export.
+
+    Returns:
+        dict: The part's type, SKU, quantity, last updated timestamp and fields, with enums as their values and
+        the timestamp in ISO 8601 format.
+    """
+    row = {"type": type(part).__name__, "sku": part.getSku(), "quantity": part.quantity,
+           "last_updated": _formatValue(part.getLastUpdated())}
+    for field in partFields(type(part)):
+        row[field] = _formatValue(getattr(part, field))
+    return row
+
+def exportParts(inventoryManager, out, format="csv"):
+    """
+    Stream the inventory to CSV or JSONL text.
+
+    Args:
+        inventoryManager (InventoryManager): The inventory to export; its getInventory() is iterated once.
+        out (file): A text file open for writing. CSV files should be opened with newline="".
+        format (str): "csv" or "jsonl".
+
+    Returns:
+        int: The number of parts written.
+
+    Raises:
+        ValueError: If the format is unknown.
+    """
+    parts = inventoryManager.getInventory().values()
+    count = 0
+    if format == "csv":
+        writer = csv.DictWriter(out, COLUMNS)
+        writer.writeheader()
+        for part in parts:
+            writer.writerow(partRow(part))
+            count += 1
+    elif format == "jsonl":
+        write = out.write
+        dumps = json.dumps
+        for part in parts:
+            write(dumps(partRow(part)))
+            write("\n")
+            count += 1
+    else:
+        raise ValueError(f"Unknown export format '{format}'.")
+    return count
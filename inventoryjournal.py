@@ -0,0 +1,248 @@
+import os
+import struct
+import threading
+import time
+import zlib
+from partcodec import *
+
+_RECORD_HEADER = struct.Struct("<II")  # payload length, CRC-32 of the payload
+_SNAPSHOT_MAGIC = b"INVSNAP1"
+_SNAPSHOT_FILE = "inventory.snapshot"
+_WAL_FILE = "inventory.wal"
+
+_ADD = b"A"
+_DELETE = b"D"
+_SET = b"S"
+
+def _isDerived(part, name):
+    """
+    Whether an attribute is computed from others (a property without a setter, such as DisplayCable.rgb), so
+    its changes are carried by the attributes it is computed from.
+    """
+    attribute = getattr(type(part), name, None)
+    return isinstance(attribute, property) and attribute.fset is None
+
+class InventoryJournal:
+    """
+    A class that persists an InventoryManager to disk.
+
+    Every change to the inventory is appended to a binary write-ahead log (WAL). Records are buffered and
+    written with a single fsync per group, either once groupCommitSize records are pending or, by a timer, once
+    the oldest pending record is groupCommitInterval seconds old, so at most one group of changes can be lost
+    on a crash. After checkpointInterval logged changes, the whole inventory is written to a compact snapshot
+    and the log is truncated.
+
+    Every logged operation stores absolute values (whole parts, new quantities), so replaying the log over the
+    snapshot is idempotent. A crash between writing a snapshot and truncating the log therefore loses nothing.
+
+    Attributes:
+        inventoryManager (InventoryManager): The inventory being persisted.
+        directory (str): The directory holding the snapshot and log files.
+        groupCommitSize (int): The number of pending records that triggers a sync.
+        groupCommitInterval (float): The maximum age, in seconds, of pending records before a sync.
+        checkpointInterval (int): The number of logged records that triggers a checkpoint, or None to only
+            checkpoint when checkpoint() is called.
+    """
+
+    def __init__(self, inventoryManager, directory, groupCommitSize=1024, groupCommitInterval=0.05, checkpointInterval=1000000):
+        """
+        Initializes a new instance of the InventoryJournal class.
+
+        Any inventory previously persisted in the directory is loaded into inventoryManager (latest snapshot, then
+        the log tail) before the journal starts recording changes.
+
+        Args:
+            inventoryManager (InventoryManager): The inventory to persist. It should be empty.
+            directory (str): The directory holding the snapshot and log files; it is created if needed.
+            groupCommitSize (int): The number of pending records that triggers a sync.
+            groupCommitInterval (float): The maximum age, in seconds, of pending records before a sync.
+            checkpointInterval (int): The number of logged records that triggers a checkpoint, or None.
+
+        Raises:
+            ValueError: If the snapshot file is corrupt.
+        """
+        self.inventoryManager = inventoryManager
+        self.directory = directory
+        self.groupCommitSize = groupCommitSize
+        self.groupCommitInterval = groupCommitInterval
+        self.checkpointInterval = checkpointInterval
+        self._buffer = bytearray()
+        self._pending = 0
+        self._logged = 0
+        self._lastSync = time.monotonic()
+        self._timer = None  # Syncs the pending records once the oldest is groupCommitInterval seconds old
+        self._lock = threading.RLock()  # The timer syncs from its own thread
+        os.makedirs(directory, exist_ok=True)
+        self._recover()
+        self._wal = open(os.path.join(directory, _WAL_FILE), "ab")
+        inventoryManager.addListener(self._onInventoryChanged)
+
+    def sync(self):
+        """
+        Write all pending log records and fsync the log.
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._buffer:
+                self._wal.write(self._buffer)
+                self._buffer.clear()
+            self._wal.flush()
+            os.fsync(self._wal.fileno())
+            self._pending = 0
+            self._lastSync = time.monotonic()
+
+    def checkpoint(self):
+        """
+        Write a snapshot of the whole inventory and truncate the log.
+
+        The snapshot is written to a temporary file and atomically renamed over the previous one.
+        """
+        with self._lock:
+            self.sync()
+            data = encodeParts(self.inventoryManager.inventory.values())
+            path = os.path.join(self.directory, _SNAPSHOT_FILE)
+            with open(path + ".tmp", "wb") as snapshot:
+                snapshot.write(_SNAPSHOT_MAGIC)
+                snapshot.write(data)
+                snapshot.write(struct.pack("<I", zlib.crc32(data)))
+                snapshot.flush()
+                os.fsync(snapshot.fileno())
+            os.replace(path + ".tmp", path)
+            self._syncDirectory()
+            self._wal.truncate(0)
+            os.fsync(self._wal.fileno())
+            self._logged = 0
+
+    def close(self):
+        """
+        Sync pending records, stop recording changes and close the log.
+        """
+        with self._lock:
+            if self._wal.closed:
+                return
+            self.inventoryManager.removeListener(self._onInventoryChanged)
+            self.sync()
+            self._wal.close()
+
+    def _append(self, payload):
+        """
+        Buffer one log record and sync or checkpoint when the group commit or checkpoint limits are reached. The
+        first record of a group starts the timer that syncs it once it is groupCommitInterval seconds old.
+        """
+        with self._lock:
+            self._buffer += _RECORD_HEADER.pack(len(payload), zlib.crc32(payload))
+            self._buffer += payload
+            self._pending += 1
+            self._logged += 1
+            if self.checkpointInterval is not None and self._logged >= self.checkpointInterval:
+                self.checkpoint()
+            elif self._pending >= self.groupCommitSize or time.monotonic() - self._lastSync >= self.groupCommitInterval:
+                self.sync()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.groupCommitInterval, self._syncPending)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _syncPending(self):
+        """
+        Timer callback that syncs the pending records, unless they were synced or the log closed meanwhile.
+        """
+        with self._lock:
+            if self._pending and not self._wal.closed:
+                self.sync()
+
+    def _onInventoryChanged(self, event, part, name, old, new):
+        """
+        Inventory listener that logs each change.
+        """
+        payload = bytearray()
+        if event == "add":
+            payload += _ADD
+            encodePart(part, payload)
+        elif event == "delete":
+            payload += _DELETE
+            encodeValue(part.sku, payload)
+        elif _isDerived(part, name):
+            return
+        else:
+            payload += _SET
+            # A SKU change is logged against the SKU the part was stored under
+            encodeValue(old if name == "sku" else part.sku, payload)
+            encodeValue(name, payload)
+            encodeValue(new, payload)
+        self._append(bytes(payload))
+
+    def _recover(self):
+        """
+        Load the latest snapshot and replay the log into the inventory manager.
+
+        A torn or corrupt record at the end of the log, left by a crash during a write, is discarded along with
+        anything after it.
+        """
+        manager = self.inventoryManager
+        path = os.path.join(self.directory, _SNAPSHOT_FILE)
+        if os.path.exists(path):
+            with open(path, "rb") as snapshot:
+                data = snapshot.read()
+            body = data[len(_SNAPSHOT_MAGIC):-4]
+            if not data.startswith(_SNAPSHOT_MAGIC) or len(data) < len(_SNAPSHOT_MAGIC) + 4 \
+                    or struct.unpack("<I", data[-4:])[0] != zlib.crc32(body):
+                raise ValueError("Error, Inventory snapshot is corrupt.")
+            manager.addParts(decodeParts(body))
+        path = os.path.join(self.directory, _WAL_FILE)
+        if not os.path.exists(path):
+            return
+        with open(path, "rb") as wal:
+            data = wal.read()
+        offset = 0
+        while offset + _RECORD_HEADER.size <= len(data):
+            length, checksum = _RECORD_HEADER.unpack_from(data, offset)
+            start = offset + _RECORD_HEADER.size
+            payload = data[start:start + length]
+            if len(payload) < length or zlib.crc32(payload) != checksum:
+                break
+            self._replay(payload)
+            offset = start + length
+            self._logged += 1
+        if offset < len(data):
+            with open(path, "r+b") as wal:
+                wal.truncate(offset)
+
+    def _replay(self, payload):
+        """
+        Apply one log record to the inventory manager.
+        """
+        manager = self.inventoryManager
+        op = payload[:1]
+        if op == _ADD:
+            part, _ = decodePart(payload, 1)
+            manager.addPart(part)
+            return
+        sku, offset = decodeValue(payload, 1)
+        part = manager.inventory.get(sku)
+        if part is None:
+            return
+        if op == _DELETE:
+            manager.deletePart(sku)
+        else:
+            name, offset = decodeValue(payload, offset)
+            value, _ = decodeValue(payload, offset)
+            if not _isDerived(part, name):  # Logs written before derived attributes were skipped may hold them
+                setattr(part, name, value)
+
+    def _syncDirectory(self):
+        """
+        Fsync the journal directory so a rename inside it is durable, where the platform supports it.
+        """
+        try:
+            descriptor = os.open(self.directory, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(descriptor)
+        except OSError:
+            pass
+        finally:
+            os.close(descriptor)
@@ -0,0 +1,157 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+
+def percentile(samples, fraction):
+    """
+    Get a percentile of a list of samples by the nearest-rank method.
+
+    Args:
+        samples (list): The samples, in any order.
+        fraction (float): The percentile as a fraction (e.g., 0.99).
+
+    Returns:
+        float: The sample at that rank, or 0.0 if there are none.
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))]
+
+def makeRequest(skuCount, searchRatio=0.1):
+    """
+    Build one random request of the load mix: mostly getQuantity and addInventory, plus some searches.
+
+    Args:
+        skuCount (int): The number of SKUs loaded by populate.
+        searchRatio (float): The fraction of requests that are searches.
+
+    Returns:
+        dict: The request, without an id.
+    """
+    roll = random.random()
+    sku = random.randrange(skuCount)
+    if roll < searchRatio:
+        low = random.choice((10, 47, 100, 220, 470, 1000))
+        return {"op": "search", "type": "Resistor", "criteria": {"resistance__between": [low, low * 11 // 10], "tolerance": 5}}
+    if roll < 0.5:
+        return {"op": "addInventory", "sku": sku, "quantity": 1}
+    return {"op": "getQuantity", "sku": sku}
+
+async def _connect(host, port, path):
+    if path is not None:
+        return await asyncio.open_unix_connection(path, limit=1 << 24)
+    return await asyncio.open_connection(host, port, limit=1 << 24)
+
+async def populate(host, port, path, skuCount):
+    """
+    Load skuCount resistors into the server over one pipelined connection.
+    """
+    reader, writer = await _connect(host, port, path)
+    values = (10, 47, 100, 220, 470, 1000)
+    for sku in range(skuCount):
+        part = {"type": "Resistor", "sku": sku, "resistance": random.choice(values), "tolerance": random.choice((1, 5, 10))}
+        writer.write((json.dumps({"op": "addPart", "part": part}) + "\n").encode())
+        if sku % 1000 == 999:
+            await writer.drain()
+    await writer.drain()
+    for _ in range(skuCount):
+        await reader.readline()
+    writer.close()
+
+async def _client(host, port, path, depth, deadline, skuCount, searchRatio, latencies, errors):
+    """
+    Run one connection that keeps up to depth requests in flight until the deadline.
+    """
+    reader, writer = await _connect(host, port, path)
+    slots = asyncio.Semaphore(depth)
+    sent = {}
+    done = asyncio.Event()
+
+    async def receive():
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            response = json.loads(line)
+            latencies.append(time.perf_counter() - sent.pop(response["id"]))
+            if not response["ok"]:
+                errors.append(response["error"])
+            slots.release()
+            if done.is_set() and not sent:
+                break
+
+    receiver = asyncio.ensure_future(receive())
+    request_id = 0
+    while time.perf_counter() < deadline:
+        await slots.acquire()
+        request = makeRequest(skuCount, searchRatio)
+        request["id"] = request_id
+        sent[request_id] = time.perf_counter()
+        request_id += 1
+        writer.write((json.dumps(request) + "\n").encode())
+        await writer.drain()
+    done.set()
+    if sent:
+        await receiver
+    else:
+        receiver.cancel()
+    writer.close()
+
+async def runLoad(host="127.0.0.1", port=8765, path=None, clients=16, depth=8, duration=5.0, skuCount=10000, searchRatio=0.1, populateFirst=True):
+    """
+    Drive an InventoryServer with concurrent pipelined clients and measure throughput and latency.
+
+    Args:
+        host (str): The server host.
+        port (int): The server port.
+        path (str): The server's Unix socket path, used instead of TCP if given.
+        clients (int): The number of concurrent connections.
+        depth (int): The number of in-flight requests per connection.
+        duration (float): How long to generate load, in seconds.
+        skuCount (int): The number of SKUs to load and address.
+        searchRatio (float): The fraction of requests that are searches.
+        populateFirst (bool): Whether to load the SKUs before measuring.
+
+    Returns:
+        dict: requests, errors, requests_per_second and p50/p99/max latency in milliseconds.
+    """
+    if populateFirst:
+        await populate(host, port, path, skuCount)
+    latencies = []
+    errors = []
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(_client(host, port, path, depth, deadline, skuCount, searchRatio, latencies, errors) for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "requests_per_second": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "max_ms": max(latencies, default=0.0) * 1000,
+    }
+
+def main():
+    """
+    Command-line entry point for the load generator.
+    """
+    parser = argparse.ArgumentParser(description="Generate load against an inventory server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="connect to this Unix socket path instead of TCP")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--depth", type=int, default=8, help="in-flight requests per connection")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds of load")
+    parser.add_argument("--skus", type=int, default=10000)
+    parser.add_argument("--search-ratio", type=float, default=0.1)
+    parser.add_argument("--no-populate", action="store_true", help="skip loading parts before the run")
+    args = parser.parse_args()
+    result = asyncio.run(runLoad(args.host, args.port, args.unix, args.clients, args.depth, args.duration, args.skus, args.search_ratio, not args.no_populate))
+    print(json.dumps(result, indent=2))
+
+if __name__ == "__main__":
+    main()
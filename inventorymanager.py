@@ -1,4 +1,77 @@
+import operator
+import threading
+import time
+from operator import attrgetter
+from bisect import bisect_left, bisect_right, insort
 from datetime import datetime
+from partcharacteristics import Part, Solder, Wire, _MISSING
+from cableindex import CableIndex
+from changefeed import ChangeFeed
+from colorindex import ColorIndex
+from cutplanner import optimizeCuts
+from instrumentation import Instrumentation
+from resistorsolver import MAX_RESISTORS, ResistorSolver
+from rollups import Rollups
+from searchcache import SearchCache
+from stockwatch import StockWatch
+from transactions import StockLedger
+
+_LEDGER_LOCK = threading.Lock()
+
+# Orders supported by listParts, each backed by a sorted index over the attribute
+_LISTING_ORDERS = ("sku", "quantity", "last_updated")
+
+_OPERATORS = {
+    "eq": operator.eq,
+    "ne": operator.ne,
+    "lt": operator.lt,
+    "lte": operator.le,
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "between": lambda value, bounds: bounds[0] <= value <= bounds[1],
+}
+
+def _compileCriteria(criteria):
+    """
+    Turn parsed search criteria into (getter, compare, value) checks, resolving the attribute getters and
+    comparison functions once per search rather than once per part.
+    """
+    return [(attrgetter(attribute), _OPERATORS[op], value) for attribute, op, value in criteria]
+
+def _sortValue(entry):
+    return entry[0]
+
+def _sortedRange(entries, op, value):
+    """
+    Find the [lo, hi) slice of a sorted index whose values satisfy a comparison criterion.
+
+    Raises:
+        TypeError: If the criterion cannot be compared with the indexed values.
+    """
+    if op == "eq":
+        return bisect_left(entries, value, key=_sortValue), bisect_right(entries, value, key=_sortValue)
+    if op == "lt":
+        return 0, bisect_left(entries, value, key=_sortValue)
+    if op == "lte":
+        return 0, bisect_right(entries, value, key=_sortValue)
+    if op == "gt":
+        return bisect_right(entries, value, key=_sortValue), len(entries)
+    if op == "gte":
+        return bisect_left(entries, value, key=_sortValue), len(entries)
+    low, high = value
+    lo = bisect_left(entries, low, key=_sortValue)
+    return lo, max(lo, bisect_right(entries, high, key=_sortValue))
+
+def _removeFromSorted(entries, value, sku):
+    """
+    Remove a (value, sku) pair from a sorted index if present.
+    """
+    if value is _MISSING or value is None:
+        return
+    entry = (value, sku)
+    pos = bisect_left(entries, entry)
+    if pos < len(entries) and entries[pos] == entry:
+        del entries[pos]
 
 class InventoryManager:
     """
@@ -10,6 +83,20 @@ class InventoryManager:
     Attributes:
         inventory (dict): A dictionary containing the inventory, where the keys are SKUs (Stock Keeping Units)
             and the values are instances of Part subclasses representing the parts in the inventory.
+        indexes (dict): Secondary hash indexes, keyed by (part_class, attribute). Each index maps an attribute
+            value to a dictionary of {sku: part} for the parts of that class holding that value.
+        sortedIndexes (dict): Sorted indexes for range queries, keyed by (part_class, attribute). Each index is a
+            list of (value, sku) pairs in ascending order.
+        listeners (list): Callbacks notified of every change to the stored parts (see addListener).
+        searchCache (SearchCache): The search result cache, or None if caching is disabled
+            (see enableSearchCache).
+        instrumentation (Instrumentation): The operation metrics and profiler, or None if instrumentation is
+            disabled (see enableInstrumentation).
+        stockWatch (StockWatch): The reorder thresholds and low-stock list, or None if disabled
+            (see enableStockWatch).
+        changeFeed (ChangeFeed): The sequenced change log, or None if disabled (see enableChangeFeed).
+        stockLedger (StockLedger): The reserved quantities and part versions used by transactions, created by
+            the first call to transaction.
     """
 
     def __init__(self):
@@ -19,15 +106,34 @@ class InventoryManager:
         The inventory is initially empty.
         """
         self.inventory = {}
+        self.indexes = {}
+        self.sortedIndexes = {}
+        self.listeners = []
+        self.searchCache = None
+        self.instrumentation = None
+        self.stockWatch = None
+        self.changeFeed = None
+        self.rollups = None
+        self.cableIndex = None
+        self.colorIndex = None
+        self.resistorSolver = None
+        self.stockLedger = None
 
     def addPart(self, part):
         """
         Add a part to the inventory.
 
+        If a part with the same SKU already exists, it is replaced.
+
         Args:
             part (Part): The part to be added to the inventory.
         """
-        self.inventory[part.sku] = part
+        sku = part.sku
+        previous = self.inventory.get(sku)
+        if previous is not None:
+            self._untrackPart(sku, previous)
+        self.inventory[sku] = part
+        self._trackPart(sku, part)
 
     def addInventory(self, sku, quantity):
         """
@@ -38,14 +144,97 @@ class InventoryManager:
             quantity (int): The quantity of the part to be added to the inventory.
 
         Raises:
-            ValueError: If the part with the specified SKU is not found in the inventory.
+            ValueError: If the part with the specified SKU is not found in the inventory, or the quantity would
+                drop below the quantity reserved by transactions.
         """
         if sku in self.inventory:
+            if self.stockLedger is not None:
+                self.stockLedger.checkQuantity(sku, self.inventory[sku].quantity + quantity)
             self.inventory[sku].last_updated = datetime.now()
             self.inventory[sku].quantity += quantity  # Update quantity directly
         else:
             raise ValueError("Part not found in inventory.")
 
+    def addParts(self, parts):
+        """
+        Add many parts to the inventory in one pass.
+
+        Parts are validated before anything is stored, and sorted indexes are merged once for the whole batch
+        rather than once per part. As with addPart, a part replaces any stored part with the same SKU; if the
+        batch contains the same SKU more than once, the last part wins.
+
+        Args:
+            parts (iterable): The parts to be added to the inventory.
+
+        Returns:
+            list: One (position, sku, message) tuple per rejected entry, where position is the entry's index
+            in parts. The list is empty if every part was added.
+        """
+        failures = []
+        pending = {}
+        for position, part in enumerate(parts):
+            if not isinstance(part, Part):
+                failures.append((position, None, "Invalid part."))
+            else:
+                pending[part.sku] = part
+        inventory = self.inventory
+        sortedPending = {}
+        for sku, part in pending.items():
+            previous = inventory.get(sku)
+            if previous is not None:
+                self._untrackPart(sku, previous)
+            inventory[sku] = part
+            self._trackPart(sku, part, sortedPending)
+        self._flushSortedPending(sortedPending)
+        return failures
+
+    def addInventoryBatch(self, items):
+        """
+        Add inventory for many parts in one pass.
+
+        Every line is validated before any quantity changes. Lines for the same SKU are combined, and all updated
+        parts share a single last updated timestamp. Invalid lines are reported instead of raising, and do not
+        stop the valid lines from being applied.
+
+        Args:
+            items (iterable): (sku, quantity) pairs.
+
+        Returns:
+            list: One (position, sku, message) tuple per rejected line, where position is the line's index in
+            items. The list is empty if every line was applied.
+        """
+        failures = []
+        totals = {}
+        positions = {}  # sku -> position of its last line
+        inventory = self.inventory
+        for position, item in enumerate(items):
+            try:
+                sku, quantity = item
+            except (TypeError, ValueError):
+                failures.append((position, None, "Invalid inventory line."))
+                continue
+            if not isinstance(quantity, int):
+                failures.append((position, sku, "Invalid quantity."))
+            elif sku not in inventory:
+                failures.append((position, sku, "Part not found in inventory."))
+            else:
+                totals[sku] = totals.get(sku, 0) + quantity
+                positions[sku] = position
+        if self.stockLedger is not None:
+            for sku in list(totals):
+                try:
+                    self.stockLedger.checkQuantity(sku, inventory[sku].quantity + totals[sku])
+                except ValueError as error:
+                    failures.append((positions[sku], sku, str(error)))
+                    del totals[sku]
+            failures.sort(key=lambda failure: failure[0])
+        now = datetime.now()
+        for sku, quantity in totals.items():
+            part = inventory[sku]
+            part.last_updated = now
+            part.quantity += quantity
+        return failures
+
     def getQuantity(self, sku):
         """
         Get the quantity of a specific part in the inventory.
@@ -74,6 +263,221 @@ class InventoryManager:
         """
         return self.inventory
 
+    def listParts(self, orderBy="sku", part_class=None, after=None, limit=100, descending=False):
+        """
+        Get one page of the inventory in a stable order.
+
+        Pages are read from a sorted index over the ordering attribute, created on first use and kept in sync
+        afterwards, so a page costs O(log n + limit) however large the inventory is. Parts are ordered by
+        (value, sku), which makes the order total; the returned cursor is the (value, sku) pair of the last part
+        on the page, so paging continues correctly while parts are added, deleted or changed in between.
+
+        When part_class is given and a sorted index exists for that class and ordering attribute (see
+        createSortedIndex), that index is used; otherwise parts of other classes are skipped.
+
+        Args:
+            orderBy (str): "sku", "quantity" or "last_updated".
+            part_class (class): Only list parts of this class (e.g., Resistor); None lists every part.
+            after (tuple): The cursor returned with the previous page, or None for the first page.
+            limit (int): The maximum number of parts on the page.
+            descending (bool): Whether to list the largest values first.
+
+        Returns:
+            tuple: (parts, cursor), where cursor is None once there are no more parts to list.
+
+        Raises:
+            ValueError: If the order is not supported or the limit is less than 1.
+        """
+        if limit < 1:
+            raise ValueError("Invalid limit.")
+        entries = self._listingIndex(part_class, orderBy)
+        inventory = self.inventory
+        parts = []
+        if descending:
+            positions = range((len(entries) if after is None else bisect_left(entries, tuple(after))) - 1, -1, -1)
+        else:
+            positions = range(0 if after is None else bisect_right(entries, tuple(after)), len(entries))
+        cursor = None
+        for position in positions:
+            part = inventory[entries[position][1]]
+            if part_class is not None and not isinstance(part, part_class):
+                continue
+            if len(parts) == limit:
+                return parts, cursor
+            parts.append(part)
+            cursor = entries[position]
+        return parts, None
+
+    def iterParts(self, orderBy="sku", part_class=None, descending=False, pageSize=1000):
+        """
+        Stream the inventory in a stable order, one page at a time.
+
+        This is a generator over listParts, so the first parts are available immediately and memory use is
+        bounded by pageSize. Parts added or changed while iterating are included if they sort after the parts
+        already yielded.
+
+        Args:
+            orderBy (str): "sku", "quantity" or "last_updated".
+            part_class (class): Only list parts of this class; None lists every part.
+            descending (bool): Whether to list the largest values first.
+            pageSize (int): The number of parts fetched per page.
+
+        Yields:
+            Part: The parts, in order.
+        """
+        cursor = None
+        while True:
+            parts, cursor = self.listParts(orderBy, part_class, cursor, pageSize, descending)
+            yield from parts
+            if cursor is None:
+                return
+
+    def _listingIndex(self, part_class, orderBy):
+        """
+        Get the sorted index used to list parts of a class by an attribute, creating it if needed.
+
+        Raises:
+            ValueError: If the order is not supported.
+        """
+        if orderBy not in _LISTING_ORDERS:
+            raise ValueError(f"Unknown listing order '{orderBy}'.")
+        entries = self.sortedIndexes.get((part_class, orderBy)) if part_class is not None else None
+        if entries is None:
+            if (Part, orderBy) not in self.sortedIndexes:
+                self.createSortedIndex(Part, orderBy)
+            entries = self.sortedIndexes[(Part, orderBy)]
+        return entries
+
+    def compatibleCables(self, first, second, minSpeed=None, minLength=0, limit=None):
+        """
+        Find the in-stock Ethernet cables with a pair of connectors, at least a speed and at least a length.
+
+        A cable's ends are interchangeable, so a cable with a male alpha and a female beta connector matches
+        ("female", "male") as well as ("male", "female"). The query is answered by a CableIndex, built on first
+        use and kept in sync afterwards, in O(log n + k) time.
+
+        Args:
+            first: One connector the cable must have: an EthernetAlphaType or EthernetBetaType member, or
+                "male"/"female".
+            second: The connector the cable must have at its other end.
+            minSpeed (EthernetSpeed): The slowest acceptable speed, or None for any speed.
+            minLength (float): The shortest acceptable length.
+            limit (int): The maximum number of cables to return, or None for all of them.
+
+        Returns:
+            list: The matching cables with a positive quantity, shortest adequate length first.
+
+        Raises:
+            ValueError: If a connector or the speed is invalid.
+        """
+        if self.cableIndex is None:
+            self._buildCableIndex()
+        return self.cableIndex.compatible(first, second, minSpeed, minLength, limit)
+
+    def _buildCableIndex(self):
+        """
+        Build the cable compatibility index and start keeping it in sync.
+        """
+        if self.cableIndex is None:
+            cableIndex = CableIndex(self)
+            cableIndex.attach()
+            self.cableIndex = cableIndex
+
+    def nearestColors(self, color, k=1, displayType=None, minLength=None, inStock=True):
+        """
+        Find the display cables whose colors are closest to a color (e.g., the closest stocked HDMI cable to
+        "#1a1a1a").
+
+        Colors are compared by Euclidean distance in RGB space. The query is answered by a ColorIndex, built on
+        first use and kept in sync afterwards, which only examines cables with nearby colors.
+
+        Args:
+            color: The color, as "#RGB"/"#RRGGBB" or a packed 0xRRGGBB integer.
+            k (int): The number of cables to return.
+            displayType (DisplayType): Only consider cables of this type; None considers every type.
+            minLength (float): Only consider cables at least this long; None for any length.
+            inStock (bool): Only consider cables with a positive quantity.
+
+        Returns:
+            list: Up to k display cables, closest color first.
+
+        Raises:
+            ValueError: If the color is not in hexadecimal format.
+        """
+        if self.colorIndex is None:
+            self._buildColorIndex()
+        return self.colorIndex.nearest(color, k, displayType, minLength, inStock)
+
+    def _buildColorIndex(self):
+        """
+        Build the display cable color index and start keeping it in sync.
+        """
+        if self.colorIndex is None:
+            colorIndex = ColorIndex(self)
+            colorIndex.attach()
+            self.colorIndex = colorIndex
+
+    def solveResistance(self, target, tolerance=1, maxResistors=MAX_RESISTORS, limit=5):
+        """
+        Find series/parallel networks of stocked resistors that come closest to a target resistance (e.g., 150 ohms
+        from 100 + 47 when there is no 150 ohm resistor).
+
+        The query is answered by a ResistorSolver, built on first use, which keeps sorted tables of the stocked
+        values and of every pair of them per inventory version and caches its results until a resistor changes.
+
+        Args:
+            target (float): The target resistance in ohms.
+            tolerance (float): The tolerance in percent: networks must be within it of the target, and only
+                resistors with this tolerance or better are used.
+            maxResistors (int): The most resistors in a network, from 1 to 3.
+            limit (int): The maximum number of networks to return.
+
+        Returns:
+            list: Up to limit ResistorNetwork instances the stocked quantities can build, closest first.
+
+        Raises:
+            ValueError: If the target, tolerance or number of resistors is invalid.
+        """
+        if self.resistorSolver is None:
+            self._buildResistorSolver()
+        return self.resistorSolver.solve(target, tolerance, maxResistors, limit)
+
+    def _buildResistorSolver(self):
+        """
+        Build the resistor network solver and start following resistor changes.
+        """
+        if self.resistorSolver is None:
+            resistorSolver = ResistorSolver(self)
+            resistorSolver.attach()
+            self.resistorSolver = resistorSolver
+
+    def planCuts(self, pieces, gauge=None, solderType=None, kerf=0, exact=False, timeBudget=1.0):
+        """
+        Plan cutting pieces out of the stocked spools of one wire gauge or one solder type with as little waste
+        as possible (see optimizeCuts). Each unit of a part's quantity is a spool of its length.
+
+        Args:
+            pieces: The piece lengths required, as a list of lengths or a {length: count} dict.
+            gauge (float): Cut from the Wire parts of this gauge.
+            solderType (SolderType): Cut from the Solder parts of this type.
+            kerf (float): The length lost to each cut.
+            exact (bool): Search for an optimal plan within the time budget after the fast heuristics.
+            timeBudget (float): The most seconds the exact search may take.
+
+        Returns:
+            CutPlan: The spools to cut, with the pieces and leftover of each, and any pieces that did not fit.
+
+        Raises:
+            ValueError: If neither or both of gauge and solderType are given, or a piece length is invalid.
+        """
+        if (gauge is None) == (solderType is None):
+            raise ValueError("Error, Specify either a wire gauge or a solder type.")
+        if gauge is not None:
+            spools = [part for part in self.inventory.values() if isinstance(part, Wire) and part.gauge == gauge]
+        else:
+            spools = [part for part in self.inventory.values() if isinstance(part, Solder) and part.solder_type == solderType]
+        return optimizeCuts(spools, pieces, kerf, exact, timeBudget)
+
     def getPart(self, sku):
         """
         Get a specific part from the inventory.
@@ -96,25 +500,126 @@ class InventoryManager:
         """
         Search for parts in the inventory based on certain criteria.
 
+        A criterion is either an exact match (resistance=100) or a comparison written as the attribute name,
+        a double underscore and an operator: lt, lte, gt, gte, ne or between (e.g., length__gte=120 or
+        resistance__between=(90, 110), where both bounds are inclusive).
+
         Args:
             part_class (class): The class of the part to search for (e.g., Resistor, Solder).
             **kwargs: Keyword arguments representing search criteria (e.g., resistance=100 for searching resistors with resistance 100).
 
         Returns:
             list: A list of parts matching the search criteria.
+
+        Raises:
+            ValueError: If a criterion uses an unknown operator.
         """
+        criteria = self._parseCriteria(kwargs)
+        cache = self.searchCache
+        key = cache.key(part_class, kwargs) if cache is not None else None
+        if key is None:
+            return self._search(part_class, criteria)
+        results = cache.get(key)
+        if results is None:
+            start = time.perf_counter()
+            results = self._search(part_class, criteria)
+            cache.put(key, {attribute for attribute, _, _ in criteria}, results, time.perf_counter() - start)
+        return results
+
+    def _search(self, part_class, criteria):
+        """
+        Run a search with parsed criteria against the indexes or the whole inventory, bypassing the cache.
+        """
+        candidates = self._indexCandidates(part_class, criteria)
+        if candidates is None:
+            candidates = self.inventory.values()
+        checks = _compileCriteria(criteria)
         results = []
-        for sku, part in self.inventory.items():
+        for part in candidates:
             if isinstance(part, part_class):
-                match = True
-                for key, value in kwargs.items():
-                    if not hasattr(part, key) or getattr(part, key) != value:
-                        match = False
+                for getter, compare, value in checks:
+                    try:
+                        if not compare(getter(part), value):
+                            break
+                    except (AttributeError, TypeError):  # Missing attribute or incomparable value
                         break
-                if match:
+                else:
                     results.append(part)
+        if self.instrumentation is not None:
+            self.instrumentation.recordScan(part_class, len(candidates), len(results))
         return results
 
+    @staticmethod
+    def _parseCriteria(kwargs):
+        """
+        Split search keyword arguments into (attribute, operator, value) triples.
+
+        Args:
+            kwargs (dict): The keyword arguments passed to search.
+
+        Returns:
+            list: The parsed criteria.
+
+        Raises:
+            ValueError: If a criterion uses an unknown operator.
+        """
+        criteria = []
+        for key, value in kwargs.items():
+            attribute, sep, op = key.rpartition("__")
+            if not sep or not attribute:
+                attribute, op = key, "eq"
+            elif op not in _OPERATORS:
+                raise ValueError(f"Unknown search operator '{op}' in '{key}'.")
+            criteria.append((attribute, op, value))
+        return criteria
+
+    def _indexCandidates(self, part_class, criteria):
+        """
+        Pick the smallest index slice that can answer one of the search criteria.
+
+        An index created for part_class or one of its base classes can be used for a criterion on its attribute.
+        Hash indexes answer exact matches; sorted indexes answer exact matches and comparisons.
+
+        Args:
+            part_class (class): The class of the part being searched for.
+            criteria (list): The parsed search criteria.
+
+        Returns:
+            iterable: A superset of the matching parts, or None if no index applies.
+        """
+        if not (self.indexes or self.sortedIndexes) or not criteria:
+            return None
+        best = None
+        best_size = None
+        for attribute, op, value in criteria:
+            for base in part_class.__mro__:
+                index = self.indexes.get((base, attribute)) if op == "eq" else None
+                if index is not None:
+                    try:
+                        bucket = index.get(value, {})
+                    except TypeError:  # Unhashable criterion, fall back to a scan
+                        break
+                    if best is None or len(bucket) < best_size:
+                        best, best_size = bucket.values(), len(bucket)
+                    break
+                entries = self.sortedIndexes.get((base, attribute))
+                if entries is not None and op != "ne":
+                    try:
+                        lo, hi = _sortedRange(entries, op, value)
+                    except TypeError:  # Criterion not comparable with the indexed values
+                        break
+                    if best is None or hi - lo < best_size:
+                        best, best_size = self._sortedSlice(entries, lo, hi), hi - lo
+                    break
+        return best
+
+    def _sortedSlice(self, entries, lo, hi):
+        """
+        Resolve a slice of a sorted index into the parts it refers to, in ascending attribute order.
+        """
+        inventory = self.inventory
+        return [inventory[sku] for _, sku in entries[lo:hi]]
+
     def deletePart(self, sku):
         """
         Delete a part from the inventory.
@@ -126,6 +631,383 @@ class InventoryManager:
             ValueError: If the part with the specified SKU is not found in the inventory.
         """
         if sku in self.inventory:
-            del self.inventory[sku]
+            self._untrackPart(sku, self.inventory.pop(sku))
         else:
             raise ValueError("Error, Part not found in inventory.")
+
+    def deleteParts(self, skus):
+        """
+        Delete many parts from the inventory in one pass.
+
+        Sorted indexes are filtered once for the whole batch rather than once per part. Missing SKUs are
+        reported instead of raising, and do not stop the other parts from being deleted.
+
+        Args:
+            skus (iterable): The SKUs of the parts to delete.
+
+        Returns:
+            list: One (position, sku, message) tuple per SKU that was not found, where position is the SKU's
+            index in skus. The list is empty if every part was deleted.
+        """
+        failures = []
+        inventory = self.inventory
+        sortedRemoved = set()
+        for position, sku in enumerate(skus):
+            part = inventory.pop(sku, None)
+            if part is None:
+                failures.append((position, sku, "Error, Part not found in inventory."))
+            else:
+                self._untrackPart(sku, part, sortedRemoved)
+        self._flushSortedRemoved(sortedRemoved)
+        return failures
+
+    def createIndex(self, part_class, attribute):
+        """
+        Create a secondary hash index on an attribute of a part class.
+
+        Once created, the index is kept in sync by addPart, deletePart and direct attribute assignment on the
+        indexed parts, and search uses it automatically when the attribute is one of its criteria.
+
+        Args:
+            part_class (class): The class of the parts to index (e.g., Resistor). Subclasses are included.
+            attribute (str): The name of the attribute to index (e.g., "resistance").
+        """
+        key = (part_class, attribute)
+        if key in self.indexes:
+            return
+        index = self.indexes[key] = {}
+        for sku, part in self.inventory.items():
+            if isinstance(part, part_class):
+                value = getattr(part, attribute, _MISSING)
+                if value is not _MISSING:
+                    index.setdefault(value, {})[sku] = part
+
+    def dropIndex(self, part_class, attribute):
+        """
+        Remove a secondary index.
+
+        Args:
+            part_class (class): The class the index was created for.
+            attribute (str): The indexed attribute.
+
+        Raises:
+            ValueError: If no such index exists.
+        """
+        if (part_class, attribute) in self.indexes:
+            del self.indexes[(part_class, attribute)]
+        else:
+            raise ValueError("Error, Index not found.")
+
+    def createSortedIndex(self, part_class, attribute):
+        """
+        Create a sorted index on a numeric attribute of a part class.
+
+        Sorted indexes let search answer comparison criteria such as length__gte=120 or
+        resistance__between=(90, 110) in O(log n + k) time instead of scanning the whole inventory.
+        They are kept in sync the same way as hash indexes.
+
+        Args:
+            part_class (class): The class of the parts to index (e.g., Wire). Subclasses are included.
+            attribute (str): The name of the numeric attribute to index (e.g., "length").
+        """
+        key = (part_class, attribute)
+        if key in self.sortedIndexes:
+            return
+        entries = []
+        for sku, part in self.inventory.items():
+            if isinstance(part, part_class):
+                value = getattr(part, attribute, _MISSING)
+                if value is not _MISSING and value is not None:
+                    entries.append((value, sku))
+        entries.sort()
+        self.sortedIndexes[key] = entries
+
+    def dropSortedIndex(self, part_class, attribute):
+        """
+        Remove a sorted index.
+
+        Args:
+            part_class (class): The class the index was created for.
+            attribute (str): The indexed attribute.
+
+        Raises:
+            ValueError: If no such index exists.
+        """
+        if (part_class, attribute) in self.sortedIndexes:
+            del self.sortedIndexes[(part_class, attribute)]
+        else:
+            raise ValueError("Error, Index not found.")
+
+    def enableSearchCache(self, maxSize=1024, ttl=None):
+        """
+        Cache search results so repeated searches are answered without scanning.
+
+        Cached results are invalidated precisely as the inventory changes (see SearchCache), so searches keep
+        returning the same parts as they would without the cache. Calling this again replaces the cache.
+
+        Args:
+            maxSize (int): The maximum number of cached searches; the least recently used are evicted first.
+            ttl (float): The number of seconds a cached search stays valid, or None for no expiry.
+
+        Returns:
+            SearchCache: The new cache, whose stats() reports hits, misses, evictions and saved time.
+        """
+        self.disableSearchCache()
+        self.searchCache = SearchCache(maxSize, ttl)
+        self.addListener(self.searchCache)
+        return self.searchCache
+
+    def disableSearchCache(self):
+        """
+        Stop caching search results and discard the cache.
+        """
+        if self.searchCache is not None:
+            self.removeListener(self.searchCache)
+            self.searchCache = None
+
+    def enableInstrumentation(self):
+        """
+        Start recording call counts, latency histograms and search scan counts for this inventory.
+
+        Calling this again replaces the instrumentation and its metrics. When instrumentation is disabled the
+        inventory runs uninstrumented code, so it costs nothing.
+
+        Returns:
+            Instrumentation: The new instrumentation, whose stats(), exportText() and startProfiler() report
+            on the inventory.
+        """
+        self.disableInstrumentation()
+        self.instrumentation = Instrumentation(self)
+        self.instrumentation.attach()
+        return self.instrumentation
+
+    def disableInstrumentation(self):
+        """
+        Stop recording metrics and stop the profiler, if running.
+        """
+        if self.instrumentation is not None:
+            self.instrumentation.detach()
+            self.instrumentation = None
+
+    def enableStockWatch(self):
+        """
+        Start tracking reorder thresholds and low-stock parts for this inventory.
+
+        Thresholds are set on the returned StockWatch (setThreshold per SKU, setClassThreshold per part class).
+        Calling this again returns the existing watch.
+
+        Returns:
+            StockWatch: The watch, whose belowThreshold() lists low-stock parts and whose subscribe() registers
+            a callback for threshold crossings.
+        """
+        if self.stockWatch is None:
+            self.stockWatch = StockWatch(self)
+            self.stockWatch.attach()
+        return self.stockWatch
+
+    def disableStockWatch(self):
+        """
+        Stop tracking reorder thresholds and discard them.
+        """
+        if self.stockWatch is not None:
+            self.stockWatch.detach()
+            self.stockWatch = None
+
+    def enableChangeFeed(self, maxEntries=None, retention=None, compactionRatio=2.0, timeIndex=True):
+        """
+        Start logging changes so consumers can pull deltas with changesSince instead of full exports.
+
+        Calling this again returns the existing feed.
+
+        Args:
+            maxEntries (int): The maximum number of SKUs with a retained change, or None for no limit.
+            retention (float): The number of seconds a change is retained, or None for no limit.
+            compactionRatio (float): How many superseded log entries are tolerated per retained change before
+                the log is compacted.
+            timeIndex (bool): Whether to keep a sorted index over last_updated, used by updatedSince.
+
+        Returns:
+            ChangeFeed: The feed.
+        """
+        if self.changeFeed is None:
+            self.changeFeed = ChangeFeed(self, maxEntries, retention, compactionRatio)
+            self.changeFeed.attach(timeIndex)
+        return self.changeFeed
+
+    def disableChangeFeed(self):
+        """
+        Stop logging changes and discard the log.
+        """
+        if self.changeFeed is not None:
+            self.changeFeed.detach()
+            self.changeFeed = None
+
+    def enableRollups(self):
+        """
+        Start keeping declared aggregate rollups (counts, quantity totals, min/max) up to date for this inventory.
+
+        Rollups are declared on the returned object, e.g. rollups.declare("cablesByType", DisplayCable,
+        "cable_type"), and read with rollups["cablesByType"].get(DisplayType.HDMI). Calling this again returns
+        the existing rollups.
+
+        Returns:
+            Rollups: The rollups.
+        """
+        if self.rollups is None:
+            self.rollups = Rollups(self)
+            self.rollups.attach()
+        return self.rollups
+
+    def disableRollups(self):
+        """
+        Stop updating rollups and discard them.
+        """
+        if self.rollups is not None:
+            self.rollups.detach()
+            self.rollups = None
+
+    def transaction(self):
+        """
+        Start an all-or-nothing stock transaction.
+
+        Stage reserve, commit and release operations over any number of SKUs on the returned transaction, then
+        call its execute method. Reserved stock stays in the part's quantity but cannot be reserved again until
+        it is released; committing withdraws it. Quantities and reservations never go negative, and a
+        transaction fails with TransactionConflict if another transaction changed one of its parts first.
+
+        Returns:
+            Transaction: A new, empty transaction.
+        """
+        if self.stockLedger is None:
+            with _LEDGER_LOCK:
+                if self.stockLedger is None:
+                    stockLedger = StockLedger(self)
+                    stockLedger.attach()
+                    self.stockLedger = stockLedger
+        return self.stockLedger.transaction()
+
+    def addListener(self, listener):
+        """
+        Register a callback to be notified of changes to the inventory.
+
+        The callback is called as listener(event, part, name, old, new), where event is "add" when a part is
+        stored, "delete" when it is removed and "update" when one of its attributes changes (including
+        quantity and last_updated). name, old and new describe the attribute change and are None for
+        "add" and "delete".
+
+        Args:
+            listener (callable): The callback to register.
+        """
+        if listener not in self.listeners:
+            self.listeners.append(listener)
+
+    def removeListener(self, listener):
+        """
+        Unregister a callback previously registered with addListener.
+
+        Args:
+            listener (callable): The callback to remove.
+        """
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def _trackPart(self, sku, part, sortedPending=None):
+        """
+        Register a newly stored part with the secondary indexes and start watching it for changes.
+
+        If sortedPending is given, sorted index entries are collected into it, keyed by index, instead of being
+        inserted one at a time; the caller merges them with _flushSortedPending.
+        """
+        if self.indexes or self.sortedIndexes:
+            self._indexPart(sku, part, sortedPending)
+        part.addWatcher(self._onPartChanged)
+        for listener in self.listeners:
+            listener("add", part, None, None, None)
+
+    def _indexPart(self, sku, part, sortedPending):
+        """
+        Add a part to every secondary index that covers its class.
+        """
+        for (part_class, attribute), index in self.indexes.items():
+            if isinstance(part, part_class):
+                value = getattr(part, attribute, _MISSING)
+                if value is not _MISSING:
+                    index.setdefault(value, {})[sku] = part
+        for (part_class, attribute), entries in self.sortedIndexes.items():
+            if isinstance(part, part_class):
+                value = getattr(part, attribute, _MISSING)
+                if value is not _MISSING and value is not None:
+                    if sortedPending is None:
+                        insort(entries, (value, sku))
+                    else:
+                        sortedPending.setdefault((part_class, attribute), []).append((value, sku))
+
+    def _untrackPart(self, sku, part, sortedRemoved=None):
+        """
+        Remove a part that is leaving the inventory from the secondary indexes and stop watching it.
+
+        If sortedRemoved is given, the SKU is added to that set instead of being removed from each sorted index;
+        the caller then filters the sorted indexes once with _flushSortedRemoved.
+        """
+        part.removeWatcher(self._onPartChanged)
+        for (part_class, attribute), index in self.indexes.items():
+            if isinstance(part, part_class):
+                value = getattr(part, attribute, _MISSING)
+                if value is not _MISSING:
+                    self._removeFromIndex(index, value, sku)
+        if sortedRemoved is not None:
+            sortedRemoved.add(sku)
+        else:
+            for (part_class, attribute), entries in self.sortedIndexes.items():
+                if isinstance(part, part_class):
+                    _removeFromSorted(entries, getattr(part, attribute, _MISSING), sku)
+        for listener in self.listeners:
+            listener("delete", part, None, None, None)
+
+    def _flushSortedPending(self, sortedPending):
+        """
+        Merge sorted index entries collected by _trackPart into their indexes with one sort per index.
+        """
+        for key, pending in sortedPending.items():
+            entries = self.sortedIndexes[key]
+            entries.extend(pending)
+            entries.sort()
+
+    def _flushSortedRemoved(self, sortedRemoved):
+        """
+        Drop the SKUs collected by _untrackPart from every sorted index in a single pass per index.
+        """
+        if sortedRemoved:
+            for entries in self.sortedIndexes.values():
+                entries[:] = [entry for entry in entries if entry[1] not in sortedRemoved]
+
+    def _onPartChanged(self, part, name, old, new):
+        """
+        Watcher callback that moves a part between index buckets when an indexed attribute is reassigned,
+        then forwards the change to the inventory listeners.
+        """
+        if old != new and (self.indexes or self.sortedIndexes):
+            sku = part.sku
+            for (part_class, attribute), index in self.indexes.items():
+                if attribute == name and isinstance(part, part_class):
+                    if old is not _MISSING:
+                        self._removeFromIndex(index, old, sku)
+                    index.setdefault(new, {})[sku] = part
+            for (part_class, attribute), entries in self.sortedIndexes.items():
+                if attribute == name and isinstance(part, part_class):
+                    _removeFromSorted(entries, old, sku)
+                    if new is not None:
+                        insort(entries, (new, sku))
+        for listener in self.listeners:
+            listener("update", part, name, old, new)
+
+    @staticmethod
+    def _removeFromIndex(index, value, sku):
+        """
+        Remove a SKU from one bucket of an index, dropping the bucket once it is empty.
+        """
+        bucket = index.get(value)
+        if bucket is not None:
+            bucket.pop(sku, None)
+            if not bucket:
+                del index[value]
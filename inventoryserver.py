@@ -0,0 +1,286 @@
+import argparse
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from itertools import islice
+from concurrentinventory import ConcurrentInventoryManager
+from inventoryio import coerceCriteria, partFromRow, partRow, partType
+from inventoryjournal import InventoryJournal
+
+class InventoryServer:
+    """
+    An asyncio server exposing an InventoryManager over a JSON Lines protocol.
+
+    Each request is one JSON object per line with an "op" and, optionally, an "id" that is echoed in the
+    response. Responses are JSON objects {"id", "ok", "result"} or {"id", "ok": false, "error"}, written in
+    request order. Supported operations:
+
+        addPart       {"part": {"type": "Resistor", "sku": 1, "resistance": 100, "tolerance": 5}}
+        addInventory  {"sku": 1, "quantity": 10}
+        getPart       {"sku": 1}
+        getQuantity   {"sku": 1}
+        view          {"after": 0, "limit": 1000} (parts in SKU order after SKU "after"; or {"offset": 0, ...})
+        search        {"type": "Resistor", "criteria": {"resistance__between": [90, 110]}}
+        deletePart    {"sku": 1}
+
+    Clients may pipeline requests. Up to maxPipeline requests per connection are processed concurrently; beyond
+    that the server stops reading from the connection, so TCP flow control pushes back on the client. Scans
+    (view and search) run on a thread pool and changes (addPart, addInventory, deletePart) on a single writer
+    thread, so the event loop keeps serving other clients while they wait for locks or journal syncs. Within a
+    connection, a change waits for the requests before it and a read waits for the changes before it, so every
+    response reflects the requests sent before it.
+
+    Attributes:
+        inventoryManager (ConcurrentInventoryManager): The inventory being served.
+        maxPipeline (int): The maximum number of in-flight requests per connection.
+        viewLimit (int): The maximum number of parts returned by one view request.
+    """
+
+    def __init__(self, inventoryManager=None, maxPipeline=64, scanWorkers=4, viewLimit=1000):
+        """
+        Initializes a new instance of the InventoryServer class.
+
+        Args:
+            inventoryManager (ConcurrentInventoryManager): The inventory to serve; a new one is created if omitted.
+            maxPipeline (int): The maximum number of in-flight requests per connection.
+            scanWorkers (int): The number of threads that run view and search requests.
+            viewLimit (int): The maximum number of parts returned by one view request.
+        """
+        self.inventoryManager = inventoryManager if inventoryManager is not None else ConcurrentInventoryManager()
+        self.maxPipeline = maxPipeline
+        self.viewLimit = viewLimit
+        self._executor = ThreadPoolExecutor(max_workers=scanWorkers)
+        self._writer = ThreadPoolExecutor(max_workers=1)
+        self._changes = {
+            "addPart": self._addPart,
+            "addInventory": self._addInventory,
+            "deletePart": self._deletePart,
+        }
+        self._operations = {
+            "getPart": self._getPart,
+            "getQuantity": self._getQuantity,
+        }
+        self._scans = {
+            "view": self._view,
+            "search": self._search,
+        }
+
+    async def start(self, host="127.0.0.1", port=8765, path=None):
+        """
+        Start listening on a TCP port, or on a Unix socket if path is given.
+
+        Returns:
+            asyncio.AbstractServer: The listening server.
+        """
+        if path is not None:
+            return await asyncio.start_unix_server(self.handleConnection, path=path)
+        return await asyncio.start_server(self.handleConnection, host, port)
+
+    def close(self):
+        """
+        Shut down the scan thread pool and the writer thread.
+        """
+        self._executor.shutdown(wait=True)
+        self._writer.shutdown(wait=True)
+
+    async def handleConnection(self, reader, writer):
+        """
+        Serve one client connection until it closes.
+
+        Args:
+            reader (asyncio.StreamReader): The connection's reader.
+            writer (asyncio.StreamWriter): The connection's writer.
+        """
+        pending = asyncio.Queue(maxsize=self.maxPipeline)
+        connection = {"change": None, "reads": []}  # The connection's last change and the reads since it
+        sender = asyncio.ensure_future(self._sendResponses(pending, writer))
+        try:
+            while not sender.done():
+                try:
+                    line = await reader.readline()
+                except (ValueError, ConnectionError):  # Line too long or connection reset
+                    break
+                if not line:
+                    break
+                if line.strip():
+                    await pending.put(asyncio.ensure_future(self.handleRequest(line, connection)))
+            if not sender.done():
+                await pending.put(None)
+            await sender
+        except asyncio.CancelledError:
+            # Server shutdown: drop the connection quietly rather than failing the handler task
+            sender.cancel()
+        finally:
+            writer.close()
+
+    async def _sendResponses(self, pending, writer):
+        """
+        Write responses in request order, waiting for the socket to drain so slow readers apply backpressure.
+        """
+        try:
+            while True:
+                response = await pending.get()
+                if response is None:
+                    return
+                writer.write(await response)
+                await writer.drain()
+        except ConnectionError:
+            while not pending.empty():
+                response = pending.get_nowait()
+                if response is not None:
+                    response.cancel()
+
+    async def handleRequest(self, line, connection=None):
+        """
+        Process one request line.
+
+        Any error, including an unexpected one, is reported in the response so the connection and the requests
+        pipelined after it are unaffected.
+
+        Args:
+            line (bytes): The JSON-encoded request.
+            connection (dict): The ordering state of the request's connection; None for a standalone request.
+
+        Returns:
+            bytes: The JSON-encoded response line.
+        """
+        if connection is None:
+            connection = {"change": None, "reads": []}
+        loop = asyncio.get_running_loop()
+        done = loop.create_future()
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("Invalid request.")
+            request_id = request.get("id")
+            op = request.get("op")
+            if op in self._changes:
+                # Wait for everything before it on the connection, then run on the writer thread
+                earlier = [future for future in [connection["change"]] + connection["reads"] if future is not None]
+                connection["change"] = done
+                connection["reads"] = []
+                if earlier:
+                    await asyncio.wait(earlier)
+                result = await loop.run_in_executor(self._writer, self._changes[op], request)
+            elif op in self._operations or op in self._scans:
+                # Wait for the connection's last change only, so reads still run concurrently
+                connection["reads"] = [future for future in connection["reads"] if not future.done()] + [done]
+                change = connection["change"]
+                if change is not None and not change.done():
+                    await asyncio.wait([change])
+                if op in self._operations:
+                    result = self._operations[op](request)
+                else:
+                    result = await loop.run_in_executor(self._executor, self._scans[op], request)
+            else:
+                raise ValueError(f"Unknown operation {op!r}.")
+            response = {"id": request_id, "ok": True, "result": result}
+        except KeyError as error:
+            response = {"id": request_id, "ok": False, "error": f"Missing field {error}."}
+        except Exception as error:
+            response = {"id": request_id, "ok": False, "error": str(error) or type(error).__name__}
+        finally:
+            done.set_result(None)
+        return (json.dumps(response, default=str) + "\n").encode()
+
+    def _addPart(self, request):
+        """
+        Handle addPart: build the part from its row and store it.
+        """
+        if not isinstance(request["part"], dict):
+            raise ValueError("Invalid part.")
+        self.inventoryManager.addPart(partFromRow(request["part"], datetime.now()))
+        return None
+
+    def _addInventory(self, request):
+        """
+        Handle addInventory.
+        """
+        self.inventoryManager.addInventory(request["sku"], request["quantity"])
+        return None
+
+    def _getPart(self, request):
+        """
+        Handle getPart: return the part as a row.
+        """
+        return partRow(self.inventoryManager.getPart(request["sku"]))
+
+    def _getQuantity(self, request):
+        """
+        Handle getQuantity.
+        """
+        return self.inventoryManager.getQuantity(request["sku"])
+
+    def _deletePart(self, request):
+        """
+        Handle deletePart.
+        """
+        self.inventoryManager.deletePart(request["sku"])
+        return None
+
+    def _view(self, request):
+        """
+        Handle view: return one page of parts as rows. Runs on the scan thread pool.
+
+        With "after", the page holds the parts in SKU order after that SKU, read from the sorted SKU index; the
+        client passes the SKU of the last row to get the next page. Otherwise the page starts at "offset".
+        """
+        limit = min(int(request.get("limit", self.viewLimit)), self.viewLimit)
+        if "after" in request:
+            after = request["after"]
+            parts, _ = self.inventoryManager.listParts("sku", after=None if after is None else (after, after), limit=limit)
+            return [partRow(part) for part in parts]
+        offset = int(request.get("offset", 0))
+        parts = self.inventoryManager.getInventory().values()
+        return [partRow(part) for part in islice(parts, offset, offset + limit)]
+
+    def _search(self, request):
+        """
+        Handle search: coerce the criteria to field types and return the matches as rows.
+        Runs on the scan thread pool.
+        """
+        part_class = partType(request.get("type"))
+        criteria = coerceCriteria(part_class, request.get("criteria") or {})
+        return [partRow(part) for part in self.inventoryManager.search(part_class, **criteria)]
+
+async def serve(host, port, path=None, dataDirectory=None):
+    """
+    Run an InventoryServer until cancelled.
+
+    Args:
+        host (str): The TCP host to listen on.
+        port (int): The TCP port to listen on.
+        path (str): A Unix socket path to listen on instead of TCP.
+        dataDirectory (str): Optional directory in which the inventory is persisted.
+    """
+    inventoryManager = ConcurrentInventoryManager()
+    journal = InventoryJournal(inventoryManager, dataDirectory) if dataDirectory else None
+    server = InventoryServer(inventoryManager)
+    listener = await server.start(host, port, path)
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        server.close()
+        if journal is not None:
+            journal.close()
+
+def main():
+    """
+    Command-line entry point for the inventory server.
+    """
+    parser = argparse.ArgumentParser(description="Serve the inventory over a JSON Lines protocol.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="listen on this Unix socket path instead of TCP")
+    parser.add_argument("--data", help="directory in which the inventory is persisted")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix, args.data))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,11 @@
+import argparse
 from datetime import datetime
 from enumtypes import *
 from partcharacteristics import *
 from inventorymanager import *
+from inventoryjournal import *
+from sqliteinventory import SqliteInventoryManager
+from parttypes import *
 
 def displayMenu():
     """
@@ -15,43 +19,37 @@ def displayMenu():
     print("5. Delete Part")
     print("6. Exit")
 
+def _partTypeNames():
+    """
+    Get the registered part type names for prompts (e.g., "Resistor/Solder/Wire/Display Cable/Ethernet Cable").
+    """
+    return "/".join(part_type.name for part_type in registeredPartTypes())
+
 def addPart(inventoryManager):
     """
     Adds a new part to the inventory.
 
+    The fields asked for depend on the part type, as described by the part type registry.
+
     Args:
         inventoryManager (InventoryManager): An instance of the InventoryManager class.
     """
     sku = int(input("Enter SKU: "))
-    part_type = input("Enter Part Type (Resistor/Solder/Wire/Display Cable/Ethernet Cable): ").lower()
-
-    if part_type == "resistor":
-        resistance = int(input("Enter Resistance (Ohms): "))
-        tolerance = int(input("Enter Tolerance (%): "))
-        part = Resistor(sku=sku, last_updated=datetime.now(), resistance=resistance, tolerance=tolerance)
-    elif part_type == "solder":
-        solder_type = input("Enter Solder Type (Lead/Lead-Free/Rosin-Core/Acid-Core): ")
-        length = float(input("Enter Length (inches): "))
-        part = Solder(sku=sku, last_updated=datetime.now(), solder_type=SolderType[solder_type.upper()], length=length)
-    elif part_type == "wire":
-        gauge = float(input("Enter Gauge: "))
-        length = float(input("Enter Length (inches): "))
-        part = Wire(sku=sku, last_updated=datetime.now(), gauge=gauge, length=length)
-    elif part_type == "display cable":
-        cable_type = input("Enter Cable Type (HDMI/VGA/DISPLAYPORT/MICRO HDMI): ")
-        length = float(input("Enter Length (inches): "))
-        color = input("Enter Color (Hexadecimal format, e.g., #RRGGBB): ")
-        part = DisplayCable(sku=sku, last_updated=datetime.now(), cable_type=DisplayType[cable_type.upper()], length=length, color=color)
-    elif part_type == "ethernet cable":
-        alpha_type = input("Enter Alpha Type (MALE/FEMALE): ")
-        beta_type = input("Enter Beta Type (MALE/FEMALE): ")
-        speed = input("Enter Speed (10MBPS/100MBPS/1GBPS/10GBPS): ")
-        length = float(input("Enter Length (inches): "))
-        part = EthernetCable(sku=sku, last_updated=datetime.now(), alpha_type=EthernetAlphaType[alpha_type.upper()], beta_type=EthernetBetaType[beta_type.upper()], speed=EthernetSpeed[speed.upper()], length=length)
-    else:
+    try:
+        part_type = lookupPartType(input(f"Enter Part Type ({_partTypeNames()}): "))
+    except ValueError:
         print("Invalid part type.")
         return
 
+    values = {}
+    for field in part_type.fields:
+        values[field.name] = input(f"Enter {field.prompt}: ")
+    try:
+        part = part_type.part_class(sku, datetime.now(), *part_type.parseFields(values))
+    except ValueError as e:
+        print(f"Invalid value: {e}.")
+        return
+
     inventoryManager.addPart(part)
     print("Part added successfully.")
 
@@ -70,42 +68,70 @@ def addInventory(inventoryManager):
     except ValueError as e:
         print(e)
 
-def viewInventory(inventoryManager):
+def viewInventory(inventoryManager, pageSize=20):
     """
-    Displays the current inventory.
+    Displays the current inventory one page at a time.
+
+    Pages are read with InventoryManager.listParts, so the first page is shown immediately however large the
+    inventory is.
 
     Args:
         inventoryManager (InventoryManager): An instance of the InventoryManager class.
+        pageSize (int): The number of parts shown per page.
     """
-    inventory = inventoryManager.getInventory()
-    if not inventory:
+    orderBy = input("Order by (sku/quantity/last_updated) [sku]: ").strip().lower() or "sku"
+    try:
+        parts, cursor = inventoryManager.listParts(orderBy, limit=pageSize)
+    except ValueError as e:
+        print(e)
+        return
+    if not parts:
         print("Inventory is empty.")
-    else:
-        print("\nCurrent Inventory:")
-        for sku, part in inventory.items():
-            print(f"SKU: {sku}, Part: {part.__class__.__name__}, Quantity: {part.quantity}")
+        return
+    print("\nCurrent Inventory:")
+    while True:
+        for part in parts:
+            print(f"SKU: {part.getSku()}, Part: {part.__class__.__name__}, Quantity: {part.quantity}")
+        if cursor is None or input("Show more? (y/n): ").strip().lower() != "y":
+            break
+        parts, cursor = inventoryManager.listParts(orderBy, after=cursor, limit=pageSize)
 
 def searchParts(inventoryManager):
     """
     Searches for parts based on user-specified criteria.
 
+    Criteria are comma-separated attribute=value pairs, and the values are converted to the types of the part's
+    fields, so resistance=100 matches resistors of 100 ohms. Comparisons use the search operator syntax
+    (e.g., length__gte=120).
+
     Args:
         inventoryManager (InventoryManager): An instance of the InventoryManager class.
     """
-    partType = input("Enter Part Type (Resistor/Solder/Wire/Display Cable/Ethernet Cable): ")
+    partType = input(f"Enter Part Type ({_partTypeNames()}): ")
     criteria = input("Enter Search Criteria (e.g., resistance=100 for resistors): ")
     try:
-        partClass = globals()[partType]
-        criteriaDict = dict([criteria.split("=")])
-        results = inventoryManager.search(partClass, **criteriaDict)
-        if results:
-            print("\nSearch Results:")
-            for result in results:
-                print(result)
-        else:
-            print("No matching parts found.")
-    except KeyError:
+        part_type = lookupPartType(partType)
+    except ValueError:
         print("Invalid part type.")
+        return
+    try:
+        criteriaDict = {}
+        for criterion in criteria.split(","):
+            if criterion.strip():
+                if "=" not in criterion:
+                    raise ValueError(f"expected attribute=value, got {criterion.strip()!r}")
+                key, value = criterion.split("=", 1)
+                criteriaDict[key.strip()] = value.strip()
+        results = inventoryManager.search(part_type.part_class, **part_type.coerceCriteria(criteriaDict))
+    except ValueError as e:
+        print(f"Invalid search criteria: {e}")
+        return
+    if results:
+        print("\nSearch Results:")
+        for result in results:
+            print(result)
+    else:
+        print("No matching parts found.")
 
 def deletePart(inventoryManager):
     """
@@ -121,12 +147,37 @@ def deletePart(inventoryManager):
     except ValueError as e:
         print(e)
 
-def main():
+def main(dataDirectory=None, database=None):
     """
     Main function to run the inventory management system.
+
+    Args:
+        dataDirectory (str): Optional directory in which the inventory is persisted across restarts.
+        database (str): Optional SQLite database file to keep the inventory in instead, so it can also be
+            queried with SQL.
     """
+    if database:
+        inventoryManager = SqliteInventoryManager(database)
+        try:
+            runMenu(inventoryManager)
+        finally:
+            inventoryManager.close()
+        return
     inventoryManager = InventoryManager()
+    journal = InventoryJournal(inventoryManager, dataDirectory) if dataDirectory else None
+    try:
+        runMenu(inventoryManager)
+    finally:
+        if journal is not None:
+            journal.close()
+
+def runMenu(inventoryManager):
+    """
+    Runs the interactive menu loop until the user exits.
 
+    Args:
+        inventoryManager (InventoryManager): An instance of the InventoryManager class.
+    """
     while True:
         displayMenu()
         choice = input("Enter your choice: ")
@@ -148,4 +199,10 @@ def main():
             print("Invalid choice. Please try again.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Manage the electronic parts inventory.")
+    parser.add_argument("dataDirectory", nargs="?", help="directory in which the inventory is persisted across restarts")
+    parser.add_argument("--sqlite", metavar="FILE", help="keep the inventory in this SQLite database instead")
+    args = parser.parse_args()
+    if args.dataDirectory and args.sqlite:
+        parser.error("a data directory and --sqlite cannot be used together")
+    main(args.dataDirectory, args.sqlite)
\ No newline at end of file
@@ -0,0 +1,315 @@
+import mmap
+import os
+import struct
+from collections.abc import Mapping
+from inventorymanager import InventoryManager, _OPERATORS
+from partcodec import *
+from partcodec import _PART_CODES
+
+_MAGIC = b"INVMAP01"
+_HEADER = struct.Struct("<8sIQQ")  # magic, table count, SKU count, directory offset
+_TABLE = struct.Struct("<BIHQ")  # part class code, row count, layout length, records offset
+_ENTRY = struct.Struct("<qHI")  # SKU, table number, row number
+
+def writeMappedSnapshot(inventoryManager, path):
+    """
+    Write the inventory to a fixed-width snapshot file that MappedInventory can open.
+
+    The file holds one table of fixed-width records per part class and value layout (see partcodec.fixedBlocks),
+    followed by a directory of (sku, table, row) entries sorted by SKU. The file is written next to path and
+    renamed over it, so processes that still have the previous snapshot open keep reading a consistent copy.
+
+    Args:
+        inventoryManager (InventoryManager): The inventory to write.
+        path (str): The snapshot file to create or replace.
+
+    Raises:
+        ValueError: If a part has a non-integer SKU or a value that does not fit a fixed-width column.
+    """
+    blocks, tagged = fixedBlocks(inventoryManager.inventory.values())
+    if tagged:
+        raise ValueError(f"Error, Part {tagged[0].getSku()} cannot be stored in a fixed-width snapshot.")
+    entries = []
+    for table, (_, _, skus, _) in enumerate(blocks):
+        for sku in skus:
+            if not isinstance(sku, int):  # Big ints were tagged above; the directory needs 64-bit SKUs
+                raise ValueError(f"Error, Part {sku} does not have an integer SKU.")
+        entries.extend((sku, table, row) for row, sku in enumerate(skus))
+    entries.sort()
+    headers = sum(_TABLE.size + len(layout) for _, layout, _, _ in blocks)
+    directory_offset = _HEADER.size + headers
+    offset = directory_offset + len(entries) * _ENTRY.size
+    with open(path + ".tmp", "wb") as snapshot:
+        snapshot.write(_HEADER.pack(_MAGIC, len(blocks), len(entries), directory_offset))
+        for part_class, layout, skus, payload in blocks:
+            snapshot.write(_TABLE.pack(_PART_CODES[part_class], len(skus), len(layout), offset))
+            snapshot.write(layout.encode())
+            offset += len(payload)
+        snapshot.write(b"".join(_ENTRY.pack(*entry) for entry in entries))
+        for _, _, _, payload in blocks:
+            snapshot.write(payload)
+        snapshot.flush()
+        os.fsync(snapshot.fileno())
+    os.replace(path + ".tmp", path)
+
+class _MappedTable:
+    """
+    The records of one part class and value layout inside a mapped snapshot.
+    """
+
+    def __init__(self, part_class, rows, layout, offset):
+        self.part_class = part_class
+        self.rows = rows
+        self.record = struct.Struct(layoutFormat(layout))
+        self.offset = offset
+        self.fields = partFields(part_class)
+        self.columns = {"sku": 0, "last_updated": 1, "quantity": 2}
+        for column, field in enumerate(self.fields, start=3):
+            self.columns[field] = column
+        self.decoders = dict(columnDecoders(layout))
+
+    def part(self, values):
+        """
+        Materialize the part stored in an unpacked record.
+        """
+        values = list(values)
+        for column, decoder in self.decoders.items():
+            values[column] = decoder(values[column])
+        return restorePart(self.part_class, values[0], values[1], values[2], zip(self.fields, values[3:]))
+
+class MappedInventory:
+    """
+    A read-only, InventoryManager-compatible view of a snapshot written by writeMappedSnapshot.
+
+    The snapshot is memory-mapped rather than loaded, so opening it takes constant time and processes that open
+    the same file share its pages through the operating system's page cache. getPart and getQuantity binary
+    search the SKU directory; search scans the fixed-width records of the matching classes and only builds
+    Part objects for the matches. Parts returned by the view are fresh copies, so changing them has no effect
+    on the snapshot.
+
+    Attributes:
+        inventory (Mapping): A read-only mapping from SKU to part, decoded on access.
+    """
+
+    def __init__(self, path):
+        """
+        Initializes a new instance of the MappedInventory class.
+
+        Args:
+            path (str): The snapshot file to open.
+
+        Raises:
+            ValueError: If the file is not a mapped inventory snapshot.
+        """
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, table_count, self._count, self._directory = _HEADER.unpack_from(self._map, 0)
+            if magic != _MAGIC:
+                raise ValueError("Error, Not an inventory snapshot.")
+            self._tables = []
+            offset = _HEADER.size
+            for _ in range(table_count):
+                code, rows, layout_length, records = _TABLE.unpack_from(self._map, offset)
+                offset += _TABLE.size
+                layout = self._map[offset:offset + layout_length].decode()
+                offset += layout_length
+                self._tables.append(_MappedTable(PART_CLASSES[code], rows, layout, records))
+        except Exception:
+            self._file.close()
+            raise
+        self.inventory = _MappedMapping(self)
+
+    def close(self):
+        """
+        Unmap the snapshot and close the file.
+        """
+        self._map.close()
+        self._file.close()
+
+    def addPart(self, part):
+        """
+        Not supported: the snapshot is read-only.
+
+        Raises:
+            ValueError: Always.
+        """
+        raise ValueError("Error, Inventory snapshot is read-only.")
+
+    def addInventory(self, sku, quantity):
+        """
+        Not supported: the snapshot is read-only.
+
+        Raises:
+            ValueError: Always.
+        """
+        raise ValueError("Error, Inventory snapshot is read-only.")
+
+    def deletePart(self, sku):
+        """
+        Not supported: the snapshot is read-only.
+
+        Raises:
+            ValueError: Always.
+        """
+        raise ValueError("Error, Inventory snapshot is read-only.")
+
+    def getQuantity(self, sku):
+        """
+        Get the quantity of a specific part in the snapshot.
+
+        Args:
+            sku (int): The SKU (Stock Keeping Unit) of the part.
+
+        Returns:
+            int: The quantity of the part in the snapshot.
+
+        Raises:
+            ValueError: If the part with the specified SKU is not found in the snapshot.
+        """
+        location = self._locate(sku)
+        if location is None:
+            raise ValueError("Part not found in inventory.")
+        table, row = location
+        return table.record.unpack_from(self._map, table.offset + row * table.record.size)[2]
+
+    def getInventory(self):
+        """
+        Get the entire inventory.
+
+        Returns:
+            Mapping: A read-only mapping from SKU to part, ordered by SKU.
+        """
+        return self.inventory
+
+    def getPart(self, sku):
+        """
+        Get a specific part from the snapshot.
+
+        Args:
+            sku (int): The SKU (Stock Keeping Unit) of the part.
+
+        Returns:
+            Part: A copy of the part with the specified SKU.
+
+        Raises:
+            ValueError: If the part with the specified SKU is not found in the snapshot.
+        """
+        location = self._locate(sku)
+        if location is None:
+            raise ValueError("Error, Part not found in inventory.")
+        table, row = location
+        return table.part(table.record.unpack_from(self._map, table.offset + row * table.record.size))
+
+    def search(self, part_class, **kwargs):
+        """
+        Search for parts in the snapshot based on certain criteria.
+
+        Args:
+            part_class (class): The class of the part to search for (e.g., Resistor, Solder).
+            **kwargs: Search criteria, as accepted by InventoryManager.search.
+
+        Returns:
+            list: A list of parts matching the search criteria.
+
+        Raises:
+            ValueError: If a criterion uses an unknown operator, or an attribute that no class of the searched
+                parts stores (such as the derived DisplayCable.rgb).
+        """
+        criteria = InventoryManager._parseCriteria(kwargs)
+        stored = {"sku", "last_updated", "quantity"}
+        for stored_class in PART_CLASSES:
+            if issubclass(stored_class, part_class):
+                stored.update(partFields(stored_class))
+        for attribute, _, _ in criteria:
+            if attribute not in stored:
+                raise ValueError(f"Unknown search attribute '{attribute}' in a snapshot.")
+        results = []
+        for table in self._tables:
+            if not issubclass(table.part_class, part_class):
+                continue
+            checks = []
+            for attribute, op, value in criteria:
+                column = table.columns.get(attribute)
+                if column is None:
+                    checks = None
+                    break
+                checks.append((column, table.decoders.get(column), _OPERATORS[op], value))
+            if checks is None:
+                continue
+            size = table.record.size
+            with memoryview(self._map) as view:
+                records = view[table.offset:table.offset + table.rows * size]
+                for values in table.record.iter_unpack(records):
+                    for column, decoder, compare, value in checks:
+                        actual = values[column] if decoder is None else decoder(values[column])
+                        try:
+                            if not compare(actual, value):
+                                break
+                        except TypeError:
+                            break
+                    else:
+                        results.append(table.part(values))
+                records.release()
+        return results
+
+    def _locate(self, sku):
+        """
+        Binary search the SKU directory.
+
+        Returns:
+            tuple: (table, row) for the SKU, or None if it is not in the snapshot.
+        """
+        data = self._map
+        directory = self._directory
+        lo, hi = 0, self._count
+        try:
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if _ENTRY.unpack_from(data, directory + mid * _ENTRY.size)[0] < sku:
+                    lo = mid + 1
+                else:
+                    hi = mid
+        except TypeError:  # Not an integer SKU
+            return None
+        if lo == self._count:
+            return None
+        key, table, row = _ENTRY.unpack_from(data, directory + lo * _ENTRY.size)
+        if key != sku:
+            return None
+        return self._tables[table], row
+
+    def _entries(self):
+        """
+        Iterate over the (sku, table, row) directory entries in SKU order.
+        """
+        data = self._map
+        directory = self._directory
+        for index in range(self._count):
+            key, table, row = _ENTRY.unpack_from(data, directory + index * _ENTRY.size)
+            yield key, self._tables[table], row
+
+class _MappedMapping(Mapping):
+    """
+    The read-only SKU to part mapping of a MappedInventory.
+    """
+
+    def __init__(self, mapped):
+        self._mapped = mapped
+
+    def __getitem__(self, sku):
+        location = self._mapped._locate(sku)
+        if location is None:
+            raise KeyError(sku)
+        table, row = location
+        return table.part(table.record.unpack_from(self._mapped._map, table.offset + row * table.record.size))
+
+    def __contains__(self, sku):
+        return self._mapped._locate(sku) is not None
+
+    def __iter__(self):
+        for sku, _, _ in self._mapped._entries():
+            yield sku
+
+    def __len__(self):
+        return self._mapped._count
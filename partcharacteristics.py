@@ -1,16 +1,46 @@
 import re
 from enumtypes import *
 
+_MISSING = object()
+
+_COLOR_FORMAT = re.compile(r'^#(?:[0-9a-fA-F]{3}){1,2}$')
+
+def parseColor(color):
+    """
+    Convert a "#RGB" or "#RRGGBB" color to a packed 0xRRGGBB integer.
+
+    Args:
+        color (str): The color in hexadecimal format.
+
+    Returns:
+        int: The packed color, with red in the high byte.
+
+    Raises:
+        ValueError: If the color is not in hexadecimal format.
+    """
+    if not isinstance(color, str) or not _COLOR_FORMAT.match(color):
+        raise ValueError("Invalid color format")
+    digits = color[1:7]
+    if len(digits) == 3:
+        digits = "".join(digit * 2 for digit in digits)
+    return int(digits, 16)
+
 class Part:
     """
     A base class representing a generic part.
 
+    Parts use __slots__ instead of a per-instance __dict__ to keep large inventories compact. The SKU and the
+    last updated timestamp are each stored once and exposed both through the getter/setter methods and the
+    sku/last_updated attributes.
+
     Attributes:
         sku (int): The Stock Keeping Unit (SKU) of the part.
         last_updated (datetime): The timestamp indicating the last update time of the part.
         quantity (int): The quantity of the part in inventory.
     """
 
+    __slots__ = ("__sku", "__last_updated", "__watchers", "quantity")
+
     def __init__(self, sku, last_updated):
         """
         Initializes a new instance of the Part class.
@@ -19,10 +49,102 @@ class Part:
             sku (int): The Stock Keeping Unit (SKU) of the part.
             last_updated (datetime): The timestamp indicating the last update time of the part.
         """
+        object.__setattr__(self, "_Part__watchers", None)
         self.__sku = sku  # Make sku private
         self.__last_updated = last_updated  # Make last_updated private
         self.quantity = 0
 
+    def __setattr__(self, name, value):
+        """
+        Set an attribute and notify any registered watchers of the change.
+
+        Args:
+            name (str): The name of the attribute being set.
+            value: The new value of the attribute.
+        """
+        watchers = self.__watchers
+        if not watchers:
+            object.__setattr__(self, name, value)
+            return
+        old = getattr(self, name, _MISSING)
+        object.__setattr__(self, name, value)
+        for watcher in watchers:
+            watcher(self, name, old, value)
+
+    def __getstate__(self):
+        """
+        Collect the slot values of the part for pickling and copying, leaving out watchers.
+
+        Returns:
+            tuple: (None, dict of slot names to values), the state format used for slotted objects.
+        """
+        state = {}
+        for cls in type(self).__mro__:
+            for name in cls.__dict__.get("__slots__", ()):
+                if name.startswith("__"):
+                    name = f"_{cls.__name__}{name}"
+                if name != "_Part__watchers" and hasattr(self, name):
+                    state[name] = getattr(self, name)
+        return None, state
+
+    def __setstate__(self, state):
+        """
+        Restore a part from the state produced by __getstate__.
+
+        Args:
+            state (tuple): (None, dict of slot names to values).
+        """
+        object.__setattr__(self, "_Part__watchers", None)
+        for name, value in state[1].items():
+            object.__setattr__(self, name, value)
+
+    @property
+    def sku(self):
+        """
+        int: The Stock Keeping Unit (SKU) of the part.
+        """
+        return self.__sku
+
+    @sku.setter
+    def sku(self, sku):
+        object.__setattr__(self, "_Part__sku", sku)
+
+    @property
+    def last_updated(self):
+        """
+        datetime: The timestamp indicating the last update time of the part.
+        """
+        return self.__last_updated
+
+    @last_updated.setter
+    def last_updated(self, last_updated):
+        object.__setattr__(self, "_Part__last_updated", last_updated)
+
+    def addWatcher(self, watcher):
+        """
+        Register a callback to be notified when an attribute of the part changes.
+
+        Args:
+            watcher (callable): Called as watcher(part, name, old_value, new_value) after each change.
+                old_value is _MISSING if the attribute did not exist before.
+        """
+        watchers = self.__watchers
+        if watchers is None:
+            object.__setattr__(self, "_Part__watchers", [watcher])
+        elif watcher not in watchers:
+            watchers.append(watcher)
+
+    def removeWatcher(self, watcher):
+        """
+        Unregister a callback previously registered with addWatcher.
+
+        Args:
+            watcher (callable): The callback to remove.
+        """
+        watchers = self.__watchers
+        if watchers and watcher in watchers:
+            watchers.remove(watcher)
+
     # Getter methods for private variables
     def getSku(self):
         """
@@ -50,7 +172,7 @@ class Part:
         Args:
             sku (int): The Stock Keeping Unit (SKU) to set.
         """
-        self.__sku = sku
+        self.sku = sku
 
     def setLastUpdated(self, last_updated):
         """
@@ -59,7 +181,7 @@ class Part:
         Args:
             last_updated (datetime): The timestamp indicating the last update time of the part.
         """
-        self.__last_updated = last_updated
+        self.last_updated = last_updated
 
 class Resistor(Part):
     """
@@ -70,6 +192,8 @@ class Resistor(Part):
         tolerance (int): The tolerance level of the resistor in percentage.
     """
 
+    __slots__ = ("resistance", "tolerance")
+
     def __init__(self, sku, last_updated, resistance: int, tolerance: int):
         """
         Initializes a new instance of the Resistor class.
@@ -81,7 +205,6 @@ class Resistor(Part):
             tolerance (int): The tolerance level of the resistor in percentage.
         """
         super().__init__(sku, last_updated)
-        self.sku = sku
         self.resistance = resistance
         self.tolerance = tolerance
 
@@ -94,6 +217,8 @@ class Solder(Part):
         length (float): The length of the solder in inches.
     """
 
+    __slots__ = ("solder_type", "length")
+
     def __init__(self, sku, last_updated, solder_type: SolderType, length: float):
         """
         Initializes a new instance of the Solder class.
@@ -105,7 +230,6 @@ class Solder(Part):
             length (float): The length of the solder in inches.
         """
         super().__init__(sku, last_updated)
-        self.sku=sku
         self.solder_type = solder_type
         self.length = length
 
@@ -118,6 +242,8 @@ class Wire(Part):
         length (float): The length of the wire in inches.
     """
 
+    __slots__ = ("gauge", "length")
+
     def __init__(self, sku, last_updated, gauge: float, length: float):
         """
         Initializes a new instance of the Wire class.
@@ -140,9 +266,12 @@ class DisplayCable(Part):
         cable_type (DisplayType): The type of display cable.
         length (float): The length of the display cable in inches.
         color (str): The color of the display cable in hexadecimal format.
+        rgb (int): The color packed as a 0xRRGGBB integer, kept in sync with color.
     """
 
-    def __init__(self, sku, last_updated, cable_type: DisplayType, length: float, color):
+    __slots__ = ("cable_type", "length", "_color", "_rgb")
+
+    def __init__(self, sku, last_updated, cable_type: DisplayType, length: float, color: str):
         """
         Initializes a new instance of the DisplayCable class.
 
@@ -156,10 +285,32 @@ class DisplayCable(Part):
         super().__init__(sku, last_updated)
         self.cable_type = cable_type
         self.length = length
-        if not re.match(r'^#(?:[0-9a-fA-F]{3}){1,2}$', color):
-            raise ValueError("Invalid color format")
         self.color = color
 
+    @property
+    def color(self):
+        """
+        str: The color of the display cable in hexadecimal format, as given.
+        """
+        return self._color
+
+    @color.setter
+    def color(self, color):
+        rgb = parseColor(color)  # Validates the format
+        old = getattr(self, "_rgb", _MISSING)
+        object.__setattr__(self, "_color", color)
+        object.__setattr__(self, "_rgb", rgb)
+        # rgb is derived, so watchers get its change here; the color change follows from Part.__setattr__
+        for watcher in self._Part__watchers or ():
+            watcher(self, "rgb", old, rgb)
+
+    @property
+    def rgb(self):
+        """
+        int: The color packed as a 0xRRGGBB integer.
+        """
+        return self._rgb
+
 class EthernetCable(Part):
     """
     A class representing an ethernet cable part, inheriting from Part.
@@ -171,7 +322,9 @@ class EthernetCable(Part):
         length (float): The length of the ethernet cable in inches.
     """
 
-    def __init__(self, sku, last_updated, alpha_type: EthernetAlphaType, beta_type: EthernetBetaType, speed: EthernetSpeed, length):
+    __slots__ = ("alpha_type", "beta_type", "speed", "length")
+
+    def __init__(self, sku, last_updated, alpha_type: EthernetAlphaType, beta_type: EthernetBetaType, speed: EthernetSpeed, length: float):
         """
         Initializes a new instance of the EthernetCable class.
 
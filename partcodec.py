@@ -0,0 +1,489 @@
+import inspect
+import struct
+from datetime import datetime, timedelta
+from enumtypes import *
+from partcharacteristics import *
+
+# Stable codes used by the binary formats. Append new classes at the end; never reorder.
+PART_CLASSES = (Resistor, Solder, Wire, DisplayCable, EthernetCable)
+ENUM_CLASSES = (EthernetAlphaType, EthernetBetaType, EthernetSpeed, DisplayType, SolderType)
+
+_PART_CODES = {part_class: code for code, part_class in enumerate(PART_CLASSES)}
+_ENUM_CODES = {member: (code, index) for code, enum_class in enumerate(ENUM_CLASSES) for index, member in enumerate(enum_class)}
+_ENUM_MEMBERS = [list(enum_class) for enum_class in ENUM_CLASSES]
+# Enum members hash in Python code; keying by identity keeps bulk encoding in C
+_ENUM_INDEXES = {id(member): index for (member, (code, index)) in _ENUM_CODES.items()}
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+_INT = struct.Struct("<q")
+_FLOAT = struct.Struct("<d")
+_LENGTH = struct.Struct("<I")
+_ENUM = struct.Struct("<BB")
+_PART_HEADER = struct.Struct("<B")
+
+_INT_MIN = -(1 << 63)
+_INT_MAX = (1 << 63) - 1
+
+_fieldCache = {}
+
+def partFields(part_class):
+    """
+    Get the names of the type-specific fields of a part class, in constructor order.
+
+    Args:
+        part_class (class): A Part subclass.
+
+    Returns:
+        tuple: The constructor parameter names following sku and last_updated.
+    """
+    fields = _fieldCache.get(part_class)
+    if fields is None:
+        parameters = list(inspect.signature(part_class.__init__).parameters)
+        fields = _fieldCache[part_class] = tuple(parameters[3:])
+    return fields
+
+def encodeValue(value, out):
+    """
+    Append the tagged binary encoding of a value to a buffer.
+
+    Supported values are None, bool, int, float, str, datetime and members of the enums in enumtypes.py.
+
+    Args:
+        value: The value to encode.
+        out (bytearray): The buffer to append to.
+
+    Raises:
+        ValueError: If the value has an unsupported type.
+    """
+    if value is None:
+        out += b"n"
+    elif value is True or value is False:
+        out += b"b\x01" if value else b"b\x00"
+    elif isinstance(value, int):
+        if _INT_MIN <= value <= _INT_MAX:
+            out += b"i"
+            out += _INT.pack(value)
+        else:
+            data = str(value).encode()
+            out += b"I"
+            out += _LENGTH.pack(len(data))
+            out += data
+    elif isinstance(value, float):
+        out += b"f"
+        out += _FLOAT.pack(value)
+    elif isinstance(value, str):
+        data = value.encode()
+        out += b"s"
+        out += _LENGTH.pack(len(data))
+        out += data
+    elif isinstance(value, datetime):
+        if value.tzinfo is None:
+            out += b"t"
+            out += _INT.pack((value - _EPOCH) // _MICROSECOND)
+        else:
+            data = value.isoformat().encode()
+            out += b"T"
+            out += _LENGTH.pack(len(data))
+            out += data
+    elif value in _ENUM_CODES:
+        out += b"e"
+        out += _ENUM.pack(*_ENUM_CODES[value])
+    else:
+        raise ValueError(f"Cannot encode value of type {type(value).__name__}.")
+
+def decodeValue(data, offset):
+    """
+    Decode one tagged value produced by encodeValue.
+
+    Args:
+        data (bytes): The buffer to read from.
+        offset (int): The position of the value's tag.
+
+    Returns:
+        tuple: (value, offset just past the value).
+
+    Raises:
+        ValueError: If the tag is unknown.
+    """
+    tag = data[offset]
+    offset += 1
+    if tag == 0x69:  # i
+        return _INT.unpack_from(data, offset)[0], offset + 8
+    if tag == 0x65:  # e
+        code, index = _ENUM.unpack_from(data, offset)
+        return _ENUM_MEMBERS[code][index], offset + 2
+    if tag == 0x66:  # f
+        return _FLOAT.unpack_from(data, offset)[0], offset + 8
+    if tag == 0x74:  # t
+        return _EPOCH + timedelta(microseconds=_INT.unpack_from(data, offset)[0]), offset + 8
+    if tag == 0x6E:  # n
+        return None, offset
+    if tag == 0x62:  # b
+        return data[offset] == 1, offset + 1
+    if tag in (0x73, 0x49, 0x54):  # s, I, T
+        length = _LENGTH.unpack_from(data, offset)[0]
+        offset += 4
+        text = bytes(data[offset:offset + length]).decode()
+        offset += length
+        if tag == 0x73:
+            return text, offset
+        if tag == 0x49:
+            return int(text), offset
+        return datetime.fromisoformat(text), offset
+    raise ValueError(f"Unknown value tag {tag!r}.")
+
+def encodePart(part, out):
+    """
+    Append the binary encoding of a part (class, SKU, timestamp, quantity and fields) to a buffer.
+
+    Args:
+        part (Part): A part whose class is in PART_CLASSES.
+        out (bytearray): The buffer to append to.
+
+    Raises:
+        ValueError: If the part's class or one of its values cannot be encoded.
+    """
+    part_class = type(part)
+    if part_class not in _PART_CODES:
+        raise ValueError(f"Cannot encode part of type {part_class.__name__}.")
+    out += _PART_HEADER.pack(_PART_CODES[part_class])
+    encodeValue(part.getSku(), out)
+    encodeValue(part.getLastUpdated(), out)
+    encodeValue(part.quantity, out)
+    for field in partFields(part_class):
+        encodeValue(getattr(part, field), out)
+
+def decodePart(data, offset):
+    """
+    Decode one part produced by encodePart.
+
+    Args:
+        data (bytes): The buffer to read from.
+        offset (int): The position of the part's encoding.
+
+    Returns:
+        tuple: (part, offset just past the part).
+
+    Raises:
+        ValueError: If the encoding is invalid.
+    """
+    part_class = PART_CLASSES[data[offset]]
+    offset += 1
+    sku, offset = decodeValue(data, offset)
+    last_updated, offset = decodeValue(data, offset)
+    quantity, offset = decodeValue(data, offset)
+    values = []
+    for _ in partFields(part_class):
+        value, offset = decodeValue(data, offset)
+        values.append(value)
+    part = part_class(sku, last_updated, *values)
+    part.quantity = quantity
+    return part, offset
+
+_BLOCK_HEADER = struct.Struct("<BBIH")
+_UNSIGNED = struct.Struct("<I")
+_FIXED_BLOCK = 0
+_TAGGED_BLOCK = 1
+
+def _typeKind(value_type):
+    """
+    Classify a value type for the fixed-width block layout: "i" (int), "f" (float), "b" (bool), "t" (datetime),
+    "s" (str) or "e" followed by the enum class code.
+
+    Returns:
+        str: The column kind, or None if values of this type can only be stored in a tagged block.
+    """
+    if value_type is bool:
+        return "b"
+    if value_type is int:
+        return "i"
+    if value_type is float:
+        return "f"
+    if value_type is datetime:
+        return "t"
+    if value_type is str:
+        return "s"
+    if value_type in _ENUM_CLASS_SET:
+        return f"e{ENUM_CLASSES.index(value_type)}"
+    return None
+
+def _fitsColumn(kind, value):
+    """
+    Check the per-value limits of a fixed-width column: 64-bit ints, naive datetimes and strings without NUL.
+    """
+    if kind == "i":
+        return _INT_MIN <= value <= _INT_MAX
+    if kind == "t":
+        return value.tzinfo is None
+    return "\x00" not in value
+
+_ENUM_CLASS_SET = frozenset(ENUM_CLASSES)
+_KIND_FORMATS = {"i": "q", "f": "d", "b": "?", "t": "q"}
+
+def _partRow(part):
+    """
+    Get the stored values of a part as a row: SKU, last updated timestamp, quantity, then its fields.
+    """
+    return [part.getSku(), part.getLastUpdated(), part.quantity] + [getattr(part, field) for field in partFields(type(part))]
+
+def encodeParts(parts):
+    """
+    Encode many parts into a compact block format.
+
+    Parts of the same class whose values have the same types are grouped into a block of fixed-width struct
+    records (see fixedBlocks). Parts with values that do not fit a fixed-width column are stored in a tagged
+    block using encodePart.
+
+    Args:
+        parts (iterable): The parts to encode; every part's class must be in PART_CLASSES.
+
+    Returns:
+        bytes: The encoded blocks.
+
+    Raises:
+        ValueError: If a part or one of its values cannot be encoded.
+    """
+    blocks, tagged = fixedBlocks(parts)
+    tagged_groups = {}
+    for part in tagged:
+        tagged_groups.setdefault(type(part), []).append(part)
+    out = bytearray()
+    out += _UNSIGNED.pack(len(blocks) + len(tagged_groups))
+    for part_class, layout, skus, payload in blocks:
+        _writeBlock(out, part_class, _FIXED_BLOCK, len(skus), layout, payload)
+    for part_class, group in tagged_groups.items():
+        payload = bytearray()
+        for part in group:
+            encodePart(part, payload)
+        _writeBlock(out, part_class, _TAGGED_BLOCK, len(group), "", payload)
+    return bytes(out)
+
+def fixedBlocks(parts):
+    """
+    Group parts into blocks of fixed-width struct records.
+
+    Each block holds parts of one class whose values have the same types. A record holds the SKU, the last
+    updated timestamp as epoch microseconds, the quantity and the type-specific fields, with enum members stored
+    as one-byte codes and strings padded to the longest one in the block. The block layout, such as
+    "i,t,i,e4,f", names the kind of each column (see layoutFormat).
+
+    Args:
+        parts (iterable): The parts to group; every part's class must be in PART_CLASSES.
+
+    Returns:
+        tuple: (blocks, tagged), where blocks is a list of (part_class, layout, skus, payload) tuples, with skus
+        listing the SKU of each record in order, and tagged lists the parts whose values do not fit a fixed-width
+        column (big ints, aware datetimes, None and other types).
+
+    Raises:
+        ValueError: If a part's class is not in PART_CLASSES.
+    """
+    groups = {}
+    tagged = []
+    signatures = {}
+    for part in parts:
+        part_class = type(part)
+        row = _partRow(part)
+        key = (part_class, tuple(map(type, row)))
+        signature = signatures.get(key)
+        if signature is None:
+            if part_class not in _PART_CODES:
+                raise ValueError(f"Cannot encode part of type {part_class.__name__}.")
+            kinds = tuple(_typeKind(value_type) for value_type in key[1])
+            checks = tuple((column, kind) for column, kind in enumerate(kinds) if kind in ("i", "t", "s"))
+            signature = signatures[key] = (None if None in kinds else (part_class, kinds), checks)
+        group, checks = signature
+        if group is not None:
+            for column, kind in checks:
+                if not _fitsColumn(kind, row[column]):
+                    group = None
+                    break
+        if group is None:
+            tagged.append(part)
+        else:
+            groups.setdefault(group, []).append(row)
+    blocks = []
+    for (part_class, kinds), rows in groups.items():
+        widths = {}
+        for column, kind in enumerate(kinds):
+            if kind == "s":
+                widths[column] = max(len(row[column].encode()) for row in rows)
+        layout = ",".join(f"s{widths[column]}" if kind == "s" else kind for column, kind in enumerate(kinds))
+        encoders = _columnEncoders(layout)
+        record = struct.Struct(layoutFormat(layout))
+        payload = bytearray()
+        for row in rows:
+            for column, encoder in encoders:
+                row[column] = encoder(row[column])
+            payload += record.pack(*row)
+        blocks.append((part_class, layout, [row[0] for row in rows], bytes(payload)))
+    return blocks, tagged
+
+def decodeParts(data):
+    """
+    Decode parts produced by encodeParts.
+
+    Args:
+        data (bytes): The encoded blocks.
+
+    Returns:
+        list: The decoded parts, grouped by block.
+
+    Raises:
+        ValueError: If the encoding is invalid.
+    """
+    parts = []
+    for part_class, block_kind, count, layout, payload in iterBlocks(data):
+        if block_kind == _TAGGED_BLOCK:
+            offset = 0
+            for _ in range(count):
+                part, offset = decodePart(payload, offset)
+                parts.append(part)
+            continue
+        decoders = columnDecoders(layout)
+        fields = partFields(part_class)
+        for row in struct.iter_unpack(layoutFormat(layout), payload):
+            row = list(row)
+            for column, decoder in decoders:
+                row[column] = decoder(row[column])
+            parts.append(restorePart(part_class, row[0], row[1], row[2], zip(fields, row[3:])))
+    return parts
+
+def restorePart(part_class, sku, last_updated, quantity, fields):
+    """
+    Rebuild a part from previously stored values without going through its constructor.
+
+    The values are trusted to come from a part that was validated when it was first created, so constructor
+    checks (such as the DisplayCable color format) are skipped to keep bulk loading fast.
+
+    Args:
+        part_class (class): The class of the part.
+        sku (int): The SKU of the part.
+        last_updated (datetime): The last updated timestamp of the part.
+        quantity (int): The quantity of the part.
+        fields (iterable): (name, value) pairs for the type-specific fields.
+
+    Returns:
+        Part: The rebuilt part.
+    """
+    part = _new(part_class)
+    _set(part, "_Part__watchers", None)
+    _set(part, "_Part__sku", sku)
+    _set(part, "_Part__last_updated", last_updated)
+    _set(part, "quantity", quantity)
+    for name, value in fields:
+        _set(part, name, value)
+    return part
+
+_new = object.__new__
+_set = object.__setattr__
+
+def iterBlocks(data, offset=0):
+    """
+    Iterate over the blocks produced by encodeParts.
+
+    Args:
+        data (bytes): The encoded blocks; any buffer, including an mmap, is accepted.
+        offset (int): The position of the block count.
+
+    Yields:
+        tuple: (part_class, block_kind, row_count, layout, payload) for each block. payload is a memoryview.
+    """
+    view = memoryview(data)
+    (block_count,) = _UNSIGNED.unpack_from(view, offset)
+    offset += _UNSIGNED.size
+    for _ in range(block_count):
+        code, block_kind, count, layout_length = _BLOCK_HEADER.unpack_from(view, offset)
+        offset += _BLOCK_HEADER.size
+        layout = bytes(view[offset:offset + layout_length]).decode()
+        offset += layout_length
+        (payload_length,) = _UNSIGNED.unpack_from(view, offset)
+        offset += _UNSIGNED.size
+        if code >= len(PART_CLASSES) or block_kind not in (_FIXED_BLOCK, _TAGGED_BLOCK):
+            raise ValueError("Invalid part block.")
+        yield PART_CLASSES[code], block_kind, count, layout, view[offset:offset + payload_length]
+        offset += payload_length
+
+def _writeBlock(out, part_class, block_kind, count, layout, payload):
+    layout = layout.encode()
+    out += _BLOCK_HEADER.pack(_PART_CODES[part_class], block_kind, count, len(layout))
+    out += layout
+    out += _UNSIGNED.pack(len(payload))
+    out += payload
+
+def layoutFormat(layout):
+    """
+    Translate a block layout into a struct format string.
+
+    Column kinds are "i" (64-bit int), "f" (double), "b" (bool), "t" (naive datetime as epoch microseconds),
+    "e" plus an enum class code (one-byte member index) and "s" plus a width (NUL-padded UTF-8 string).
+
+    Args:
+        layout (str): The comma-separated column kinds, e.g. "i,t,i,e4,f".
+
+    Returns:
+        str: The little-endian struct format.
+    """
+    formats = []
+    for kind in layout.split(","):
+        if kind[0] == "e":
+            formats.append("B")
+        elif kind[0] == "s":
+            formats.append(f"{kind[1:]}s")
+        else:
+            formats.append(_KIND_FORMATS[kind])
+    return "<" + "".join(formats)
+
+def _encodeTimestamp(value):
+    return (value - _EPOCH) // _MICROSECOND
+
+def _encodeEnum(value):
+    return _ENUM_INDEXES[id(value)]
+
+def _columnEncoders(layout):
+    """
+    Get the (column, converter) pairs that turn row values into struct fields for a block layout.
+    """
+    encoders = []
+    for column, kind in enumerate(layout.split(",")):
+        if kind == "t":
+            encoders.append((column, _encodeTimestamp))
+        elif kind[0] == "e":
+            encoders.append((column, _encodeEnum))
+        elif kind[0] == "s":
+            encoders.append((column, str.encode))
+    return encoders
+
+def columnDecoders(layout):
+    """
+    Get the (column, converter) pairs that turn unpacked struct fields back into row values for a block layout.
+
+    Args:
+        layout (str): The block layout.
+
+    Returns:
+        list: (column, converter) pairs, applied in order to a list of unpacked fields.
+    """
+    decoders = []
+    timestamps = {}
+
+    def decodeTimestamp(value):
+        # Parts written together usually share a timestamp, so share the decoded datetime as well
+        decoded = timestamps.get(value)
+        if decoded is None:
+            decoded = timestamps[value] = _EPOCH + timedelta(microseconds=value)
+        return decoded
+
+    for column, kind in enumerate(layout.split(",")):
+        if kind == "t":
+            decoders.append((column, decodeTimestamp))
+        elif kind[0] == "e":
+            decoders.append((column, _ENUM_MEMBERS[int(kind[1:])].__getitem__))
+        elif kind[0] == "s":
+            decoders.append((column, _decodeString))
+    return decoders
+
+def _decodeString(value):
+    return value.rstrip(b"\x00").decode()
@@ -0,0 +1,284 @@
+import typing
+from datetime import datetime
+from enum import Enum
+from enumtypes import *
+from partcharacteristics import *
+from partcodec import partFields
+
+def _typeKey(name):
+    return name.replace(" ", "").replace("_", "").replace("-", "").lower()
+
+def _parseInt(value):
+    if isinstance(value, str):
+        return int(value)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"invalid integer {value!r}")
+    if value != int(value):
+        raise ValueError(f"invalid integer {value!r}")
+    return int(value)
+
+def _parseFloat(value):
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        raise ValueError(f"invalid number {value!r}")
+    return float(value)
+
+def _parseStr(value):
+    if not isinstance(value, str):
+        raise ValueError(f"invalid text {value!r}")
+    return value
+
+def _parseTimestamp(value):
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(_parseStr(value))
+
+def _enumParser(enum_class):
+    """
+    Build a parser accepting an enum member, its value or its name, ignoring case, spaces, dashes and underscores
+    (e.g., "1gbps", "_1GBPS", "Lead-Free" or "micro hdmi").
+    """
+    members = {}
+    for member in enum_class:
+        members[_typeKey(member.name)] = member
+        members[_typeKey(str(member.value))] = member
+    names = ", ".join(str(member.value) for member in enum_class)
+
+    def parseEnum(value):
+        if isinstance(value, enum_class):
+            return value
+        member = members.get(_typeKey(str(value).strip()))
+        if member is None:
+            raise ValueError(f"invalid {enum_class.__name__} {value!r} (expected one of {names})")
+        return member
+    return parseEnum
+
+def _fieldParser(annotation):
+    if annotation is int:
+        return _parseInt
+    if annotation is float:
+        return _parseFloat
+    if isinstance(annotation, type) and issubclass(annotation, Enum):
+        return _enumParser(annotation)
+    return _parseStr
+
+class PartField:
+    """
+    The schema of one type-specific field of a part class.
+
+    Attributes:
+        name (str): The constructor parameter and attribute name (e.g., "resistance").
+        annotation (type): The field's type hint (int, float, str or an Enum class).
+        parser (callable): Converts text or JSON values to the field's type, raising ValueError if invalid.
+        prompt (str): A human-readable label for the field (e.g., "Resistance (Ohms)").
+    """
+
+    def __init__(self, name, annotation, prompt=None):
+        """
+        Initializes a new instance of the PartField class.
+
+        Args:
+            name (str): The field name.
+            annotation (type): The field's type hint.
+            prompt (str): A human-readable label; defaults to the field name in title case, followed by the
+                choices for enum fields.
+        """
+        self.name = name
+        self.annotation = annotation
+        self.parser = _fieldParser(annotation)
+        if prompt is None:
+            prompt = name.replace("_", " ").title()
+            if isinstance(annotation, type) and issubclass(annotation, Enum):
+                prompt += f" ({'/'.join(str(member.value) for member in annotation)})"
+        self.prompt = prompt
+
+class PartType:
+    """
+    A registered part type: a part class, its display name and the typed schema of its fields.
+
+    The per-field parsers are built once at registration, so turning rows into parts and search criteria into
+    typed values does no reflection per call.
+
+    Attributes:
+        name (str): The display name (e.g., "Display Cable").
+        part_class (class): The Part subclass.
+        fields (tuple): The PartField schemas of the type-specific constructor parameters, in order.
+    """
+
+    def __init__(self, part_class, name=None, prompts=None):
+        """
+        Initializes a new instance of the PartType class.
+
+        Args:
+            part_class (class): The Part subclass.
+            name (str): The display name; defaults to the class name.
+            prompts (dict): Optional human-readable labels by field name.
+        """
+        self.name = name or part_class.__name__
+        self.part_class = part_class
+        prompts = prompts or {}
+        hints = typing.get_type_hints(part_class.__init__)
+        self.fields = tuple(PartField(field, hints.get(field), prompts.get(field)) for field in partFields(part_class))
+        self._parsers = {field.name: field.parser for field in self.fields}
+        self._parsers["sku"] = self._parsers["quantity"] = _parseInt
+        self._parsers["last_updated"] = _parseTimestamp
+
+    def parseFields(self, values):
+        """
+        Convert the type-specific field values of a part, given as text or JSON values, to their types.
+
+        Args:
+            values (dict): The field values by field name; other keys are ignored.
+
+        Returns:
+            list: The converted values, in constructor order.
+
+        Raises:
+            ValueError: If a value is missing or invalid.
+        """
+        arguments = []
+        for field in self.fields:
+            if field.name not in values:
+                raise ValueError(f"missing {field.name}")
+            try:
+                arguments.append(field.parser(values[field.name]))
+            except (TypeError, ValueError) as error:
+                raise ValueError(f"{field.name}: {error}") from None
+        return arguments
+
+    def fromRow(self, row, last_updated):
+        """
+        Build a part from a row dictionary holding "sku", the field values and optionally "quantity" and
+        "last_updated" (ISO 8601).
+
+        Args:
+            row (dict): The row.
+            last_updated (datetime): The timestamp to use if the row has none.
+
+        Returns:
+            Part: The new part, with its quantity set.
+
+        Raises:
+            ValueError: If the row is missing a value or a value is invalid.
+        """
+        arguments = self.parseFields(row)
+        if "sku" not in row:
+            raise ValueError("missing sku")
+        try:
+            sku = _parseInt(row["sku"])
+            timestamp = _parseTimestamp(row["last_updated"]) if "last_updated" in row else last_updated
+            quantity = _parseInt(row["quantity"]) if "quantity" in row else 0
+        except TypeError as error:
+            raise ValueError(str(error)) from None
+        part = self.part_class(sku, timestamp, *arguments)
+        part.quantity = quantity
+        return part
+
+    def coerceCriteria(self, criteria):
+        """
+        Convert search criteria given as text or JSON values to the types of this part type's fields.
+
+        Criteria keys follow InventoryManager.search (e.g., "speed" or "length__gte"); "between" takes a pair of
+        bounds. Keys that are not fields of the part type are passed through unchanged.
+
+        Args:
+            criteria (dict): The raw criteria.
+
+        Returns:
+            dict: The criteria with converted values.
+
+        Raises:
+            ValueError: If a value cannot be converted.
+        """
+        parsers = self._parsers
+        coerced = {}
+        for key, value in criteria.items():
+            attribute, sep, op = key.rpartition("__")
+            if not sep or not attribute:
+                attribute, op = key, "eq"
+            parser = parsers.get(attribute)
+            try:
+                if parser is None:
+                    coerced[key] = value
+                elif op == "between":
+                    if not isinstance(value, (list, tuple)) or len(value) != 2:
+                        raise ValueError("Invalid range, expected a pair of bounds.")
+                    low, high = value
+                    coerced[key] = (parser(low), parser(high))
+                else:
+                    coerced[key] = parser(value)
+            except (TypeError, ValueError) as error:
+                raise ValueError(f"{key}: {error}") from None
+        return coerced
+
+_REGISTRY = {}
+_BY_CLASS = {}
+
+def registerPartType(part_class, name=None, prompts=None):
+    """
+    Register a part class so it can be looked up by name and built from text input.
+
+    The name is matched ignoring case, spaces, dashes and underscores, and the class name is registered as an
+    alias. Registering a class again replaces its previous registration.
+
+    Args:
+        part_class (class): The Part subclass; its constructor's type hints define the field types.
+        name (str): The display name (e.g., "Display Cable"); defaults to the class name.
+        prompts (dict): Optional human-readable labels by field name.
+
+    Returns:
+        PartType: The registered part type.
+    """
+    part_type = PartType(part_class, name, prompts)
+    previous = _BY_CLASS.get(part_class)
+    if previous is not None:
+        for key in [key for key, value in _REGISTRY.items() if value is previous]:
+            del _REGISTRY[key]
+    _BY_CLASS[part_class] = part_type
+    _REGISTRY[_typeKey(part_type.name)] = part_type
+    _REGISTRY.setdefault(_typeKey(part_class.__name__), part_type)
+    return part_type
+
+def lookupPartType(name):
+    """
+    Find a registered part type by name, ignoring case, spaces, dashes and underscores.
+
+    Args:
+        name (str): The part type name (e.g., "ethernet cable" or "EthernetCable").
+
+    Returns:
+        PartType: The registered part type.
+
+    Raises:
+        ValueError: If no part type has that name.
+    """
+    part_type = _REGISTRY.get(_typeKey(name)) if isinstance(name, str) else None
+    if part_type is None:
+        raise ValueError(f"unknown part type {name!r}")
+    return part_type
+
+def partTypeOf(part_class):
+    """
+    Get the registered part type of a part class.
+
+    Args:
+        part_class (class): The Part subclass.
+
+    Returns:
+        PartType: The registered part type, or None if the class is not registered.
+    """
+    return _BY_CLASS.get(part_class)
+
+def registeredPartTypes():
+    """
+    Get every registered part type, in registration order.
+
+    Returns:
+        list: The registered PartType instances.
+    """
+    return list(_BY_CLASS.values())
+
+registerPartType(Resistor, prompts={"resistance": "Resistance (Ohms)", "tolerance": "Tolerance (%)"})
+registerPartType(Solder, prompts={"length": "Length (inches)"})
+registerPartType(Wire, prompts={"length": "Length (inches)"})
+registerPartType(DisplayCable, "Display Cable", prompts={"length": "Length (inches)", "color": "Color (Hexadecimal format, e.g., #RRGGBB)"})
+registerPartType(EthernetCable, "Ethernet Cable", prompts={"length": "Length (inches)"})
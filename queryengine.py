@@ -0,0 +1,357 @@
+import re
+from bisect import bisect_left, bisect_right
+from inventorymanager import InventoryManager, _OPERATORS
+from partcharacteristics import _MISSING
+
+_NONZERO_BYTE = re.compile(rb"[^\x00]")
+_BYTE_BITS = [tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256)]
+
+def _maskRows(mask):
+    """
+    Expand a bitmap into the ascending list of row numbers whose bits are set.
+
+    Args:
+        mask (int): The bitmap, with bit i standing for row i.
+
+    Returns:
+        list: The set row numbers.
+    """
+    data = mask.to_bytes((mask.bit_length() + 7) // 8, "little")
+    rows = []
+    for match in _NONZERO_BYTE.finditer(data):
+        base = match.start() * 8
+        rows.extend([base + bit for bit in _BYTE_BITS[data[match.start()]]])
+    return rows
+
+def _rowsMask(rows):
+    """
+    Build the bitmap of a list of ascending row numbers in one pass. Or-ing the bits in one at a time would
+    copy the growing integer for every row, taking quadratic time.
+
+    Args:
+        rows (list): The row numbers, in ascending order.
+
+    Returns:
+        int: The bitmap, with bit i set for each row i.
+    """
+    if not rows:
+        return 0
+    if len(rows) == 1:
+        return 1 << rows[0]
+    data = bytearray((rows[-1] >> 3) + 1)
+    for row in rows:
+        data[row >> 3] |= 1 << (row & 7)
+    return int.from_bytes(data, "little")
+
+class _Column:
+    """
+    A bitmap index over one attribute of a snapshot table.
+
+    Attributes:
+        masks (dict): Maps each distinct attribute value to the bitmap of rows holding it.
+        present (int): The bitmap of rows that have the attribute at all (the union of the masks).
+        keys (list): The distinct values in ascending order, or None until a range query needs them.
+    """
+
+    def __init__(self):
+        self.masks = {}
+        self.present = 0
+        self.keys = None
+
+    def load(self, rowsByValue, rows):
+        """
+        Set the masks of an empty column from the rows holding each value, and the rows holding any.
+        """
+        self.masks = {value: _rowsMask(valueRows) for value, valueRows in rowsByValue.items()}
+        self.present = _rowsMask(rows)
+        self.keys = None
+
+    def add(self, value, bit):
+        self.present |= bit
+        masks = self.masks
+        if value in masks:
+            masks[value] |= bit
+        else:
+            masks[value] = bit
+            self.keys = None
+
+    def remove(self, value, bit):
+        masks = self.masks
+        mask = masks.get(value)
+        if mask is not None:
+            self.present &= ~bit
+            mask &= ~bit
+            if mask:
+                masks[value] = mask
+            else:
+                del masks[value]
+                self.keys = None
+
+    def match(self, op, value):
+        """
+        Compute the bitmap of rows satisfying one criterion on this column. Rows without the attribute never
+        match, as in InventoryManager.search.
+
+        Args:
+            op (str): The comparison operator (see InventoryManager.search).
+            value: The value to compare against.
+
+        Returns:
+            int: The matching rows.
+        """
+        masks = self.masks
+        if op == "eq":
+            try:
+                return masks.get(value, 0)
+            except TypeError:  # Unhashable criterion
+                return self._scan(op, value)
+        if op == "ne":
+            try:
+                return self.present & ~masks.get(value, 0)
+            except TypeError:
+                return self._scan(op, value)
+        if self.keys is None:
+            try:
+                self.keys = sorted(masks)
+            except TypeError:  # Values are not mutually comparable
+                return self._scan(op, value)
+        keys = self.keys
+        try:
+            if op == "lt":
+                lo, hi = 0, bisect_left(keys, value)
+            elif op == "lte":
+                lo, hi = 0, bisect_right(keys, value)
+            elif op == "gt":
+                lo, hi = bisect_right(keys, value), len(keys)
+            elif op == "gte":
+                lo, hi = bisect_left(keys, value), len(keys)
+            else:
+                lo, hi = bisect_left(keys, value[0]), bisect_right(keys, value[1])
+        except TypeError:
+            return self._scan(op, value)
+        result = 0
+        for key in keys[lo:hi]:
+            result |= masks[key]
+        return result
+
+    def _scan(self, op, value):
+        """
+        Evaluate a criterion against each distinct value when the fast paths do not apply.
+        """
+        compare = _OPERATORS[op]
+        result = 0
+        for key, mask in self.masks.items():
+            try:
+                if compare(key, value):
+                    result |= mask
+            except TypeError:
+                pass
+        return result
+
+class _Table:
+    """
+    The rows of one concrete part class in a query snapshot.
+
+    Attributes:
+        parts (list): The part stored at each row, or None for rows freed by deletions.
+        rowOf (dict): Maps each SKU to its row.
+        alive (int): The bitmap of occupied rows.
+        columns (dict): The bitmap indexes built so far, keyed by attribute name.
+    """
+
+    def __init__(self, parts):
+        self._load(list(parts))
+
+    def _load(self, parts):
+        """
+        Store parts in consecutive rows, with no columns built yet.
+        """
+        self.parts = parts
+        self.rowOf = {part.sku: row for row, part in enumerate(parts)}
+        self.alive = (1 << len(parts)) - 1
+        self.columns = {}
+        self.freed = 0
+
+    def compact(self):
+        """
+        Renumber the remaining parts into consecutive rows, dropping the rows freed by deletions. Columns are
+        rebuilt on their next use.
+        """
+        self._load([part for part in self.parts if part is not None])
+
+    def add(self, part):
+        row = len(self.parts)
+        bit = 1 << row
+        self.parts.append(part)
+        self.rowOf[part.sku] = row
+        self.alive |= bit
+        for attribute, column in self.columns.items():
+            value = getattr(part, attribute, _MISSING)
+            if value is not _MISSING:
+                column.add(value, bit)
+
+    def delete(self, part):
+        row = self.rowOf.pop(part.sku, None)
+        if row is None:
+            return
+        bit = 1 << row
+        self.parts[row] = None
+        self.alive &= ~bit
+        for attribute, column in self.columns.items():
+            column.remove(getattr(part, attribute, _MISSING), bit)
+        self.freed += 1
+        if self.freed * 2 > len(self.parts):
+            self.compact()
+
+    def update(self, part, name, old, new):
+        column = self.columns.get(name)
+        if column is None:
+            return
+        row = self.rowOf.get(part.sku)
+        if row is not None and self.parts[row] is part:
+            bit = 1 << row
+            column.remove(old, bit)
+            if new is not _MISSING:
+                column.add(new, bit)
+
+    def column(self, attribute):
+        """
+        Get the bitmap index for an attribute, building it on first use from the rows holding each value.
+        """
+        column = self.columns.get(attribute)
+        if column is None:
+            rowsByValue = {}
+            rows = []
+            for row, part in enumerate(self.parts):
+                if part is not None:
+                    value = getattr(part, attribute, _MISSING)
+                    if value is not _MISSING:
+                        rowsByValue.setdefault(value, []).append(row)
+                        rows.append(row)
+            column = self.columns[attribute] = _Column()
+            column.load(rowsByValue, rows)
+        return column
+
+class QueryEngine:
+    """
+    A bulk query engine over a columnar snapshot of an InventoryManager.
+
+    The engine groups the inventory into one table per concrete part class and builds a bitmap index per
+    queried attribute, mapping each distinct value to an integer whose set bits are the rows holding it.
+    Criteria are then evaluated as whole-table bitwise operations instead of a Python loop over every part.
+    The snapshot is patched incrementally as the manager adds, updates and deletes parts.
+
+    Attributes:
+        inventoryManager (InventoryManager): The inventory being queried.
+        tables (dict): The snapshot tables, keyed by part class.
+    """
+
+    def __init__(self, inventoryManager: InventoryManager):
+        """
+        Initializes a new instance of the QueryEngine class and attaches it to an inventory manager.
+
+        Args:
+            inventoryManager (InventoryManager): The inventory to query.
+        """
+        self.inventoryManager = inventoryManager
+        self.tables = None
+        inventoryManager.addListener(self._onInventoryChanged)
+
+    def close(self):
+        """
+        Detach the engine from its inventory manager and drop the snapshot.
+        """
+        self.inventoryManager.removeListener(self._onInventoryChanged)
+        self.tables = None
+
+    def search(self, part_class, **kwargs):
+        """
+        Search for parts using the same criteria as InventoryManager.search.
+
+        Args:
+            part_class (class): The class of the part to search for (e.g., Resistor, Solder).
+            **kwargs: Keyword arguments representing search criteria (e.g., resistance__between=(90, 110)).
+
+        Returns:
+            list: The SKUs of the matching parts.
+
+        Raises:
+            ValueError: If a criterion uses an unknown operator.
+        """
+        return self.searchMany([(part_class, kwargs)])[0]
+
+    def searchMany(self, queries):
+        """
+        Evaluate a batch of searches against the snapshot.
+
+        Bitmaps computed for one criterion are reused by every other query of the batch with the same
+        criterion, so repeated dashboard queries cost a dictionary lookup each.
+
+        Args:
+            queries (iterable): (part_class, criteria) pairs, where criteria is a dictionary of search criteria
+                as accepted by InventoryManager.search.
+
+        Returns:
+            list: For each query, the list of SKUs of the matching parts.
+
+        Raises:
+            ValueError: If a criterion uses an unknown operator.
+        """
+        tables = self._snapshot()
+        cache = {}
+        results = []
+        for part_class, criteria in queries:
+            parsed = InventoryManager._parseCriteria(criteria)
+            skus = []
+            for table_class, table in tables.items():
+                if not issubclass(table_class, part_class):
+                    continue
+                mask = table.alive
+                for attribute, op, value in parsed:
+                    try:
+                        key = (table_class, attribute, op, value)
+                        match = cache.get(key)
+                    except TypeError:  # Unhashable criterion, do not cache it
+                        key = None
+                        match = None
+                    if match is None:
+                        match = table.column(attribute).match(op, value)
+                        if key is not None:
+                            cache[key] = match
+                    mask &= match
+                    if not mask:
+                        break
+                if mask:
+                    parts = table.parts
+                    skus.extend([parts[row].sku for row in _maskRows(mask)])
+            results.append(skus)
+        return results
+
+    def _snapshot(self):
+        """
+        Get the snapshot tables, building them from the inventory on first use.
+        """
+        if self.tables is None:
+            grouped = {}
+            for part in self.inventoryManager.inventory.values():
+                grouped.setdefault(type(part), []).append(part)
+            self.tables = {part_class: _Table(parts) for part_class, parts in grouped.items()}
+        return self.tables
+
+    def _onInventoryChanged(self, event, part, name, old, new):
+        """
+        Inventory listener that patches the snapshot to follow changes to the manager.
+        """
+        if self.tables is None:
+            return
+        table = self.tables.get(type(part))
+        if event == "add":
+            if table is None:
+                self.tables[type(part)] = _Table([part])
+            else:
+                table.add(part)
+        elif table is not None:
+            if event == "delete":
+                table.delete(part)
+            else:
+                table.update(part, name, old, new)
@@ -0,0 +1,332 @@
+import heapq
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from partcharacteristics import Resistor
+
+# The most resistors in a network: every network of up to three is a resistor or a pair combined with one more,
+# so a table of singles and a table of pairs cover them all
+MAX_RESISTORS = 3
+
+_WATCHED_ATTRIBUTES = frozenset(("resistance", "tolerance", "quantity"))
+
+def _usable(quantity):
+    """
+    The units of a part a network can use: no network has more than MAX_RESISTORS resistors, so stock beyond
+    that never changes the tables or the results.
+    """
+    return min(max(quantity, 0), MAX_RESISTORS)
+
+def _series(first, second):
+    return first + second
+
+def _parallel(first, second):
+    return first * second / (first + second)
+
+def _format(network):
+    """
+    Format a canonical network (see _canonical) as an expression such as "(100 || 220) + 47".
+    """
+    if not isinstance(network, tuple):
+        return f"{network:g}"
+    op, children = network
+    return f" {op} ".join(f"({_format(child)})" if isinstance(child, tuple) else _format(child) for child in children)
+
+def _canonical(op, first, second):
+    """
+    Combine two networks, flattening nested uses of the same operator and sorting the operands, so the same
+    network always has the same form however it was found.
+    """
+    children = []
+    for child in (first, second):
+        if isinstance(child, tuple) and child[0] == op:
+            children.extend(child[1])
+        else:
+            children.append(child)
+    children.sort(key=lambda child: (1, 0, repr(child)) if isinstance(child, tuple) else (0, child, ""))
+    return op, tuple(children)
+
+class ResistorNetwork:
+    """
+    A series/parallel network of stocked resistors.
+
+    Attributes:
+        resistance (float): The nominal resistance of the network in ohms.
+        error (float): The relative deviation from the target resistance (e.g., -0.004 for 0.4% low).
+        expression (str): The network, with "+" for series and "||" for parallel (e.g., "(100 || 220) + 47").
+        skus (list): The SKU of each resistor used, repeated if a part is used more than once.
+    """
+
+    def __init__(self, resistance, error, expression, skus):
+        """
+        Initializes a new instance of the ResistorNetwork class.
+
+        Args:
+            resistance (float): The nominal resistance of the network in ohms.
+            error (float): The relative deviation from the target resistance.
+            expression (str): The network as an expression.
+            skus (list): The SKU of each resistor used.
+        """
+        self.resistance = resistance
+        self.error = error
+        self.expression = expression
+        self.skus = skus
+
+    def __repr__(self):
+        return f"ResistorNetwork({self.expression} = {self.resistance:g} ohms, {self.error:+.3%})"
+
+class _Tables:
+    """
+    The sorted value tables of the stocked resistors at or under one tolerance.
+    """
+
+    def __init__(self, resistors):
+        stock = {}
+        for part in resistors:
+            stock.setdefault(part.resistance, []).append(part)
+        self.values = sorted(stock)
+        self.available = [sum(_usable(part.quantity) for part in stock[value]) for value in self.values]
+        self.parts = [sorted(stock[value], key=lambda part: (-_usable(part.quantity), part.sku)) for value in self.values]
+        count = len(self.values)
+        # Every pair (i <= j) of distinct values combined in series and in parallel, sorted by resistance. Codes
+        # are i * count + j for series pairs and -(i * count + j) - 1 for parallel ones
+        pairs = {}
+        for i, first in enumerate(self.values):
+            start = i if self.available[i] >= 2 else i + 1
+            tail = self.values[start:]
+            base = i * count
+            pairs.update(zip([first * second / (first + second) for second in tail], range(-base - start - 1, -base - count - 1, -1)))
+            pairs.update(zip([first + second for second in tail], range(base + start, base + count)))
+        resistances = sorted(pairs)
+        self.pairCodes = array("q", map(pairs.__getitem__, resistances))
+        self.pairValues = array("d", resistances)
+
+    def pair(self, code):
+        """
+        Decode a pair code into (operator, first value index, second value index).
+        """
+        if code < 0:
+            i, j = divmod(-code - 1, len(self.values))
+            return "||", i, j
+        i, j = divmod(code, len(self.values))
+        return "+", i, j
+
+class ResistorSolver:
+    """
+    Finds series/parallel networks of stocked resistors that come closest to a target resistance.
+
+    For the resistors at or under a tolerance, the solver keeps a sorted table of their distinct values and a
+    sorted table of every pair of values combined in series and in parallel. Networks of one or two resistors
+    are read from the tables with a bisection; a network of three is one resistor combined with a pair, so for
+    each value the pair table is bisected at the exact pair resistance that would hit the target and only the
+    nearest pairs are examined (meet in the middle). Building the tables takes O(n² log n) for n distinct
+    values; a query then takes O(n log n) and answers in milliseconds for thousands of values.
+
+    The solver is an inventory listener: adding, deleting or changing a resistor bumps the version, and tables
+    and results are rebuilt lazily for the next query of each new version. Quantity changes only count when they
+    change the units a network can use (0 to MAX_RESISTORS), so ordinary stock movements keep the tables. The
+    caches are guarded by the solver's own lock, which is never held while tables are built, so queries and
+    inventory changes do not wait on a rebuild.
+
+    Attributes:
+        inventoryManager (InventoryManager): The inventory whose resistors are used.
+        version (int): The inventory version the tables and cached results belong to.
+    """
+
+    def __init__(self, inventoryManager):
+        """
+        Initializes a new instance of the ResistorSolver class.
+
+        Args:
+            inventoryManager (InventoryManager): The inventory to use; call attach to follow its changes.
+        """
+        self.inventoryManager = inventoryManager
+        self.version = 0
+        self._lock = threading.Lock()
+        self._tables = {}  # tolerance -> _Tables
+        self._results = {}  # (target, tolerance, maxResistors, limit) -> [ResistorNetwork]
+
+    def attach(self):
+        """
+        Register with the inventory manager as a listener.
+        """
+        self.inventoryManager.addListener(self)
+
+    def detach(self):
+        """
+        Unregister from the inventory manager.
+        """
+        self.inventoryManager.removeListener(self)
+
+    def __call__(self, event, part, name, old, new):
+        """
+        Inventory listener that invalidates the tables and results when a resistor changes.
+        """
+        if not isinstance(part, Resistor):
+            return
+        if event == "update":
+            if name not in _WATCHED_ATTRIBUTES or old == new:
+                return
+            if name == "quantity" and _usable(old) == _usable(new):
+                return
+        with self._lock:
+            self.version += 1
+            self._tables = {}
+            self._results = {}
+
+    def solve(self, target, tolerance=1, maxResistors=MAX_RESISTORS, limit=5):
+        """
+        Find the networks closest to a target resistance.
+
+        Args:
+            target (float): The target resistance in ohms.
+            tolerance (float): The tolerance in percent: networks must be within it of the target, and only
+                resistors with this tolerance or better are used.
+            maxResistors (int): The most resistors in a network, from 1 to MAX_RESISTORS.
+            limit (int): The maximum number of networks to return.
+
+        Returns:
+            list: Up to limit ResistorNetwork instances, smallest deviation first (then fewest resistors). Only
+            networks the stocked quantities can build are returned.
+
+        Raises:
+            ValueError: If the target, tolerance or number of resistors is invalid.
+        """
+        if not target > 0 or tolerance < 0:
+            raise ValueError("Invalid target resistance or tolerance.")
+        if not 1 <= maxResistors <= MAX_RESISTORS:
+            raise ValueError(f"Error, Networks can have 1 to {MAX_RESISTORS} resistors.")
+        key = (target, tolerance, maxResistors, limit)
+        with self._lock:
+            version = self.version
+            results = self._results.get(key)
+            tables = self._tables.get(tolerance)
+        if results is None:
+            if tables is None:
+                tables = self._buildTables(tolerance)
+            results = self._solve(tables, target, tolerance, maxResistors, limit)
+            with self._lock:
+                if self.version == version:  # Otherwise a resistor changed while solving
+                    self._tables[tolerance] = tables
+                    self._results[key] = results
+        return list(results)
+
+    def _buildTables(self, tolerance):
+        """
+        Build the tables of the stocked resistors at or under a tolerance.
+        """
+        resistors = [part for part in self.inventoryManager.getInventory().values()
+                     if isinstance(part, Resistor) and part.quantity > 0 and part.tolerance <= tolerance and part.resistance > 0]
+        return _Tables(resistors)
+
+    def _solve(self, tables, target, tolerance, maxResistors, limit):
+        """
+        Search the tables for the best networks.
+        """
+        search = _Search(tables, target, tolerance, limit)
+        values = tables.values
+        pairValues = tables.pairValues
+        for index in range(bisect_left(values, search.low), bisect_right(values, search.high)):
+            search.offer(values[index], (index,), values[index])
+        if maxResistors >= 2:
+            for position in range(bisect_left(pairValues, search.low), bisect_right(pairValues, search.high)):
+                op, i, j = tables.pair(tables.pairCodes[position])
+                search.offer(pairValues[position], (i, j), op, values[i], values[j])
+        if maxResistors >= 3:
+            for index, value in enumerate(values):
+                if value < search.high:  # In series, the pair must make up the rest
+                    search.meet(index, target - value, _series, "+")
+                if value > search.low:  # In parallel, the pair must be larger than the target
+                    search.meet(index, value * target / (value - target) if value > target else float("inf"), _parallel, "||")
+        results = []
+        for deviation, count, expression, resistance, indexes in sorted(search.best.values())[:limit]:
+            used = {}
+            skus = []
+            for index in indexes:  # Take each value from its best-stocked parts first
+                taken = used.get(index, 0)
+                used[index] = taken + 1
+                for part in tables.parts[index]:
+                    if taken < part.quantity:
+                        skus.append(part.sku)
+                        break
+                    taken -= part.quantity
+            results.append(ResistorNetwork(resistance, resistance / target - 1, expression, skus))
+        return results
+
+class _Search:
+    """
+    The state of one solver query: the tolerance window and the best networks found so far.
+
+    Once limit networks have been found, the deviation of the worst of them bounds the search: walks through
+    the pair table stop as soon as the networks they reach are worse.
+    """
+
+    def __init__(self, tables, target, tolerance, limit):
+        self.tables = tables
+        self.target = target
+        self.low = target * (1 - tolerance / 100)
+        self.high = target * (1 + tolerance / 100)
+        self.limit = limit
+        self.best = {}  # expression -> (deviation, resistor count, expression, resistance, value indexes)
+        self._worst = []  # Max-heap of the limit smallest deviations, negated
+        self.bound = float("inf")
+
+    def offer(self, resistance, indexes, op, first=None, second=None):
+        """
+        Record a network if it is within tolerance, buildable from stock and among the best so far.
+
+        The network is a single value (op is the value), op applied to two values, or op applied to the value of
+        indexes[0] and a (pair operator, first value, second value) tuple.
+
+        Returns:
+            bool: Whether the network was within tolerance, buildable and not worse than the bound.
+        """
+        deviation = abs(resistance - self.target)
+        if deviation > self.bound or not self.low <= resistance <= self.high:
+            return False
+        available = self.tables.available
+        if len(indexes) > 1:
+            for index in set(indexes):
+                if available[index] < indexes.count(index):
+                    return False
+        if first is None:
+            network = op
+        elif second is None:
+            pair_op, pair_first, pair_second = first
+            network = _canonical(op, self.tables.values[indexes[0]], _canonical(pair_op, pair_first, pair_second))
+        else:
+            network = _canonical(op, first, second)
+        expression = _format(network)
+        if expression not in self.best:
+            self.best[expression] = (deviation, len(indexes), expression, resistance, indexes)
+            worst = self._worst
+            if len(worst) < self.limit:
+                heapq.heappush(worst, -deviation)
+            elif -deviation > worst[0]:
+                heapq.heapreplace(worst, -deviation)
+            if len(worst) == self.limit:
+                self.bound = -worst[0]
+        return True
+
+    def meet(self, index, needed, combine, op):
+        """
+        Combine one value with the pairs nearest the pair resistance needed to hit the target, walking outwards
+        from it in each direction until limit networks are found or the networks leave the tolerance or the
+        bound.
+        """
+        tables = self.tables
+        pairValues = tables.pairValues
+        values = tables.values
+        value = values[index]
+        start = bisect_left(pairValues, needed)
+        for positions in (range(start - 1, -1, -1), range(start, len(pairValues))):
+            found = 0
+            for position in positions:
+                resistance = combine(value, pairValues[position])
+                if abs(resistance - self.target) > self.bound or not self.low <= resistance <= self.high:
+                    break  # The network only moves further from the target from here on
+                pair_op, i, j = tables.pair(tables.pairCodes[position])
+                if self.offer(resistance, (index, i, j), op, (pair_op, values[i], values[j])):
+                    found += 1
+                    if found == self.limit:
+                        break
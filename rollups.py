@@ -0,0 +1,239 @@
+import heapq
+import threading
+from fractions import Fraction
+from operator import attrgetter
+
+class _Group:
+    """
+    The running totals of one group of a rollup.
+    """
+
+    __slots__ = ("count", "quantity", "lengthTotal", "values", "minHeap", "maxHeap")
+
+    def __init__(self):
+        self.count = 0
+        self.quantity = 0
+        # The exact sum of quantity * length; a running float sum would drift under repeated adds and removes
+        self.lengthTotal = Fraction(0)
+        self.values = {}  # quantity -> number of members with that quantity
+        self.minHeap = []  # Distinct quantities; entries whose count dropped to 0 are skipped lazily
+        self.maxHeap = []  # Negated distinct quantities
+
+    def add(self, quantity, length):
+        self.count += 1
+        self.quantity += quantity
+        if length is not None:
+            self.lengthTotal += Fraction(length) * quantity
+        seen = self.values.get(quantity, 0)
+        self.values[quantity] = seen + 1
+        if not seen:
+            heapq.heappush(self.minHeap, quantity)
+            heapq.heappush(self.maxHeap, -quantity)
+
+    def remove(self, quantity, length):
+        self.count -= 1
+        self.quantity -= quantity
+        if length is not None:
+            self.lengthTotal -= Fraction(length) * quantity
+        seen = self.values[quantity]
+        if seen == 1:
+            del self.values[quantity]
+            if len(self.minHeap) > 2 * len(self.values) + 64:
+                self.minHeap = list(self.values)
+                heapq.heapify(self.minHeap)
+                self.maxHeap = [-value for value in self.values]
+                heapq.heapify(self.maxHeap)
+        else:
+            self.values[quantity] = seen - 1
+
+    def minimum(self):
+        heap = self.minHeap
+        while heap and heap[0] not in self.values:
+            heapq.heappop(heap)
+        return heap[0] if heap else None
+
+    def maximum(self):
+        heap = self.maxHeap
+        while heap and -heap[0] not in self.values:
+            heapq.heappop(heap)
+        return -heap[0] if heap else None
+
+    def quantityLength(self):
+        return float(self.lengthTotal)
+
+    def totals(self):
+        return {"count": self.count, "quantity": self.quantity, "quantityLength": self.quantityLength(),
+                "minQuantity": self.minimum(), "maxQuantity": self.maximum()}
+
+class Rollup:
+    """
+    Stock totals of one part class, grouped by an attribute, kept up to date as the inventory changes.
+
+    Each group holds the number of parts, the sum of their quantities, the sum of quantity × length (parts
+    without a length add nothing) and the smallest and largest quantity. Adding, deleting or changing a part
+    moves its contribution in O(1), apart from the min/max bookkeeping, which is O(log d) for d distinct
+    quantities in the group. Reading a group's totals is O(1) amortized; quantity × length is kept as an exact
+    fraction and rounded to a float only when read.
+
+    Attributes:
+        part_class (class): The class of the parts rolled up, including subclasses.
+        groupBy: The attribute name, tuple of attribute names or callable that gives each part's group key, or
+            None to roll up the whole class into a single group.
+    """
+
+    def __init__(self, part_class, groupBy=None):
+        """
+        Initializes a new instance of the Rollup class.
+
+        Args:
+            part_class (class): The class of the parts to roll up (e.g., DisplayCable).
+            groupBy: An attribute name (e.g., "cable_type"), a tuple of attribute names, a callable called with
+                each part, or None for a single group.
+        """
+        self.part_class = part_class
+        self.groupBy = groupBy
+        if groupBy is None:
+            self._key = lambda part: None
+            self._attributes = frozenset(("quantity", "length"))
+        elif callable(groupBy):
+            self._key = groupBy
+            self._attributes = None  # Any attribute may affect the key
+        else:
+            names = (groupBy,) if isinstance(groupBy, str) else tuple(groupBy)
+            self._key = attrgetter(*names)
+            self._attributes = frozenset(names + ("quantity", "length"))
+        self._groups = {}
+        self._members = {}  # sku -> (key, quantity, length) as last counted
+
+    def get(self, key=None):
+        """
+        Get the totals of one group.
+
+        Args:
+            key: The group key (e.g., DisplayType.HDMI), or None for a rollup without groupBy.
+
+        Returns:
+            dict: count, quantity, quantityLength, minQuantity and maxQuantity; the min and max are None for an
+            empty group.
+        """
+        group = self._groups.get(key)
+        return group.totals() if group is not None else _Group().totals()
+
+    def groups(self):
+        """
+        Get the totals of every non-empty group.
+
+        Returns:
+            dict: The totals (see get) by group key.
+        """
+        return {key: group.totals() for key, group in list(self._groups.items())}
+
+    def _count(self, part):
+        """
+        Move a part's contribution to match its current attributes.
+        """
+        self._discount(part.sku)
+        key = self._key(part)
+        quantity = part.quantity
+        length = getattr(part, "length", None)
+        group = self._groups.get(key)
+        if group is None:
+            group = self._groups[key] = _Group()
+        group.add(quantity, length)
+        self._members[part.sku] = (key, quantity, length)
+
+    def _discount(self, sku):
+        """
+        Remove a part's last counted contribution, if any.
+        """
+        member = self._members.pop(sku, None)
+        if member is not None:
+            key, quantity, length = member
+            group = self._groups[key]
+            group.remove(quantity, length)
+            if not group.count:
+                del self._groups[key]
+
+class Rollups:
+    """
+    The rollups declared on an inventory, updated by a single inventory listener.
+
+    Declaring a rollup counts the current inventory once; after that every addPart, addInventory, deletePart or
+    attribute change updates the rollups it affects as it happens, so dashboards read totals without scanning.
+
+    Attributes:
+        inventoryManager (InventoryManager): The inventory rolled up.
+        rollups (dict): The declared rollups by name.
+    """
+
+    def __init__(self, inventoryManager):
+        """
+        Initializes a new instance of the Rollups class.
+
+        Args:
+            inventoryManager (InventoryManager): The inventory to roll up; call attach to start following it.
+        """
+        self.inventoryManager = inventoryManager
+        self.rollups = {}
+        self._lock = threading.Lock()
+
+    def attach(self):
+        """
+        Register with the inventory manager as a listener.
+        """
+        self.inventoryManager.addListener(self)
+
+    def detach(self):
+        """
+        Unregister from the inventory manager.
+        """
+        self.inventoryManager.removeListener(self)
+
+    def declare(self, name, part_class, groupBy=None):
+        """
+        Declare a rollup and count the current inventory into it. Declaring an existing name replaces it.
+
+        Args:
+            name (str): The rollup name (e.g., "displayCablesByType").
+            part_class (class): The class of the parts to roll up.
+            groupBy: An attribute name, a tuple of attribute names, a callable called with each part, or None
+                (see Rollup).
+
+        Returns:
+            Rollup: The rollup.
+        """
+        rollup = Rollup(part_class, groupBy)
+        with self._lock:
+            for part in list(self.inventoryManager.inventory.values()):
+                if isinstance(part, part_class):
+                    rollup._count(part)
+            self.rollups[name] = rollup
+        return rollup
+
+    def drop(self, name):
+        """
+        Remove a rollup.
+
+        Args:
+            name (str): The rollup name.
+        """
+        with self._lock:
+            self.rollups.pop(name, None)
+
+    def __getitem__(self, name):
+        return self.rollups[name]
+
+    def __call__(self, event, part, name, old, new):
+        """
+        Inventory listener that moves a part's contribution in each rollup of its class.
+        """
+        if event == "update" and old == new:
+            return
+        with self._lock:
+            for rollup in self.rollups.values():
+                if not isinstance(part, rollup.part_class):
+                    continue
+                if event == "delete":
+                    rollup._discount(part.sku)
+                elif event == "add" or rollup._attributes is None or name in rollup._attributes:
+                    rollup._count(part)
@@ -0,0 +1,171 @@
+import threading
+import time
+from collections import OrderedDict
+
+class SearchCache:
+    """
+    A bounded LRU cache of search results with optional expiry and precise invalidation.
+
+    Entries are keyed by (part_class, criteria). The cache is registered as an inventory listener and evicts only
+    the entries a change can affect:
+
+    - Adding or deleting a part evicts the entries for the part's class and its base classes.
+    - Changing an attribute of a part evicts only the entries for those classes whose criteria mention that
+      attribute. A quantity change from addInventory therefore leaves searches on resistance or speed cached.
+
+    Cached results hold the stored parts themselves, so attribute changes that do not affect which parts match
+    are visible through them without eviction.
+
+    Attributes:
+        maxSize (int): The maximum number of cached searches.
+        ttl (float): The number of seconds an entry stays valid, or None for no expiry.
+    """
+
+    def __init__(self, maxSize=1024, ttl=None):
+        """
+        Initializes a new instance of the SearchCache class.
+
+        Args:
+            maxSize (int): The maximum number of cached searches.
+            ttl (float): The number of seconds an entry stays valid, or None for no expiry.
+        """
+        self.maxSize = maxSize
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (results, part_class, attributes, expires, cost)
+        self._byClass = {}  # part_class -> set of keys
+        self._byAttribute = {}  # (part_class, attribute) -> set of keys
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+        self._savedSeconds = 0.0
+
+    @staticmethod
+    def key(part_class, kwargs):
+        """
+        Build the cache key of a search.
+
+        Returns:
+            tuple: The key, or None if a criterion value is unhashable and the search cannot be cached.
+        """
+        key = (part_class, tuple(sorted(kwargs.items())))
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def get(self, key):
+        """
+        Look up the results of a search.
+
+        Args:
+            key (tuple): The key returned by SearchCache.key.
+
+        Returns:
+            list: A copy of the cached results, or None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[3] is not None and entry[3] <= time.monotonic():
+                self._discard(key)
+                self._expirations += 1
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            self._savedSeconds += entry[4]
+            return list(entry[0])
+
+    def put(self, key, attributes, results, cost):
+        """
+        Store the results of a search, evicting the least recently used entries beyond maxSize.
+
+        Args:
+            key (tuple): The key returned by SearchCache.key.
+            attributes (set): The attributes the search criteria test.
+            results (list): The search results.
+            cost (float): The number of seconds the search took, credited as saved time on each hit.
+        """
+        part_class = key[0]
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            if key in self._entries:
+                self._discard(key)
+            self._entries[key] = (list(results), part_class, attributes, expires, cost)
+            self._byClass.setdefault(part_class, set()).add(key)
+            for attribute in attributes:
+                self._byAttribute.setdefault((part_class, attribute), set()).add(key)
+            while len(self._entries) > self.maxSize:
+                self._discard(next(iter(self._entries)))
+                self._evictions += 1
+
+    def clear(self):
+        """
+        Remove every cached search.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._byClass.clear()
+            self._byAttribute.clear()
+
+    def stats(self):
+        """
+        Get the cache statistics.
+
+        Returns:
+            dict: size, maxSize, hits, misses, hit_rate, evictions (for capacity), expirations, invalidations
+            (by inventory changes) and saved_seconds (the summed original cost of the searches answered from
+            the cache).
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "maxSize": self.maxSize,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "invalidations": self._invalidations,
+                "saved_seconds": self._savedSeconds,
+            }
+
+    def __call__(self, event, part, name, old, new):
+        """
+        Inventory listener that evicts the entries affected by a change.
+        """
+        if event == "update" and old == new:
+            return
+        with self._lock:
+            if not self._entries:
+                return
+            for base in type(part).__mro__:
+                if event == "update":
+                    keys = self._byAttribute.get((base, name))
+                else:
+                    keys = self._byClass.get(base)
+                if keys:
+                    self._invalidations += len(keys)
+                    for key in list(keys):
+                        self._discard(key)
+
+    def _discard(self, key):
+        """
+        Remove one entry and its invalidation index references.
+        """
+        _, part_class, attributes, _, _ = self._entries.pop(key)
+        keys = self._byClass[part_class]
+        keys.discard(key)
+        if not keys:
+            del self._byClass[part_class]
+        for attribute in attributes:
+            keys = self._byAttribute[(part_class, attribute)]
+            keys.discard(key)
+            if not keys:
+                del self._byAttribute[(part_class, attribute)]
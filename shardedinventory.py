@@ -0,0 +1,382 @@
+import multiprocessing
+import threading
+from contextlib import ExitStack
+from inventorymanager import InventoryManager
+from partcharacteristics import Part
+from partcodec import decodeParts, encodeParts
+
+def _shardAddParts(inventoryManager, data):
+    return inventoryManager.addParts(decodeParts(data))
+
+def _shardGetPart(inventoryManager, sku):
+    return encodeParts([inventoryManager.getPart(sku)])
+
+def _shardGetInventory(inventoryManager):
+    return encodeParts(inventoryManager.inventory.values())
+
+def _shardSearch(inventoryManager, part_class, criteria):
+    return encodeParts(inventoryManager.search(part_class, **criteria))
+
+# Shard operations that move parts use the partcodec block format, which is far cheaper to build and parse than
+# pickled Part objects; every other operation calls the InventoryManager method of the same name
+_SHARD_OPERATIONS = {
+    "addParts": _shardAddParts,
+    "getPart": _shardGetPart,
+    "getInventory": _shardGetInventory,
+    "search": _shardSearch,
+}
+
+def _runShard(connection):
+    """
+    Worker process main loop: serve requests for one shard's InventoryManager until told to stop.
+
+    Each request is a (request id, name, args) tuple and is answered with (request id, True, result) or
+    (request id, False, exception).
+    """
+    inventoryManager = InventoryManager()
+    while True:
+        try:
+            request = connection.recv()
+        except EOFError:
+            break
+        if request is None:
+            break
+        requestId, name, args = request
+        try:
+            operation = _SHARD_OPERATIONS.get(name)
+            if operation is not None:
+                result = operation(inventoryManager, *args)
+            else:
+                result = getattr(inventoryManager, name)(*args)
+        except Exception as error:
+            connection.send((requestId, False, error))
+        else:
+            connection.send((requestId, True, result))
+    connection.close()
+
+class ShardedInventoryManager:
+    """
+    An InventoryManager-compatible inventory partitioned across worker processes.
+
+    SKUs are assigned to shards by hash, and each shard is a plain InventoryManager running in its own process,
+    so scans are not limited to the one core the GIL allows a single process. Point operations (getPart,
+    addInventory, deletePart, ...) go to the shard that owns the SKU. search and getInventory are sent to every
+    shard at once, run in parallel, and their results are merged.
+
+    Parts are copied between processes, so the parts returned by getPart, getInventory and search are snapshots:
+    assigning to them does not change the stored part. Use addInventory to change quantities, and addPart to
+    replace a part. Only parts of the classes in partcodec.PART_CLASSES can be stored, and inventory listeners
+    are not supported since the parts live in other processes.
+
+    The manager can be shared between threads; requests to the same shard are serialized.
+
+    Attributes:
+        shardCount (int): The number of worker processes.
+    """
+
+    def __init__(self, shardCount=None):
+        """
+        Initializes a new instance of the ShardedInventoryManager class and starts its worker processes.
+
+        Args:
+            shardCount (int): The number of shards; defaults to the number of CPUs.
+        """
+        self.shardCount = shardCount or multiprocessing.cpu_count()
+        self._connections = []
+        self._processes = []
+        self._locks = []
+        self._requestIds = []  # The id of the last request sent to each shard
+        for _ in range(self.shardCount):
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_runShard, args=(child,), daemon=True)
+            process.start()
+            child.close()
+            self._connections.append(parent)
+            self._processes.append(process)
+            self._locks.append(threading.Lock())
+            self._requestIds.append(0)
+
+    def close(self):
+        """
+        Stop the worker processes. The inventory they hold is discarded.
+        """
+        for connection, lock in zip(self._connections, self._locks):
+            with lock:
+                try:
+                    connection.send(None)
+                except (BrokenPipeError, OSError):
+                    pass
+                connection.close()
+        for process in self._processes:
+            process.join()
+
+    def _shard(self, sku):
+        """
+        Get the number of the shard that owns a SKU.
+        """
+        return hash(sku) % self.shardCount
+
+    def _send(self, shard, request):
+        """
+        Send a (name, args) request to a shard, tagged with a new request id. The shard's lock must be held.
+        """
+        self._requestIds[shard] += 1
+        name, args = request
+        self._connections[shard].send((self._requestIds[shard], name, args))
+
+    def _receive(self, shard):
+        """
+        Receive the (ok, result) reply to the last request sent to a shard. The shard's lock must be held.
+
+        Replies to earlier requests whose caller failed before reading them (e.g., interrupted while waiting, or
+        a fan-out whose send to another shard failed) are still in the pipe; they are skipped.
+        """
+        while True:
+            requestId, ok, result = self._connections[shard].recv()
+            if requestId == self._requestIds[shard]:
+                return ok, result
+
+    def _call(self, shard, name, *args):
+        """
+        Run one operation on one shard and return its result, re-raising the shard's exception if it failed.
+        """
+        with self._locks[shard]:
+            self._send(shard, (name, args))
+            ok, result = self._receive(shard)
+        if not ok:
+            raise result
+        return result
+
+    def _fanOut(self, requests):
+        """
+        Run operations on several shards in parallel.
+
+        Args:
+            requests (dict): Maps shard numbers to (name, args) tuples.
+
+        Returns:
+            dict: Maps the same shard numbers to the operations' results.
+        """
+        shards = sorted(requests)
+        replies = {}
+        with ExitStack() as stack:
+            for shard in shards:  # Always acquired in shard order so concurrent fan-outs cannot deadlock
+                stack.enter_context(self._locks[shard])
+            for shard in shards:
+                self._send(shard, requests[shard])
+            for shard in shards:
+                replies[shard] = self._receive(shard)
+        results = {}
+        for shard in shards:
+            ok, result = replies[shard]
+            if not ok:
+                raise result
+            results[shard] = result
+        return results
+
+    def _broadcast(self, name, *args):
+        """
+        Run the same operation on every shard in parallel and return the results in shard order.
+        """
+        results = self._fanOut({shard: (name, args) for shard in range(self.shardCount)})
+        return [results[shard] for shard in range(self.shardCount)]
+
+    def addPart(self, part):
+        """
+        Add a part to the inventory.
+
+        If a part with the same SKU already exists, it is replaced.
+
+        Args:
+            part (Part): The part to be added to the inventory.
+        """
+        self._call(self._shard(part.sku), "addParts", encodeParts([part]))
+
+    def addParts(self, parts):
+        """
+        Add many parts to the inventory, sending each shard its parts in one message.
+
+        Args:
+            parts (iterable): The parts to be added to the inventory.
+
+        Returns:
+            list: One (position, sku, message) tuple per rejected entry, as in InventoryManager.addParts.
+        """
+        failures = []
+        batches = {}
+        for position, part in enumerate(parts):
+            if not isinstance(part, Part):
+                failures.append((position, None, "Invalid part."))
+            else:
+                batches.setdefault(self._shard(part.sku), []).append(part)
+        self._fanOut({shard: ("addParts", (encodeParts(batch),)) for shard, batch in batches.items()})
+        return failures
+
+    def addInventory(self, sku, quantity):
+        """
+        Add inventory for a specific part.
+
+        Args:
+            sku (int): The SKU (Stock Keeping Unit) of the part.
+            quantity (int): The quantity of the part to be added to the inventory.
+
+        Raises:
+            ValueError: If the part with the specified SKU is not found in the inventory.
+        """
+        self._call(self._shard(sku), "addInventory", sku, quantity)
+
+    def addInventoryBatch(self, items):
+        """
+        Add inventory for many parts, sending each shard its lines in one message.
+
+        Args:
+            items (iterable): (sku, quantity) pairs.
+
+        Returns:
+            list: One (position, sku, message) tuple per rejected line, as in InventoryManager.addInventoryBatch.
+        """
+        failures = []
+        batches = {}
+        for position, item in enumerate(items):
+            try:
+                sku, quantity = item
+            except (TypeError, ValueError):
+                failures.append((position, None, "Invalid inventory line."))
+                continue
+            positions, lines = batches.setdefault(self._shard(sku), ([], []))
+            positions.append(position)
+            lines.append((sku, quantity))
+        results = self._fanOut({shard: ("addInventoryBatch", (lines,)) for shard, (_, lines) in batches.items()})
+        for shard, shard_failures in results.items():
+            positions = batches[shard][0]
+            failures.extend((positions[position], sku, message) for position, sku, message in shard_failures)
+        failures.sort(key=lambda failure: failure[0])
+        return failures
+
+    def getQuantity(self, sku):
+        """
+        Get the quantity of a specific part in the inventory.
+
+        Args:
+            sku (int): The SKU (Stock Keeping Unit) of the part.
+
+        Returns:
+            int: The quantity of the part in the inventory.
+
+        Raises:
+            ValueError: If the part with the specified SKU is not found in the inventory.
+        """
+        return self._call(self._shard(sku), "getQuantity", sku)
+
+    def getInventory(self):
+        """
+        Get a snapshot of the entire inventory, collected from every shard in parallel.
+
+        Returns:
+            dict: A dictionary mapping SKUs to copies of the parts in the inventory.
+        """
+        inventory = {}
+        for data in self._broadcast("getInventory"):
+            for part in decodeParts(data):
+                inventory[part.sku] = part
+        return inventory
+
+    def getPart(self, sku):
+        """
+        Get a copy of a specific part from the inventory.
+
+        Args:
+            sku (int): The SKU (Stock Keeping Unit) of the part.
+
+        Returns:
+            Part: A copy of the part with the specified SKU.
+
+        Raises:
+            ValueError: If the part with the specified SKU is not found in the inventory.
+        """
+        return decodeParts(self._call(self._shard(sku), "getPart", sku))[0]
+
+    def search(self, part_class, **kwargs):
+        """
+        Search every shard in parallel and merge the matches.
+
+        Args:
+            part_class (class): The class of the part to search for (e.g., Resistor, Solder).
+            **kwargs: Search criteria, as accepted by InventoryManager.search.
+
+        Returns:
+            list: Copies of the parts matching the search criteria.
+
+        Raises:
+            ValueError: If a criterion uses an unknown operator.
+        """
+        InventoryManager._parseCriteria(kwargs)  # Reject bad criteria before involving the shards
+        results = []
+        for data in self._broadcast("search", part_class, kwargs):
+            results.extend(decodeParts(data))
+        return results
+
+    def deletePart(self, sku):
+        """
+        Delete a part from the inventory.
+
+        Args:
+            sku (int): The SKU (Stock Keeping Unit) of the part to delete.
+
+        Raises:
+            ValueError: If the part with the specified SKU is not found in the inventory.
+        """
+        self._call(self._shard(sku), "deletePart", sku)
+
+    def deleteParts(self, skus):
+        """
+        Delete many parts from the inventory, sending each shard its SKUs in one message.
+
+        Args:
+            skus (iterable): The SKUs of the parts to delete.
+
+        Returns:
+            list: One (position, sku, message) tuple per SKU that was not found, as in InventoryManager.deleteParts.
+        """
+        batches = {}
+        for position, sku in enumerate(skus):
+            positions, shard_skus = batches.setdefault(self._shard(sku), ([], []))
+            positions.append(position)
+            shard_skus.append(sku)
+        results = self._fanOut({shard: ("deleteParts", (shard_skus,)) for shard, (_, shard_skus) in batches.items()})
+        failures = []
+        for shard, shard_failures in results.items():
+            positions = batches[shard][0]
+            failures.extend((positions[position], sku, message) for position, sku, message in shard_failures)
+        failures.sort(key=lambda failure: failure[0])
+        return failures
+
+    def createIndex(self, part_class, attribute):
+        """
+        Create a secondary hash index on every shard.
+        """
+        self._broadcast("createIndex", part_class, attribute)
+
+    def dropIndex(self, part_class, attribute):
+        """
+        Remove a secondary index from every shard.
+
+        Raises:
+            ValueError: If no such index exists.
+        """
+        self._broadcast("dropIndex", part_class, attribute)
+
+    def createSortedIndex(self, part_class, attribute):
+        """
+        Create a sorted index on every shard.
+        """
+        self._broadcast("createSortedIndex", part_class, attribute)
+
+    def dropSortedIndex(self, part_class, attribute):
+        """
+        Remove a sorted index from every shard.
+
+        Raises:
+            ValueError: If no such index exists.
+        """
+        self._broadcast("dropSortedIndex", part_class, attribute)
@@ -0,0 +1,538 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from enum import Enum
+from operator import attrgetter
+from inventorymanager import InventoryManager, _LISTING_ORDERS
+from partcharacteristics import Part
+from parttypes import registeredPartTypes
+
+# The most parameters put in one IN (...) list, well under SQLite's limit on host parameters
+_CHUNK = 500
+
+# addParts batches of at least this many parts refresh the query planner statistics
+_ANALYZE_BATCH = 1000
+
+_COMPARISONS = {"eq": "=", "ne": "!=", "lt": "<", "lte": "<=", "gt": ">", "gte": ">="}
+
+_COMMON_COLUMNS = ("sku", "quantity", "last_updated")
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+def _storeValue(value):
+    """
+    Convert a Python value to the form it is stored in: enum members by name, timestamps as fixed-width ISO 8601
+    text (so they sort correctly as text).
+    """
+    if isinstance(value, Enum):
+        return value.name
+    if isinstance(value, datetime):
+        return value.isoformat(" ", "microseconds")
+    return value
+
+class _Table:
+    """
+    The SQL table of one registered part class, with its prepared statement texts and row converters.
+    """
+
+    def __init__(self, part_type):
+        self.part_class = part_type.part_class
+        self.name = part_type.part_class.__name__
+        self.table = _quote(self.name)
+        self.fields = tuple(field.name for field in part_type.fields)
+        self.columns = frozenset(self.fields + _COMMON_COLUMNS)
+        self.converters = tuple(field.annotation.__getitem__ if isinstance(field.annotation, type) and issubclass(field.annotation, Enum) else None
+                                for field in part_type.fields)
+        self.enumPositions = tuple(position for position, converter in enumerate(self.converters) if converter is not None)
+        self.getter = attrgetter("sku", *self.fields)
+        self.definitions = []
+        for field in part_type.fields:
+            annotation = field.annotation
+            if annotation is int:
+                definition = "INTEGER"
+            elif annotation is float:
+                definition = "REAL"
+            elif isinstance(annotation, type) and issubclass(annotation, Enum):
+                names = ", ".join("'" + member.name + "'" for member in annotation)
+                definition = f"TEXT CHECK ({_quote(field.name)} IN ({names}))"
+            else:
+                definition = "TEXT"
+            self.definitions.append(f"{_quote(field.name)} {definition} NOT NULL")
+        columns = ", ".join(f"t.{_quote(field)}" for field in self.fields)
+        self.select = f"SELECT p.sku, p.quantity, p.last_updated{', ' + columns if columns else ''} FROM {self.table} t JOIN parts p ON p.sku = t.sku"
+        placeholders = ", ".join("?" for _ in range(len(self.fields) + 1))
+        self.insert = f"INSERT INTO {self.table} (sku{''.join(', ' + _quote(field) for field in self.fields)}) VALUES ({placeholders})"
+
+    def row(self, part):
+        """
+        Get the class-specific row of a part.
+        """
+        values = list(self.getter(part))
+        for position in self.enumPositions:
+            values[position + 1] = values[position + 1].name
+        return values
+
+    def part(self, row):
+        """
+        Build a part from a row selected with self.select.
+        """
+        values = [value if converter is None else converter(value) for converter, value in zip(self.converters, row[3:])]
+        part = self.part_class(row[0], datetime.fromisoformat(row[2]), *values)
+        part.quantity = row[1]
+        return part
+
+class SqliteInventoryManager:
+    """
+    An InventoryManager-compatible inventory stored in an SQLite database.
+
+    The database has a parts table holding every part's SKU, class, quantity and last updated timestamp, and one
+    table per registered part class (see parttypes.registerPartType) holding the class-specific fields, with
+    enum fields stored by member name. Every field column is indexed, so search is translated into one indexed
+    SQL query per matching part class instead of a scan. The database uses WAL journaling, so readers in other
+    processes (e.g., ad-hoc SQL from the sqlite3 shell) do not block writes, and batch operations are sent with
+    executemany in a single transaction.
+
+    Parts returned by getPart, getInventory, listParts and search are snapshots: assigning to them does not
+    change the stored part. Use addInventory to change quantities, and addPart to replace a part. SKUs must be
+    integers, and inventory listeners are not supported.
+
+    The manager can be shared between threads; operations are serialized.
+
+    Attributes:
+        path (str): The database file, or ":memory:".
+        connection (sqlite3.Connection): The open database connection.
+        indexes (set): The (part_class, attribute) pairs declared with createIndex.
+        sortedIndexes (set): The (part_class, attribute) pairs declared with createSortedIndex.
+    """
+
+    def __init__(self, path=":memory:", synchronous="NORMAL"):
+        """
+        Initializes a new instance of the SqliteInventoryManager class, creating the tables and indexes if needed.
+
+        Args:
+            path (str): The database file; ":memory:" keeps the database in memory.
+            synchronous (str): The SQLite synchronous setting; "NORMAL" is durable across application crashes
+                in WAL mode, "FULL" also across power loss.
+        """
+        self.path = path
+        self.connection = sqlite3.connect(path, check_same_thread=False, cached_statements=512, isolation_level=None)
+        self._lock = threading.RLock()
+        self._tables = {part_type.part_class: _Table(part_type) for part_type in registeredPartTypes()}
+        self._byName = {table.name: table for table in self._tables.values()}
+        self._sql = {}
+        self.indexes = set()
+        self.sortedIndexes = set()
+        connection = self.connection
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute(f"PRAGMA synchronous = {synchronous}")
+        connection.execute("PRAGMA foreign_keys = ON")
+        connection.execute("PRAGMA analysis_limit = 1000")  # ANALYZE samples each index instead of reading it all
+        with self._transaction():
+            connection.execute("CREATE TABLE IF NOT EXISTS parts (sku INTEGER PRIMARY KEY, type TEXT NOT NULL, "
+                               "quantity INTEGER NOT NULL, last_updated TEXT NOT NULL)")
+            connection.execute("CREATE INDEX IF NOT EXISTS parts_quantity ON parts (quantity)")
+            connection.execute("CREATE INDEX IF NOT EXISTS parts_last_updated ON parts (last_updated)")
+            for table in self._tables.values():
+                definitions = "".join(", " + definition for definition in table.definitions)
+                connection.execute(f"CREATE TABLE IF NOT EXISTS {table.table} "
+                                   f"(sku INTEGER PRIMARY KEY REFERENCES parts (sku) ON DELETE CASCADE{definitions})")
+                for field in table.fields:
+                    connection.execute(f"CREATE INDEX IF NOT EXISTS {_quote(table.name + '_' + field)} ON {table.table} ({_quote(field)})")
+
+    def analyze(self):
+        """
+        Refresh the statistics SQLite uses to pick the most selective index for each search.
+
+        This runs after every large addParts; call it after loading a catalog part by part.
+        """
+        with self._lock:
+            self.connection.execute("ANALYZE")
+
+    def close(self):
+        """
+        Close the database connection.
+        """
+        with self._lock:
+            self.connection.close()
+
+    @contextmanager
+    def _transaction(self):
+        """
+        Run a with block in one transaction, committing it or rolling it back if the block raises.
+        """
+        self.connection.execute("BEGIN")
+        try:
+            yield
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+        self.connection.execute("COMMIT")
+
+    def _table(self, part):
+        table = self._tables.get(type(part))
+        if table is None:
+            raise ValueError(f"Error, Part type {type(part).__name__} is not registered.")
+        return table
+
+    def _insert(self, parts):
+        """
+        Store parts, replacing any stored part with the same SKU, inside the current transaction.
+        """
+        connection = self.connection
+        byTable = {}
+        for part in parts:
+            byTable.setdefault(self._table(part), []).append(part)
+        replaced = self._existing(part.sku for batch in byTable.values() for part in batch)
+        if replaced:
+            connection.executemany("DELETE FROM parts WHERE sku = ?", [(sku,) for sku in replaced])
+        for table, batch in byTable.items():
+            connection.executemany("INSERT INTO parts (sku, type, quantity, last_updated) VALUES (?, ?, ?, ?)",
+                                   [(part.sku, table.name, part.quantity, _storeValue(part.last_updated)) for part in batch])
+            connection.executemany(table.insert, [table.row(part) for part in batch])
+
+    def _existing(self, skus):
+        """
+        Get which of the given SKUs are stored.
+        """
+        skus = list(skus)
+        found = set()
+        for start in range(0, len(skus), _CHUNK):
+            chunk = skus[start:start + _CHUNK]
+            query = f"SELECT sku FROM parts WHERE sku IN ({', '.join('?' * len(chunk))})"
+            found.update(sku for sku, in self.connection.execute(query, chunk))
+        return found
+
+    def _load(self, rows):
+        """
+        Build parts from (sku, type) rows of the parts table, in the same order.
+        """
+        byTable = {}
+        for sku, name in rows:
+            byTable.setdefault(self._byName[name], []).append(sku)
+        parts = {}
+        for table, skus in byTable.items():
+            for start in range(0, len(skus), _CHUNK):
+                chunk = skus[start:start + _CHUNK]
+                query = f"{table.select} WHERE t.sku IN ({', '.join('?' * len(chunk))})"
+                for row in self.connection.execute(query, chunk):
+                    parts[row[0]] = table.part(row)
+        return [parts[sku] for sku, _ in rows]
+
+    def addPart(self, part):
+        """
+        Add a part to the inventory.
+
+        If a part with the same SKU already exists, it is replaced.
+
+        Args:
+            part (Part): The part to be added to the inventory.
+
+        Raises:
+            ValueError: If the part's class is not registered.
+        """
+        with self._lock, self._transaction():
+            self._insert([part])
+
+    def addParts(self, parts):
+        """
+        Add many parts to the inventory in one transaction.
+
+        Args:
+            parts (iterable): The parts to be added to the inventory.
+
+        Returns:
+            list: One (position, sku, message) tuple per rejected entry, as in InventoryManager.addParts.
+        """
+        failures = []
+        pending = {}
+        for position, part in enumerate(parts):
+            if not isinstance(part, Part):
+                failures.append((position, None, "Invalid part."))
+            elif type(part) not in self._tables:
+                failures.append((position, part.sku, f"Error, Part type {type(part).__name__} is not registered."))
+            else:
+                pending[part.sku] = part
+        with self._lock:
+            with self._transaction():
+                self._insert(pending.values())
+            if len(pending) >= _ANALYZE_BATCH:
+                self.analyze()
+        return failures
+
+    def addInventory(self, sku, quantity):
+        """
+        Add inventory for a specific part.
+
+        Args:
+            sku (int): The SKU (Stock Keeping Unit) of the part.
+            quantity (int): The quantity of the part to be added to the inventory.
+
+        Raises:
+            ValueError: If the part with the specified SKU is not found in the inventory.
+        """
+        with self._lock:
+            cursor = self.connection.execute("UPDATE parts SET quantity = quantity + ?, last_updated = ? WHERE sku = ?",
+                                             (quantity, _storeValue(datetime.now()), sku))
+        if cursor.rowcount == 0:
+            raise ValueError("Part not found in inventory.")
+
+    def addInventoryBatch(self, items):
+        """
+        Add inventory for many parts in one transaction.
+
+        Args:
+            items (iterable): (sku, quantity) pairs.
+
+        Returns:
+            list: One (position, sku, message) tuple per rejected line, as in InventoryManager.addInventoryBatch.
+        """
+        failures = []
+        lines = []
+        for position, item in enumerate(items):
+            try:
+                sku, quantity = item
+            except (TypeError, ValueError):
+                failures.append((position, None, "Invalid inventory line."))
+                continue
+            if not isinstance(quantity, int):
+                failures.append((position, sku, "Invalid quantity."))
+            else:
+                lines.append((position, sku, quantity))
+        with self._lock, self._transaction():
+            existing = self._existing({sku for _, sku, _ in lines})
+            totals = {}
+            for position, sku, quantity in lines:
+                if sku in existing:
+                    totals[sku] = totals.get(sku, 0) + quantity
+                else:
+                    failures.append((position, sku, "Part not found in inventory."))
+            now = _storeValue(datetime.now())
+            self.connection.executemany("UPDATE parts SET quantity = quantity + ?, last_updated = ? WHERE sku = ?",
+                                        [(quantity, now, sku) for sku, quantity in totals.items()])
+        failures.sort(key=lambda failure: failure[0])
+        return failures
+
+    def getQuantity(self, sku):
+        """
+        Get the quantity of a specific part in the inventory.
+
+        Args:
+            sku (int): The SKU (Stock Keeping Unit) of the part.
+
+        Returns:
+            int: The quantity of the part in the inventory.
+
+        Raises:
+            ValueError: If the part with the specified SKU is not found in the inventory.
+        """
+        with self._lock:
+            row = self.connection.execute("SELECT quantity FROM parts WHERE sku = ?", (sku,)).fetchone()
+        if row is None:
+            raise ValueError("Part not found in inventory.")
+        return row[0]
+
+    def getInventory(self):
+        """
+        Get a snapshot of the entire inventory.
+
+        Returns:
+            dict: A dictionary mapping SKUs to copies of the parts in the inventory.
+        """
+        inventory = {}
+        with self._lock:
+            for table in self._tables.values():
+                for row in self.connection.execute(table.select):
+                    inventory[row[0]] = table.part(row)
+        return inventory
+
+    def getPart(self, sku):
+        """
+        Get a copy of a specific part from the inventory.
+
+        Args:
+            sku (int): The SKU (Stock Keeping Unit) of the part.
+
+        Returns:
+            Part: A copy of the part with the specified SKU.
+
+        Raises:
+            ValueError: If the part with the specified SKU is not found in the inventory.
+        """
+        with self._lock:
+            row = self.connection.execute("SELECT type FROM parts WHERE sku = ?", (sku,)).fetchone()
+            if row is None:
+                raise ValueError("Error, Part not found in inventory.")
+            table = self._byName[row[0]]
+            return table.part(self.connection.execute(f"{table.select} WHERE t.sku = ?", (sku,)).fetchone())
+
+    def listParts(self, orderBy="sku", part_class=None, after=None, limit=100, descending=False):
+        """
+        Get one page of the inventory in a stable order, read through the index on the ordering column.
+
+        Args:
+            orderBy (str): "sku", "quantity" or "last_updated".
+            part_class (class): Only list parts of this class; None lists every part.
+            after (tuple): The cursor returned with the previous page, or None for the first page.
+            limit (int): The maximum number of parts on the page.
+            descending (bool): Whether to list the largest values first.
+
+        Returns:
+            tuple: (parts, cursor), as in InventoryManager.listParts.
+
+        Raises:
+            ValueError: If the order is not supported or the limit is less than 1.
+        """
+        if orderBy not in _LISTING_ORDERS:
+            raise ValueError(f"Unknown listing order '{orderBy}'.")
+        if limit < 1:
+            raise ValueError("Invalid limit.")
+        conditions = []
+        parameters = []
+        if after is not None:
+            conditions.append(f"({orderBy}, sku) {'<' if descending else '>'} (?, ?)")
+            parameters.extend((_storeValue(after[0]), after[1]))
+        if part_class is not None:
+            names = [table.name for cls, table in self._tables.items() if issubclass(cls, part_class)]
+            conditions.append(f"type IN ({', '.join('?' * len(names))})")
+            parameters.extend(names)
+        direction = " DESC" if descending else ""
+        query = (f"SELECT sku, type FROM parts{' WHERE ' + ' AND '.join(conditions) if conditions else ''} "
+                 f"ORDER BY {orderBy}{direction}, sku{direction} LIMIT ?")
+        parameters.append(limit + 1)
+        with self._lock:
+            rows = self.connection.execute(query, parameters).fetchall()
+            parts = self._load(rows[:limit])
+        if len(rows) <= limit:
+            return parts, None
+        last = parts[-1]
+        return parts, (getattr(last, orderBy), last.sku)
+
+    iterParts = InventoryManager.iterParts
+
+    def search(self, part_class, **kwargs):
+        """
+        Search for parts with indexed SQL queries, one per stored class that is part_class or a subclass of it.
+
+        Args:
+            part_class (class): The class of the part to search for (e.g., Resistor, Solder).
+            **kwargs: Search criteria, as accepted by InventoryManager.search.
+
+        Returns:
+            list: Copies of the parts matching the search criteria.
+
+        Raises:
+            ValueError: If a criterion uses an unknown operator.
+        """
+        criteria = InventoryManager._parseCriteria(kwargs)
+        shape = tuple((attribute, op) for attribute, op, _ in criteria)
+        parameters = []
+        for _, op, value in criteria:
+            if op == "between":
+                low, high = value
+                parameters.extend((_storeValue(low), _storeValue(high)))
+            else:
+                parameters.append(_storeValue(value))
+        results = []
+        with self._lock:
+            for cls, table in self._tables.items():
+                if not issubclass(cls, part_class) or any(attribute not in table.columns for attribute, _ in shape):
+                    continue  # Parts without a criterion's attribute never match, as in InventoryManager.search
+                query = self._sql.get((cls, shape))
+                if query is None:
+                    conditions = []
+                    for attribute, op in shape:
+                        column = ("p." if attribute in _COMMON_COLUMNS else "t.") + _quote(attribute)
+                        conditions.append(f"{column} BETWEEN ? AND ?" if op == "between" else f"{column} {_COMPARISONS[op]} ?")
+                    query = self._sql[(cls, shape)] = table.select + (" WHERE " + " AND ".join(conditions) if conditions else "")
+                results.extend(table.part(row) for row in self.connection.execute(query, parameters))
+        return results
+
+    def deletePart(self, sku):
+        """
+        Delete a part from the inventory.
+
+        Args:
+            sku (int): The SKU (Stock Keeping Unit) of the part to delete.
+
+        Raises:
+            ValueError: If the part with the specified SKU is not found in the inventory.
+        """
+        with self._lock, self._transaction():
+            cursor = self.connection.execute("DELETE FROM parts WHERE sku = ?", (sku,))
+        if cursor.rowcount == 0:
+            raise ValueError("Error, Part not found in inventory.")
+
+    def deleteParts(self, skus):
+        """
+        Delete many parts from the inventory in one transaction.
+
+        Args:
+            skus (iterable): The SKUs of the parts to delete.
+
+        Returns:
+            list: One (position, sku, message) tuple per SKU that was not found, as in InventoryManager.deleteParts.
+        """
+        skus = list(skus)
+        failures = []
+        with self._lock, self._transaction():
+            existing = self._existing(set(skus))
+            for position, sku in enumerate(skus):
+                if sku in existing:
+                    existing.discard(sku)  # A repeated SKU is not found the second time
+                else:
+                    failures.append((position, sku, "Error, Part not found in inventory."))
+            self.connection.executemany("DELETE FROM parts WHERE sku = ?", [(sku,) for sku in set(skus)])
+        return failures
+
+    def createIndex(self, part_class, attribute):
+        """
+        Declare a secondary index, for InventoryManager compatibility. Every field column already has an SQLite
+        index, which serves both equality and range criteria, so only the declaration is recorded.
+
+        Args:
+            part_class (class): The class of the parts to index (e.g., Resistor).
+            attribute (str): The name of the attribute to index (e.g., "resistance").
+        """
+        self.indexes.add((part_class, attribute))
+
+    def dropIndex(self, part_class, attribute):
+        """
+        Remove a declared secondary index. The column's SQLite index is kept, since searches rely on it.
+
+        Args:
+            part_class (class): The class the index was declared for.
+            attribute (str): The indexed attribute.
+
+        Raises:
+            ValueError: If no such index was declared.
+        """
+        if (part_class, attribute) not in self.indexes:
+            raise ValueError("Error, Index not found.")
+        self.indexes.discard((part_class, attribute))
+
+    def createSortedIndex(self, part_class, attribute):
+        """
+        Declare a sorted index, for InventoryManager compatibility (see createIndex).
+
+        Args:
+            part_class (class): The class of the parts to index (e.g., Wire).
+            attribute (str): The name of the numeric attribute to index (e.g., "length").
+        """
+        self.sortedIndexes.add((part_class, attribute))
+
+    def dropSortedIndex(self, part_class, attribute):
+        """
+        Remove a declared sorted index (see dropIndex).
+
+        Args:
+            part_class (class): The class the index was declared for.
+            attribute (str): The indexed attribute.
+
+        Raises:
+            ValueError: If no such index was declared.
+        """
+        if (part_class, attribute) not in self.sortedIndexes:
+            raise ValueError("Error, Index not found.")
+        self.sortedIndexes.discard((part_class, attribute))
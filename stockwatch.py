@@ -0,0 +1,193 @@
+import heapq
+
+class StockWatch:
+    """
+    Reorder thresholds for an inventory, with an incrementally maintained low-stock list.
+
+    Thresholds can be set per SKU or per part class; a SKU threshold overrides a class threshold, and a class
+    threshold applies to subclasses unless they have their own. A part is below its threshold when its quantity
+    is less than the threshold.
+
+    Every watched part has an entry in a min-heap keyed by its margin (quantity minus threshold). The watch is
+    an inventory listener, so addInventory (including negative quantities for consumption) and any other
+    quantity change push a new entry; stale entries are skipped and periodically compacted away. Since every
+    heap node is no smaller than its parent, belowThreshold only walks the nodes with a negative margin, which
+    takes O(k) for k low-stock parts instead of a scan of the whole inventory.
+
+    Attributes:
+        inventoryManager (InventoryManager): The watched inventory.
+        skuThresholds (dict): Thresholds by SKU.
+        classThresholds (dict): Thresholds by part class.
+        subscribers (list): Callbacks notified when a part crosses its threshold (see subscribe).
+    """
+
+    def __init__(self, inventoryManager):
+        """
+        Initializes a new instance of the StockWatch class.
+
+        Args:
+            inventoryManager (InventoryManager): The inventory to watch; call attach to start watching it.
+        """
+        self.inventoryManager = inventoryManager
+        self.skuThresholds = {}
+        self.classThresholds = {}
+        self.subscribers = []
+        self._heap = []  # (margin, stamp, sku); the unique stamp keeps SKUs from ever being compared
+        self._watched = {}  # sku -> (margin, threshold, stamp, part)
+        self._stamp = 0
+
+    def attach(self):
+        """
+        Register with the inventory manager as a listener.
+        """
+        self.inventoryManager.addListener(self)
+
+    def detach(self):
+        """
+        Unregister from the inventory manager.
+        """
+        self.inventoryManager.removeListener(self)
+
+    def setThreshold(self, sku, threshold):
+        """
+        Set or clear the reorder threshold of one SKU.
+
+        Args:
+            sku (int): The SKU (Stock Keeping Unit) of the part.
+            threshold (int): The threshold, or None to fall back to the part's class threshold.
+        """
+        if threshold is None:
+            self.skuThresholds.pop(sku, None)
+        else:
+            self.skuThresholds[sku] = threshold
+        part = self.inventoryManager.inventory.get(sku)
+        if part is not None:
+            self._refresh(part)
+
+    def setClassThreshold(self, part_class, threshold):
+        """
+        Set or clear the reorder threshold of a part class and its subclasses.
+
+        Args:
+            part_class (class): The class of the parts (e.g., Resistor).
+            threshold (int): The threshold, or None to clear it.
+        """
+        if threshold is None:
+            self.classThresholds.pop(part_class, None)
+        else:
+            self.classThresholds[part_class] = threshold
+        for part in self.inventoryManager.inventory.values():
+            if isinstance(part, part_class):
+                self._refresh(part)
+
+    def thresholdFor(self, part):
+        """
+        Get the reorder threshold that applies to a part.
+
+        Args:
+            part (Part): The part.
+
+        Returns:
+            int: The threshold, or None if the part is not watched.
+        """
+        threshold = self.skuThresholds.get(part.sku)
+        if threshold is None and self.classThresholds:
+            for base in type(part).__mro__:
+                threshold = self.classThresholds.get(base)
+                if threshold is not None:
+                    break
+        return threshold
+
+    def belowThreshold(self):
+        """
+        Get the parts whose quantity is below their reorder threshold.
+
+        Returns:
+            list: The parts, with the largest shortfall first.
+        """
+        heap = self._heap
+        watched = self._watched
+        found = []
+        pending = [0] if heap else []
+        while pending:
+            position = pending.pop()
+            margin, stamp, sku = heap[position]
+            if margin >= 0:
+                continue  # Every node below this one has a margin of at least this much
+            entry = watched.get(sku)
+            if entry is not None and entry[2] == stamp:
+                found.append((margin, entry[3]))
+            child = 2 * position + 1
+            if child < len(heap):
+                pending.append(child)
+                if child + 1 < len(heap):
+                    pending.append(child + 1)
+        found.sort(key=lambda item: item[0])
+        return [part for _, part in found]
+
+    def subscribe(self, callback):
+        """
+        Register a callback to be notified when a part crosses its reorder threshold.
+
+        The callback is called as callback(part, threshold, below) as soon as the change is made: below is True
+        when the part drops below its threshold (including when a low-stock part is added) and False when it is
+        restocked to the threshold or above, or stops being watched (its threshold is cleared or it is deleted).
+
+        Args:
+            callback (callable): The callback to register.
+        """
+        if callback not in self.subscribers:
+            self.subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        """
+        Unregister a callback previously registered with subscribe.
+
+        Args:
+            callback (callable): The callback to remove.
+        """
+        if callback in self.subscribers:
+            self.subscribers.remove(callback)
+
+    def __call__(self, event, part, name, old, new):
+        """
+        Inventory listener that re-evaluates parts whose quantity or presence changed.
+        """
+        if event == "update":
+            if name == "quantity" and old != new:
+                self._refresh(part)
+        elif event == "add":
+            self._refresh(part)
+        else:
+            previous = self._watched.pop(part.sku, None)
+            if previous is not None and previous[0] < 0:  # A low-stock part stops being watched
+                for callback in self.subscribers:
+                    callback(part, previous[1], False)
+
+    def _refresh(self, part):
+        """
+        Recompute a part's margin, push its new heap entry and notify subscribers if it crossed its threshold.
+        """
+        sku = part.sku
+        threshold = self.thresholdFor(part)
+        previous = self._watched.pop(sku, None)
+        was_below = previous is not None and previous[0] < 0
+        below = False
+        if threshold is not None:
+            margin = part.quantity - threshold
+            below = margin < 0
+            self._stamp += 1
+            self._watched[sku] = (margin, threshold, self._stamp, part)
+            heapq.heappush(self._heap, (margin, self._stamp, sku))
+            if len(self._heap) > 2 * len(self._watched) + 64:
+                self._compact()
+        if below != was_below:
+            for callback in self.subscribers:
+                callback(part, threshold if threshold is not None else previous[1], below)
+
+    def _compact(self):
+        """
+        Rebuild the heap from the live entries, dropping stale ones.
+        """
+        self._heap = [(margin, stamp, sku) for sku, (margin, _, stamp, _) in self._watched.items()]
+        heapq.heapify(self._heap)
@@ -0,0 +1,278 @@
+import threading
+from datetime import datetime
+
+class TransactionConflict(ValueError):
+    """
+    Raised when a transaction's parts were changed by another transaction after it read them.
+
+    The transaction was not applied; rebuild it from the current state and try again (see StockLedger.run).
+    """
+
+class StockLedger:
+    """
+    Reserved quantities and per-SKU versions for all-or-nothing stock transactions.
+
+    A reservation holds stock for a pick list without removing it: the part's quantity is unchanged, but the
+    reserved amount is no longer available to other reservations. Committing a reservation withdraws it from
+    the quantity; releasing it makes it available again. Every part keeps the invariants
+    0 <= reserved <= quantity.
+
+    Each SKU has a version that increases whenever a transaction changes it. Transactions remember the version
+    of each SKU when they first stage an operation on it and fail with TransactionConflict if it changed before
+    they executed. Executing locks only the lock stripes of the SKUs involved, always in the same order, so
+    transactions over different SKUs run concurrently and there is no global lock. When the inventory is a
+    ConcurrentInventoryManager, its own SKU stripes are used, so addInventory calls are atomic with respect to
+    transactions too.
+
+    The ledger is an inventory listener: deleting a part drops its reservation and bumps its version (so
+    transactions staged before the delete conflict instead of applying to a re-added part), and a quantity set
+    directly below the reserved amount shrinks the reservation to match. addInventory refuses to take the
+    quantity below the reserved amount (see checkQuantity).
+
+    Attributes:
+        inventoryManager (InventoryManager): The inventory whose stock is reserved.
+    """
+
+    def __init__(self, inventoryManager, stripeCount=64):
+        """
+        Initializes a new instance of the StockLedger class.
+
+        Args:
+            inventoryManager (InventoryManager): The inventory whose stock is reserved.
+            stripeCount (int): The number of SKU lock stripes, unless the inventory provides its own.
+        """
+        self.inventoryManager = inventoryManager
+        stripes = getattr(inventoryManager, "stripes", None)
+        self._stripes = stripes() if stripes is not None else [threading.Lock() for _ in range(stripeCount)]
+        self._reserved = {}
+        self._versions = {}
+
+    def attach(self):
+        """
+        Register with the inventory manager as a listener.
+        """
+        self.inventoryManager.addListener(self)
+
+    def detach(self):
+        """
+        Unregister from the inventory manager.
+        """
+        self.inventoryManager.removeListener(self)
+
+    def __call__(self, event, part, name, old, new):
+        """
+        Inventory listener that keeps reservations within the parts' quantities.
+        """
+        sku = part.sku
+        if event == "delete":
+            self._reserved.pop(sku, None)
+            self._versions[sku] = self._versions.get(sku, 0) + 1
+        elif event == "add" or name == "quantity":
+            reserved = self._reserved.get(sku)
+            if reserved is not None and reserved > part.quantity:
+                if part.quantity > 0:
+                    self._reserved[sku] = part.quantity
+                else:
+                    del self._reserved[sku]
+
+    def checkQuantity(self, sku, quantity):
+        """
+        Check that a part's quantity can be set to a new value without dropping below its reserved quantity.
+
+        Args:
+            sku (int): The SKU (Stock Keeping Unit) of the part.
+            quantity (int): The new quantity.
+
+        Raises:
+            ValueError: If the new quantity is less than the reserved quantity.
+        """
+        reserved = self._reserved.get(sku, 0)
+        if quantity < reserved:
+            raise ValueError(f"Error, Part {sku} has {reserved} reserved.")
+
+    def _stripeNumber(self, sku):
+        return hash(sku) % len(self._stripes)
+
+    def transaction(self):
+        """
+        Start a new transaction.
+
+        Returns:
+            Transaction: An empty transaction; stage operations on it, then call execute.
+        """
+        return Transaction(self)
+
+    def run(self, build, retries=10):
+        """
+        Build and execute a transaction, rebuilding and retrying it when it conflicts with another one.
+
+        Args:
+            build (callable): Called as build(transaction) to stage the operations, reading the ledger as
+                needed; called again on each retry.
+            retries (int): The number of retries after a conflict.
+
+        Returns:
+            Transaction: The executed transaction.
+
+        Raises:
+            TransactionConflict: If every attempt conflicted.
+            ValueError: If the transaction would break an invariant or a part is not in the inventory.
+        """
+        for attempt in range(retries + 1):
+            transaction = Transaction(self)
+            build(transaction)
+            try:
+                transaction.execute()
+                return transaction
+            except TransactionConflict:
+                if attempt == retries:
+                    raise
+
+    def reserved(self, sku):
+        """
+        Get the reserved quantity of a part.
+
+        Args:
+            sku (int): The SKU (Stock Keeping Unit) of the part.
+
+        Returns:
+            int: The quantity held by uncommitted reservations.
+        """
+        return self._reserved.get(sku, 0)
+
+    def available(self, sku):
+        """
+        Get the quantity of a part that can still be reserved.
+
+        Args:
+            sku (int): The SKU (Stock Keeping Unit) of the part.
+
+        Returns:
+            int: The quantity minus the reserved quantity.
+
+        Raises:
+            ValueError: If the part with the specified SKU is not found in the inventory.
+        """
+        return self.inventoryManager.getQuantity(sku) - self._reserved.get(sku, 0)
+
+    def version(self, sku):
+        """
+        Get the version of a part, which increases each time a transaction changes it.
+
+        Args:
+            sku (int): The SKU (Stock Keeping Unit) of the part.
+
+        Returns:
+            int: The version.
+        """
+        return self._versions.get(sku, 0)
+
+class Transaction:
+    """
+    A staged set of reserve, commit and release operations over one or more SKUs, applied all-or-nothing.
+
+    Operations are applied in the order they were staged, so a transaction can reserve and commit the same
+    stock. Nothing changes until execute is called.
+    """
+
+    def __init__(self, ledger):
+        """
+        Initializes a new instance of the Transaction class.
+
+        Args:
+            ledger (StockLedger): The ledger the transaction applies to.
+        """
+        self.ledger = ledger
+        self.operations = []
+        self.expectedVersions = {}
+        self.executed = False
+
+    def _stage(self, kind, sku, quantity):
+        if isinstance(quantity, bool) or not isinstance(quantity, int) or quantity <= 0:
+            raise ValueError("Invalid quantity.")
+        if self.executed:
+            raise ValueError("Error, Transaction has already been executed.")
+        self.expectedVersions.setdefault(sku, self.ledger.version(sku))
+        self.operations.append((kind, sku, quantity))
+        return self
+
+    def reserve(self, sku, quantity):
+        """
+        Stage holding quantity units of a part for this pick list.
+
+        Returns:
+            Transaction: This transaction, so operations can be chained.
+        """
+        return self._stage("reserve", sku, quantity)
+
+    def commit(self, sku, quantity):
+        """
+        Stage withdrawing quantity previously reserved units of a part from its stock.
+
+        Returns:
+            Transaction: This transaction, so operations can be chained.
+        """
+        return self._stage("commit", sku, quantity)
+
+    def release(self, sku, quantity):
+        """
+        Stage returning quantity previously reserved units of a part to the available stock.
+
+        Returns:
+            Transaction: This transaction, so operations can be chained.
+        """
+        return self._stage("release", sku, quantity)
+
+    def execute(self):
+        """
+        Apply every staged operation, or none of them.
+
+        Raises:
+            TransactionConflict: If another transaction changed one of the parts since it was staged.
+            ValueError: If a part is not in the inventory, or an operation would make a part's available or
+                reserved quantity negative.
+        """
+        if self.executed:
+            raise ValueError("Error, Transaction has already been executed.")
+        ledger = self.ledger
+        stripes = sorted({ledger._stripeNumber(sku) for sku in self.expectedVersions})
+        for number in stripes:  # Always acquired in stripe order so transactions cannot deadlock
+            ledger._stripes[number].acquire()
+        try:
+            for sku, version in self.expectedVersions.items():
+                if ledger._versions.get(sku, 0) != version:
+                    raise TransactionConflict(f"Error, Part {sku} was changed by another transaction.")
+            inventory = ledger.inventoryManager.inventory
+            state = {}
+            for sku in self.expectedVersions:
+                part = inventory.get(sku)
+                if part is None:
+                    raise ValueError("Part not found in inventory.")
+                state[sku] = [part.quantity, ledger._reserved.get(sku, 0)]
+            for kind, sku, quantity in self.operations:
+                totals = state[sku]
+                if kind == "reserve":
+                    totals[1] += quantity
+                else:
+                    totals[1] -= quantity
+                    if kind == "commit":
+                        totals[0] -= quantity
+                if totals[1] < 0:
+                    raise ValueError(f"Error, Part {sku} does not have {quantity} reserved.")
+                if totals[1] > totals[0]:
+                    raise ValueError(f"Error, Part {sku} does not have {quantity} available.")
+            now = datetime.now()
+            for sku, (quantity, reserved) in state.items():
+                part = inventory[sku]
+                if part.quantity != quantity:
+                    part.last_updated = now
+                    part.quantity = quantity
+                if reserved:
+                    ledger._reserved[sku] = reserved
+                else:
+                    ledger._reserved.pop(sku, None)
+                ledger._versions[sku] = ledger._versions.get(sku, 0) + 1
+            self.executed = True
+        finally:
+            for number in reversed(stripes):
+                ledger._stripes[number].release()
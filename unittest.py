@@ -1,7 +1,29 @@
 import unittest
+import asyncio
+import io
+import json
+import os
+import tempfile
+import threading
+import time
 from datetime import datetime
+from fractions import Fraction
 from partcharacteristics import *
 from inventorymanager import *
+from queryengine import *
+from inventoryjournal import *
+from mappedinventory import *
+from inventoryio import *
+from concurrentinventory import *
+from inventoryserver import *
+from shardedinventory import *
+from parttypes import *
+from inventorybenchmark import *
+from instrumentation import *
+from stockwatch import *
+from changefeed import *
+from transactions import *
+from sqliteinventory import *
 
 class TestInventoryManager(unittest.TestCase):
     """
@@ -132,5 +154,853 @@ class TestInventoryManager(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.inventory_manager.deletePart(2)
 
+    def testSearchWithIndex(self):
+        """
+        Test searching for parts through a secondary index.
+
+        This test case checks that an index stays in sync with addPart, deletePart and attribute changes.
+        """
+        resistor = Resistor(sku=1, last_updated=datetime.now(), resistance=100, tolerance=5)
+        other = Resistor(sku=2, last_updated=datetime.now(), resistance=220, tolerance=5)
+        self.inventory_manager.addPart(resistor)
+        self.inventory_manager.createIndex(Resistor, "resistance")
+        self.inventory_manager.addPart(other)
+
+        self.assertEqual(self.inventory_manager.search(Resistor, resistance=100), [resistor])
+        self.assertEqual(self.inventory_manager.search(Resistor, resistance=220, tolerance=5), [other])
+
+        # Mutating an indexed attribute moves the part to its new bucket
+        resistor.resistance = 220
+        self.assertEqual(self.inventory_manager.search(Resistor, resistance=100), [])
+        self.assertCountEqual(self.inventory_manager.search(Resistor, resistance=220), [resistor, other])
+
+        self.inventory_manager.deletePart(2)
+        self.assertEqual(self.inventory_manager.search(Resistor, resistance=220), [resistor])
+
+        # Changes to a deleted part no longer reach the index
+        other.resistance = 100
+        self.assertEqual(self.inventory_manager.search(Resistor, resistance=100), [])
+
+    def testRangeSearch(self):
+        """
+        Test searching for parts with comparison criteria.
+
+        This test case checks range queries both with and without a sorted index on the attribute.
+        """
+        for sku, resistance in enumerate([47, 90, 100, 110, 220], start=1):
+            self.inventory_manager.addPart(Resistor(sku=sku, last_updated=datetime.now(), resistance=resistance, tolerance=sku))
+        wire = Wire(sku=10, last_updated=datetime.now(), gauge=20, length=150)
+        self.inventory_manager.addPart(wire)
+        self.inventory_manager.addPart(Wire(sku=11, last_updated=datetime.now(), gauge=24, length=200))
+
+        def resistances(**criteria):
+            return sorted(part.resistance for part in self.inventory_manager.search(Resistor, **criteria))
+
+        for indexed in (False, True):
+            if indexed:
+                self.inventory_manager.createSortedIndex(Resistor, "resistance")
+                self.inventory_manager.createSortedIndex(Wire, "length")
+            self.assertEqual(resistances(resistance__between=(90, 110)), [90, 100, 110])
+            self.assertEqual(resistances(resistance__between=(90, 110), tolerance__lte=3), [90, 100])
+            self.assertEqual(resistances(resistance__gt=100), [110, 220])
+            self.assertEqual(resistances(resistance__lt=90), [47])
+            self.assertEqual(resistances(resistance__ne=100), [47, 90, 110, 220])
+            self.assertEqual(self.inventory_manager.search(Wire, gauge__between=(18, 22), length__gte=120), [wire])
+
+        # Sorted indexes follow deletions and attribute changes
+        self.inventory_manager.deletePart(3)
+        self.inventory_manager.getPart(5).resistance = 95
+        self.assertEqual(resistances(resistance__between=(90, 110)), [90, 95, 110])
+
+        with self.assertRaises(ValueError):
+            self.inventory_manager.search(Resistor, resistance__near=100)
+
+    def testCompactPartStorage(self):
+        """
+        Test the compact slotted storage of parts.
+
+        This test case checks that parts have no per-instance dictionary and that the SKU and timestamp
+        accessors share a single stored value.
+        """
+        wire = Wire(sku=7, last_updated=datetime(2024, 6, 1), gauge=20, length=150)
+        self.assertFalse(hasattr(wire, "__dict__"))
+        self.assertEqual(wire.sku, wire.getSku())
+        wire.setSku(9)
+        self.assertEqual((wire.sku, wire.getSku()), (9, 9))
+
+        self.inventory_manager.addPart(wire)
+        self.inventory_manager.addInventory(9, 3)
+        self.assertIs(wire.getLastUpdated(), wire.last_updated)
+        self.assertGreater(wire.getLastUpdated(), datetime(2024, 6, 1))
+
+    def testQueryEngine(self):
+        """
+        Test batch searches through the query engine.
+
+        This test case checks that the engine agrees with search and follows later changes to the inventory.
+        """
+        for sku in range(1, 21):
+            self.inventory_manager.addPart(Resistor(sku=sku, last_updated=datetime.now(), resistance=sku * 10, tolerance=sku % 3))
+        cable = EthernetCable(sku=30, last_updated=datetime.now(), alpha_type=EthernetAlphaType.MALE, beta_type=EthernetBetaType.FEMALE, speed=EthernetSpeed._1GBPS, length=36)
+        self.inventory_manager.addPart(cable)
+        engine = QueryEngine(self.inventory_manager)
+
+        queries = [
+            (Resistor, {"resistance__between": (50, 120), "tolerance": 1}),
+            (Resistor, {"resistance__gt": 150}),
+            (EthernetCable, {"speed": EthernetSpeed._1GBPS}),
+            (Part, {"length__gte": 12}),
+            (Part, {"length__ne": 12}),
+        ]
+        expected = [[part.sku for part in self.inventory_manager.search(cls, **criteria)] for cls, criteria in queries]
+        self.assertEqual(engine.searchMany(queries), expected)
+
+        # The snapshot follows additions, deletions and attribute changes
+        self.inventory_manager.deletePart(10)
+        self.inventory_manager.getPart(5).tolerance = 1
+        self.inventory_manager.addPart(Resistor(sku=40, last_updated=datetime.now(), resistance=100, tolerance=1))
+        self.assertEqual(engine.search(Resistor, resistance__between=(50, 120), tolerance=1), [5, 7, 40])
+        engine.close()
+
+    def testBatchOperations(self):
+        """
+        Test adding parts, adding inventory and deleting parts in batches.
+
+        This test case checks that valid lines are applied, invalid lines are reported and indexes stay in sync.
+        """
+        self.inventory_manager.createSortedIndex(Resistor, "resistance")
+        parts = [Resistor(sku=sku, last_updated=datetime.now(), resistance=sku * 100, tolerance=5) for sku in range(1, 6)]
+        failures = self.inventory_manager.addParts(parts + ["not a part"])
+        self.assertEqual(failures, [(5, None, "Invalid part.")])
+        self.assertEqual(len(self.inventory_manager.search(Resistor, resistance__gte=300)), 3)
+
+        failures = self.inventory_manager.addInventoryBatch([(1, 10), (2, 5), (9, 1), (1, 2), (3, "x")])
+        self.assertEqual([position for position, sku, message in failures], [2, 4])
+        self.assertEqual(self.inventory_manager.getQuantity(1), 12)
+        self.assertEqual(self.inventory_manager.getQuantity(3), 0)
+        self.assertIs(parts[0].getLastUpdated(), parts[1].getLastUpdated())
+
+        failures = self.inventory_manager.deleteParts([4, 5, 6])
+        self.assertEqual(failures, [(2, 6, "Error, Part not found in inventory.")])
+        self.assertEqual(self.inventory_manager.search(Resistor, resistance__gte=300), [parts[2]])
+
+    def testJournalRecovery(self):
+        """
+        Test persisting the inventory through the write-ahead log and snapshots.
+
+        This test case checks that a new manager recovers the snapshot plus the log tail, including color changes
+        (whose derived rgb values are not logged), and that a torn record at the end of the log is discarded.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            journal = InventoryJournal(self.inventory_manager, directory, groupCommitSize=2)
+            self.inventory_manager.addPart(Resistor(sku=1, last_updated=datetime.now(), resistance=100, tolerance=5))
+            self.inventory_manager.addPart(EthernetCable(sku=2, last_updated=datetime.now(), alpha_type=EthernetAlphaType.MALE, beta_type=EthernetBetaType.FEMALE, speed=EthernetSpeed._1GBPS, length=36))
+            self.inventory_manager.addInventory(1, 10)
+            journal.checkpoint()
+            self.inventory_manager.addInventory(2, 4)
+            self.inventory_manager.addPart(DisplayCable(sku=3, last_updated=datetime.now(), cable_type=DisplayType.HDMI, length=72.0, color="#1a1a1a"))
+            self.inventory_manager.getPart(3).color = "#000000"
+            self.inventory_manager.deletePart(1)
+            journal.close()
+
+            with open(os.path.join(directory, "inventory.wal"), "ab") as wal:
+                wal.write(b"\x10\x00\x00\x00torn")
+
+            recovered = InventoryManager()
+            InventoryJournal(recovered, directory).close()
+            self.assertEqual(sorted(recovered.getInventory()), [2, 3])
+            self.assertEqual(recovered.getQuantity(2), 4)
+            self.assertEqual(recovered.getPart(2).speed, EthernetSpeed._1GBPS)
+            self.assertEqual((recovered.getPart(3).color, recovered.getPart(3).rgb), ("#000000", 0))
+
+            # A group that never fills up is still synced once it is groupCommitInterval seconds old
+            journal = InventoryJournal(recovered, directory, groupCommitSize=100, groupCommitInterval=0.05)
+            size = os.path.getsize(os.path.join(directory, "inventory.wal"))
+            recovered.addInventory(2, 1)
+            for _ in range(100):
+                if os.path.getsize(os.path.join(directory, "inventory.wal")) > size:
+                    break
+                time.sleep(0.01)
+            self.assertGreater(os.path.getsize(os.path.join(directory, "inventory.wal")), size)
+            journal.close()
+
+    def testMappedSnapshot(self):
+        """
+        Test reading the inventory through a memory-mapped snapshot.
+
+        This test case checks that getPart, getQuantity and search on the snapshot match the original inventory,
+        and that searches on attributes the snapshot does not store and parts without integer SKUs are rejected.
+        """
+        resistor = Resistor(sku=5, last_updated=datetime.now(), resistance=100, tolerance=5)
+        cable = DisplayCable(sku=2, last_updated=datetime.now(), cable_type=DisplayType.VGA, length=48.5, color="#fff")
+        self.inventory_manager.addParts([resistor, cable, Resistor(sku=9, last_updated=datetime.now(), resistance=220, tolerance=1)])
+        self.inventory_manager.addInventory(5, 12)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "inventory.map")
+            writeMappedSnapshot(self.inventory_manager, path)
+            mapped = MappedInventory(path)
+            try:
+                self.assertEqual(list(mapped.getInventory()), [2, 5, 9])
+                self.assertEqual(mapped.getQuantity(5), 12)
+                self.assertEqual(mapped.getPart(2).color, "#fff")
+                self.assertEqual(mapped.getPart(2).cable_type, DisplayType.VGA)
+                self.assertEqual(mapped.getPart(5).getLastUpdated(), resistor.getLastUpdated())
+                self.assertEqual([part.sku for part in mapped.search(Resistor, resistance__lt=200, tolerance=5)], [5])
+                self.assertEqual([part.sku for part in mapped.search(Part, length__gte=10)], [2])
+                with self.assertRaises(ValueError):
+                    mapped.search(DisplayCable, rgb=0xFFFFFF)  # Derived, not stored
+                with self.assertRaises(ValueError):
+                    mapped.getPart(3)
+                with self.assertRaises(ValueError):
+                    mapped.deletePart(5)
+            finally:
+                mapped.close()
+
+            self.inventory_manager.addPart(Resistor(sku="R1", last_updated=datetime.now(), resistance=100, tolerance=5))
+            with self.assertRaises(ValueError):
+                writeMappedSnapshot(self.inventory_manager, path)
+
+    def testImportExport(self):
+        """
+        Test streaming parts in from CSV and back out as JSONL.
+
+        This test case checks that valid rows are imported in chunks, bad rows are reported and exports round-trip.
+        """
+        source = io.StringIO(
+            "type,sku,quantity,resistance,tolerance,cable_type,length,color,alpha_type,beta_type,speed\n"
+            "Resistor,1,10,100,5,,,,,,\n"
+            "Display Cable,2,1,,,HDMI,72,#1a1a1a,,,\n"
+            "Display Cable,3,1,,,HDMI,72,blue,,,\n"
+            "Ethernet Cable,4,,,,,36,,MALE,female,1gbps\n"
+            "Ethernet Cable,5,,,,,36,,MALE,female,2gbps\n"
+        )
+        imported, error_count, errors = importParts(self.inventory_manager, source, chunkSize=2)
+        self.assertEqual((imported, error_count), (3, 2))
+        self.assertEqual([line_number for line_number, message in errors], [4, 6])
+        self.assertEqual(self.inventory_manager.getQuantity(1), 10)
+        self.assertEqual(self.inventory_manager.getPart(4).speed, EthernetSpeed._1GBPS)
+
+        out = io.StringIO()
+        self.assertEqual(exportParts(self.inventory_manager, out, format="jsonl"), 3)
+        copy = InventoryManager()
+        out.seek(0)
+        self.assertEqual(importParts(copy, out, format="jsonl"), (3, 0, []))
+        self.assertEqual(copy.getPart(2).color, "#1a1a1a")
+        self.assertEqual(copy.getPart(1).getLastUpdated(), self.inventory_manager.getPart(1).getLastUpdated())
+
+    def testConcurrentInventory(self):
+        """
+        Test updating and scanning a concurrent inventory from several threads.
+
+        This test case checks that no quantity update is lost and that scans run safely during adds and deletes.
+        """
+        manager = ConcurrentInventoryManager()
+        manager.addParts([Resistor(sku=sku, last_updated=datetime.now(), resistance=100, tolerance=5) for sku in range(4)])
+        errors = []
+
+        def restock():
+            for count in range(2000):
+                manager.addInventory(count % 4, 1)
+
+        def churn(start):
+            try:
+                for sku in range(start, start + 300):
+                    manager.addPart(Resistor(sku=sku, last_updated=datetime.now(), resistance=220, tolerance=5))
+                    manager.search(Resistor, tolerance=5)
+                    manager.deletePart(sku)
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=restock) for _ in range(4)] + [threading.Thread(target=churn, args=(start,)) for start in (100, 400)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(sum(manager.getQuantity(sku) for sku in range(4)), 8000)
+        self.assertEqual(len(manager.getInventory()), 4)
+
+    def testInventoryServer(self):
+        """
+        Test the JSON Lines inventory server with pipelined requests.
+
+        This test case checks that pipelined requests are answered in order and that errors, including malformed
+        parts, are reported per request without dropping the connection.
+        """
+        async def exchange():
+            server = InventoryServer()
+            listener = await server.start("127.0.0.1", 0)
+            reader, writer = await asyncio.open_connection("127.0.0.1", listener.sockets[0].getsockname()[1])
+            requests = [
+                {"id": 1, "op": "addPart", "part": {"type": "Ethernet Cable", "sku": 7, "alpha_type": "male", "beta_type": "female", "speed": "1gbps", "length": 36}},
+                {"id": 2, "op": "addInventory", "sku": 7, "quantity": 3},
+                {"id": 3, "op": "search", "type": "EthernetCable", "criteria": {"speed": "1gbps", "length__gte": "24"}},
+                {"id": 4, "op": "getQuantity", "sku": 8},
+                {"id": 5, "op": "deletePart", "sku": 7},
+                {"id": 6, "op": "view"},
+                {"id": 7, "op": "addPart", "part": [1]},
+                {"id": 8, "op": "addPart", "part": {"type": "Resistor", "sku": "x"}},
+                {"id": 9, "op": "getQuantity", "sku": 7},
+            ]
+            writer.write("".join(json.dumps(request) + "\n" for request in requests).encode())
+            await writer.drain()
+            responses = [json.loads(await reader.readline()) for _ in requests]
+            writer.close()
+            listener.close()
+            await listener.wait_closed()
+            server.close()
+            return responses
+
+        responses = asyncio.run(exchange())
+        self.assertEqual([response["id"] for response in responses], [1, 2, 3, 4, 5, 6, 7, 8, 9])
+        self.assertEqual([response["ok"] for response in responses], [True, True, True, False, True, True, False, False, False])
+        self.assertEqual(responses[2]["result"][0]["quantity"], 3)
+        self.assertEqual(responses[3]["error"], "Part not found in inventory.")
+        self.assertEqual(responses[5]["result"], [])
+
+    def testShardedInventory(self):
+        """
+        Test routing and fan-out in a sharded inventory.
+
+        This test case checks that point operations reach the owning shard, that searches merge every shard's
+        matches and that batch failures keep their positions in the batch.
+        """
+        manager = ShardedInventoryManager(shardCount=3)
+        try:
+            manager.addParts([Resistor(sku=sku, last_updated=datetime.now(), resistance=100 if sku % 2 else 220, tolerance=5) for sku in range(10)])
+            manager.addInventory(3, 7)
+            self.assertEqual(manager.getQuantity(3), 7)
+            self.assertEqual(manager.getPart(4).resistance, 220)
+            self.assertEqual(sorted(part.sku for part in manager.search(Resistor, resistance=100)), [1, 3, 5, 7, 9])
+            self.assertEqual(manager.addInventoryBatch([(1, 2), (42, 1), (2, 3)]), [(1, 42, "Part not found in inventory.")])
+            self.assertEqual(manager.deleteParts([0, 42, 5]), [(1, 42, "Error, Part not found in inventory.")])
+            with self.assertRaises(ValueError):
+                manager.getPart(0)
+            with self.assertRaises(ValueError):
+                manager.search(Resistor, resistance__near=100)
+            self.assertEqual(sorted(manager.getInventory()), [1, 2, 3, 4, 6, 7, 8, 9])
+            self.assertEqual(manager.getQuantity(2), 3)
+
+            # A fan-out that fails after some sends leaves replies in the pipes; later calls must skip them
+            with self.assertRaises(Exception):
+                manager._fanOut({0: ("getInventory", ()), 1: ("getInventory", ()), 2: ("search", (Resistor, {"resistance": lambda: 0}))})
+            self.assertEqual(manager.getQuantity(3), 7)
+            self.assertEqual(len(manager.getInventory()), 8)
+        finally:
+            manager.close()
+
+    def testSearchCache(self):
+        """
+        Test caching search results and invalidating them precisely.
+
+        This test case checks that repeated searches are served from the cache, that quantity changes do not
+        evict attribute searches, and that adds, deletes and attribute changes evict the affected searches only.
+        """
+        self.inventory_manager.addPart(Resistor(sku=1, last_updated=datetime.now(), resistance=100, tolerance=5))
+        self.inventory_manager.addPart(Solder(sku=4, last_updated=datetime.now(), solder_type=SolderType.LEAD_FREE, length=100))
+        cache = self.inventory_manager.enableSearchCache(maxSize=2)
+        self.assertEqual(len(self.inventory_manager.search(Resistor, resistance=100)), 1)
+        self.assertEqual(len(self.inventory_manager.search(Solder, solder_type=SolderType.LEAD_FREE)), 1)
+        self.inventory_manager.addInventory(1, 5)
+        self.assertEqual(self.inventory_manager.search(Resistor, resistance=100)[0].quantity, 5)
+        self.assertEqual(cache.stats()["hits"], 1)
+
+        self.inventory_manager.addPart(Resistor(sku=5, last_updated=datetime.now(), resistance=100, tolerance=1))
+        self.assertEqual(len(self.inventory_manager.search(Solder, solder_type=SolderType.LEAD_FREE)), 1)
+        self.assertEqual(len(self.inventory_manager.search(Resistor, resistance=100)), 2)
+        self.inventory_manager.getPart(5).resistance = 220
+        self.assertEqual(len(self.inventory_manager.search(Resistor, resistance=100)), 1)
+        self.inventory_manager.search(Resistor, tolerance=5)
+
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["invalidations"], stats["evictions"]), (2, 5, 2, 1))
+        self.inventory_manager.disableSearchCache()
+        self.assertEqual(self.inventory_manager.listeners, [])
+
+    def testPartTypeRegistry(self):
+        """
+        Test looking up part types and converting text input with their field schemas.
+
+        This test case checks that text criteria are converted to the field types, so a search for
+        resistance "100" matches a resistor of 100 ohms.
+        """
+        self.inventory_manager.addPart(Resistor(sku=1, last_updated=datetime.now(), resistance=100, tolerance=5))
+        self.inventory_manager.addPart(DisplayCable(sku=2, last_updated=datetime.now(), cable_type=DisplayType.MICRO_HDMI, length=36, color="#000000"))
+        resistor = lookupPartType("resistor")
+        self.assertIs(resistor.part_class, Resistor)
+        self.assertEqual([field.name for field in resistor.fields], ["resistance", "tolerance"])
+        self.assertEqual(self.inventory_manager.search(Resistor, **resistor.coerceCriteria({"resistance": "100"}))[0].getSku(), 1)
+
+        cable = lookupPartType("Display Cable")
+        self.assertIs(lookupPartType("DisplayCable"), cable)
+        criteria = cable.coerceCriteria({"cable_type": "micro hdmi", "length__between": ("24", "48")})
+        self.assertEqual(criteria, {"cable_type": DisplayType.MICRO_HDMI, "length__between": (24.0, 48.0)})
+        self.assertEqual(len(self.inventory_manager.search(DisplayCable, **criteria)), 1)
+
+        with self.assertRaises(ValueError):
+            lookupPartType("Capacitor")
+        with self.assertRaises(ValueError):
+            resistor.coerceCriteria({"tolerance": "five"})
+        with self.assertRaises(ValueError):
+            resistor.coerceCriteria({"resistance__between": "90"})
+
+    def testBenchmarkSuite(self):
+        """
+        Test a small benchmark run and regression detection.
+
+        This test case checks that the synthetic catalog is reproducible and covers every part class, that every
+        hot path is reported and that a slowdown beyond the threshold is flagged.
+        """
+        parts = list(generateParts(10, seed=3))
+        self.assertEqual({type(part) for part in parts}, {Resistor, Solder, Wire, DisplayCable, EthernetCable})
+        self.assertEqual([part.getLastUpdated() for part in generateParts(10, seed=3)], [part.getLastUpdated() for part in parts])
+
+        suite = runSuite(sizes=[200], operations=50, searches=2, isolate=False)
+        result = suite["results"][0]
+        for operation in ("addPart", "getPart", "getQuantity", "addInventory", "search_selective", "search_unselective", "getInventory_iterate", "deletePart"):
+            self.assertGreater(result[operation]["ops_per_second"], 0)
+        self.assertGreater(result["peak_rss_mb"], 0)
+
+        slower = json.loads(json.dumps(suite))
+        slower["results"][0]["getPart"]["ops_per_second"] /= 2
+        self.assertEqual(compareResults(suite, suite), [])
+        self.assertEqual([regression[:3] for regression in compareResults(suite, slower)], [(200, "getPart", "ops_per_second")])
+        noisy = json.loads(json.dumps(suite))
+        noisy["results"][0]["search_selective"]["p99_us"] *= 10  # Only 2 samples: the p99 is not compared
+        self.assertEqual(compareResults(suite, noisy), [])
+
+    def testInstrumentation(self):
+        """
+        Test operation metrics, hooks, the text export and switching instrumentation off.
+
+        This test case checks that calls, errors and search scan counts are recorded while instrumentation is
+        enabled and that the manager's own methods are restored when it is disabled.
+        """
+        instrumentation = self.inventory_manager.enableInstrumentation()
+        calls = []
+        instrumentation.addHook(lambda operation, seconds, error: calls.append((operation, error)))
+        for sku in range(4):
+            self.inventory_manager.addPart(Resistor(sku=sku, last_updated=datetime.now(), resistance=100 * (sku % 2 + 1), tolerance=5))
+        self.inventory_manager.search(Resistor, resistance=100)
+        with self.assertRaises(ValueError):
+            self.inventory_manager.getPart(9)
+
+        stats = instrumentation.stats()
+        self.assertEqual(stats["operations"]["addPart"]["calls"], 4)
+        self.assertEqual(stats["operations"]["getPart"]["errors"], 1)
+        self.assertEqual(stats["searches"]["Resistor"], {"searches": 1, "scanned": 4, "matched": 2})
+        self.assertEqual(calls[-2:], [("search", False), ("getPart", True)])
+        text = instrumentation.exportText()
+        self.assertIn('inventory_operation_calls_total{operation="addPart"} 4', text)
+        self.assertIn('inventory_operation_seconds_count{operation="search"} 1', text)
+        self.assertIn('inventory_search_matched_total{part_class="Resistor"} 2', text)
+        self.assertIn("inventory_parts 4", text)
+
+        instrumentation.startProfiler(interval=0.001)
+        self.assertTrue(instrumentation.profiling)
+        self.inventory_manager.disableInstrumentation()
+        self.assertFalse(instrumentation.profiling)
+        self.assertNotIn("addPart", vars(self.inventory_manager))
+        self.inventory_manager.search(Resistor, resistance=100)
+        self.assertEqual(instrumentation.stats()["searches"]["Resistor"]["searches"], 1)
+
+    def testStockWatch(self):
+        """
+        Test reorder thresholds, the low-stock list and threshold crossing notifications.
+
+        This test case checks that SKU thresholds override class thresholds, that the low-stock list follows
+        quantity changes and deletions, and that subscribers hear about each crossing once, including the deletion
+        of a low-stock part.
+        """
+        for sku in range(4):
+            self.inventory_manager.addPart(Resistor(sku=sku, last_updated=datetime.now(), resistance=100, tolerance=5))
+            self.inventory_manager.addInventory(sku, 10 * sku)
+        watch = self.inventory_manager.enableStockWatch()
+        crossings = []
+        watch.subscribe(lambda part, threshold, below: crossings.append((part.getSku(), threshold, below)))
+        watch.setClassThreshold(Resistor, 15)
+        watch.setThreshold(3, 40)
+        self.assertEqual([part.getSku() for part in watch.belowThreshold()], [0, 3, 1])
+
+        self.inventory_manager.addInventory(1, 10)
+        self.inventory_manager.addInventory(2, -5)
+        self.inventory_manager.addInventory(2, -1)
+        self.inventory_manager.deletePart(0)
+        self.assertEqual([part.getSku() for part in watch.belowThreshold()], [3, 2])
+        self.assertEqual(crossings, [(0, 15, True), (1, 15, True), (3, 40, True), (1, 15, False), (2, 15, True), (0, 15, False)])
+        self.inventory_manager.deletePart(1)  # Not below its threshold: nothing to report
+        self.assertEqual(len(crossings), 6)
+
+        for count in range(200):
+            self.inventory_manager.addInventory(3, 1 if count % 2 else -1)
+        self.assertLess(len(watch._heap), 2 * len(watch._watched) + 65)
+        self.assertEqual(watch.thresholdFor(self.inventory_manager.getPart(3)), 40)
+
+    def testChangeFeed(self):
+        """
+        Test pulling compact deltas and tombstones from the change feed.
+
+        This test case checks that each changed SKU appears once per delta, that deletes leave tombstones, that
+        the time index finds recent updates and that cursors older than the retained history are rejected.
+        """
+        self.inventory_manager.addPart(Resistor(sku=1, last_updated=datetime(2024, 1, 1), resistance=100, tolerance=5))
+        feed = self.inventory_manager.enableChangeFeed(maxEntries=4)
+        cursor = feed.lastSeq
+        self.inventory_manager.addPart(Resistor(sku=2, last_updated=datetime(2024, 1, 2), resistance=220, tolerance=5))
+        for _ in range(3):
+            self.inventory_manager.addInventory(1, 2)
+        self.inventory_manager.deletePart(2)
+        changes, cursor = feed.changesSince(cursor)
+        self.assertEqual([(sku, part) for _, sku, part in changes], [(1, self.inventory_manager.getPart(1)), (2, None)])
+        self.assertEqual(cursor, feed.lastSeq)
+        self.assertEqual(feed.changesSince(cursor), ([], cursor))
+
+        self.assertEqual([part.getSku() for part in feed.updatedSince(datetime(2024, 6, 1))], [1])
+        for sku in range(3, 7):
+            self.inventory_manager.addPart(Resistor(sku=sku, last_updated=datetime.now(), resistance=100, tolerance=5))
+        changes, _ = feed.changesSince(cursor, limit=2)
+        self.assertEqual([sku for _, sku, _ in changes], [3, 4])
+        self.assertEqual(feed.horizon, cursor)
+        with self.assertRaises(ValueError):
+            feed.changesSince(0)
+
+    def testTransactions(self):
+        """
+        Test reserving, committing and releasing stock across several SKUs.
+
+        This test case checks that transactions apply all-or-nothing, that quantities and reservations never go
+        negative, that stale transactions conflict, that concurrent pick lists never oversell and that deletes and
+        direct quantity changes keep reservations consistent.
+        """
+        manager = ConcurrentInventoryManager()
+        for sku in range(3):
+            manager.addPart(Resistor(sku=sku, last_updated=datetime.now(), resistance=100, tolerance=5))
+            manager.addInventory(sku, 10)
+        manager.transaction().reserve(0, 4).reserve(1, 4).execute()
+        ledger = manager.stockLedger
+        self.assertEqual((ledger.available(0), ledger.reserved(0), manager.getQuantity(0)), (6, 4, 10))
+
+        with self.assertRaises(ValueError):
+            manager.transaction().reserve(2, 5).reserve(0, 7).execute()
+        self.assertEqual((ledger.available(0), ledger.available(2)), (6, 10))
+        with self.assertRaises(ValueError):
+            manager.transaction().release(2, 1).execute()
+
+        stale = manager.transaction().commit(0, 4)
+        manager.transaction().commit(0, 2).release(0, 2).execute()
+        with self.assertRaises(TransactionConflict):
+            stale.execute()
+        self.assertEqual((manager.getQuantity(0), ledger.reserved(0)), (8, 0))
+
+        sold = []
+
+        def pick():
+            for _ in range(50):
+                try:
+                    ledger.run(lambda transaction: transaction.reserve(1, 1).reserve(2, 1).commit(1, 1).commit(2, 1), retries=100)
+                    sold.append(1)
+                except TransactionConflict:
+                    pass
+                except ValueError:
+                    break
+
+        threads = [threading.Thread(target=pick) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(sold), 6)
+        self.assertEqual((manager.getQuantity(1), ledger.reserved(1), manager.getQuantity(2)), (4, 4, 4))
+
+        # Stock cannot be taken below its reservation, and deleting a part drops its reservation
+        with self.assertRaises(ValueError):
+            manager.addInventory(1, -1)
+        self.assertEqual(manager.addInventoryBatch([(1, -2), (2, -1)]), [(0, 1, "Error, Part 1 has 4 reserved.")])
+        self.assertEqual((manager.getQuantity(1), manager.getQuantity(2)), (4, 3))
+        stale = manager.transaction().release(1, 4)
+        manager.deletePart(1)
+        manager.addPart(Resistor(sku=1, last_updated=datetime.now(), resistance=100, tolerance=5))
+        self.assertEqual((ledger.reserved(1), ledger.available(1)), (0, 0))
+        with self.assertRaises(TransactionConflict):
+            stale.execute()
+        manager.transaction().reserve(0, 8).execute()
+        manager.getPart(0).quantity = 5
+        self.assertEqual((ledger.reserved(0), ledger.available(0)), (5, 0))
+        self.assertIs(ledger._stripes, manager.stripes())
+
+    def testPaginatedListing(self):
+        """
+        Test listing the inventory one page at a time.
+
+        This test case checks that pages follow the requested order, that cursors stay valid while the inventory
+        changes between pages and that the listing can be filtered by part class and streamed.
+        """
+        manager = InventoryManager()
+        for sku in range(10):
+            part = Resistor(sku=sku, last_updated=datetime(2024, 1, 1 + sku), resistance=100, tolerance=5) if sku % 2 else \
+                Wire(sku=sku, last_updated=datetime(2024, 1, 1 + sku), gauge=22.0, length=10.0)
+            manager.addPart(part)
+            manager.addInventory(sku, 10 - sku)
+
+        parts, cursor = manager.listParts(limit=4)
+        self.assertEqual([part.getSku() for part in parts], [0, 1, 2, 3])
+        manager.deletePart(4)
+        manager.addPart(Wire(sku=11, last_updated=datetime.now(), gauge=22.0, length=10.0))
+        parts, cursor = manager.listParts(after=cursor, limit=4)
+        self.assertEqual([part.getSku() for part in parts], [5, 6, 7, 8])
+        parts, cursor = manager.listParts(after=cursor, limit=4)
+        self.assertEqual([part.getSku() for part in parts], [9, 11])
+        self.assertIsNone(cursor)
+
+        parts, cursor = manager.listParts("quantity", part_class=Resistor, limit=2)
+        self.assertEqual([part.getSku() for part in parts], [9, 7])
+        parts, cursor = manager.listParts("last_updated", descending=True, limit=3)
+        self.assertEqual([part.getSku() for part in parts], [11, 9, 8])
+        self.assertEqual([part.getSku() for part in manager.iterParts("quantity", Wire, descending=True, pageSize=2)],
+                         [0, 2, 6, 8, 11])
+        with self.assertRaises(ValueError):
+            manager.listParts("resistance")
+        with self.assertRaises(ValueError):
+            manager.listParts(limit=0)
+
+    def testRollups(self):
+        """
+        Test declared aggregate rollups.
+
+        This test case checks that group totals, quantity × length sums and min/max quantities follow adds,
+        inventory changes, attribute changes and deletes, and match the totals of a full scan.
+        """
+        manager = InventoryManager()
+        manager.addPart(DisplayCable(sku=1, last_updated=datetime.now(), cable_type=DisplayType.HDMI, length=2.0, color="#ff0000"))
+        manager.addInventory(1, 5)
+        rollups = manager.enableRollups()
+        byType = rollups.declare("byType", DisplayCable, "cable_type")
+        decades = rollups.declare("decades", Resistor, lambda part: len(str(part.resistance)) - 1)
+        manager.addPart(DisplayCable(sku=2, last_updated=datetime.now(), cable_type=DisplayType.HDMI, length=3.0, color="#0000ff"))
+        manager.addPart(DisplayCable(sku=3, last_updated=datetime.now(), cable_type=DisplayType.VGA, length=1.0, color="#0000ff"))
+        manager.addPart(Resistor(sku=4, last_updated=datetime.now(), resistance=470, tolerance=5))
+        manager.addInventory(2, 7)
+        manager.addInventory(3, 4)
+        manager.addInventory(4, 100)
+        self.assertEqual(byType.get(DisplayType.HDMI),
+                         {"count": 2, "quantity": 12, "quantityLength": 31.0, "minQuantity": 5, "maxQuantity": 7})
+
+        manager.addInventory(1, -5)
+        manager.getPart(3).cable_type = DisplayType.HDMI
+        manager.deletePart(2)
+        self.assertEqual(byType.get(DisplayType.HDMI),
+                         {"count": 2, "quantity": 4, "quantityLength": 4.0, "minQuantity": 0, "maxQuantity": 4})
+        self.assertEqual(byType.get(DisplayType.VGA)["count"], 0)
+        self.assertEqual(decades.groups(), {2: {"count": 1, "quantity": 100, "quantityLength": 0.0, "minQuantity": 100, "maxQuantity": 100}})
+        scanned = sum(part.quantity for part in manager.getInventory().values() if isinstance(part, DisplayCable))
+        self.assertEqual(sum(totals["quantity"] for totals in byType.groups().values()), scanned)
+
+        # quantity × length does not drift under many small changes
+        wires = manager.enableRollups().declare("wire", Wire)
+        for sku, length in [(50, 0.1), (51, 0.2), (52, 0.3)]:
+            manager.addPart(Wire(sku=sku, last_updated=datetime.now(), gauge=22, length=length))
+        for count in range(1000):
+            sku = 50 + count % 3
+            manager.addInventory(sku, max((count * 7919) % 61 - 20, -manager.getQuantity(sku)))
+        expected = float(sum(Fraction(part.length) * part.quantity for part in manager.getInventory().values() if isinstance(part, Wire)))
+        self.assertEqual(wires.get()["quantityLength"], expected)
+
+    def testSqliteInventory(self):
+        """
+        Test the SQLite inventory backend through the InventoryManager interface.
+
+        This test case checks that parts keep their fields across a reopen, that searches translated to SQL match
+        the in-memory search, and that batches, replacements, paging and deletes behave as in InventoryManager.
+        """
+        memory = InventoryManager()
+        parts = list(generateParts(50, seed=1))
+        memory.addParts(parts)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "inventory.db")
+            manager = SqliteInventoryManager(path)
+            self.assertEqual(manager.addParts(parts + ["bad"]), [(50, None, "Invalid part.")])
+            manager.close()
+            manager = SqliteInventoryManager(path)
+            try:
+                self.assertEqual(manager.connection.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+                cable = manager.getPart(3)
+                self.assertEqual((cable.cable_type, cable.color, cable.quantity, cable.getLastUpdated()),
+                                 (parts[3].cable_type, parts[3].color, parts[3].quantity, parts[3].getLastUpdated()))
+                for part_class, criteria in ((EthernetCable, {"speed__ne": EthernetSpeed._1GBPS}), (Part, {"quantity__between": (100, 500)}),
+                                             (Wire, {"gauge": 22.0, "length__gte": 36.0}), (Resistor, {"length": 6.0})):
+                    self.assertEqual(sorted(part.getSku() for part in manager.search(part_class, **criteria)),
+                                     sorted(part.getSku() for part in memory.search(part_class, **criteria)))
+
+                manager.addInventory(0, 5)
+                self.assertEqual(manager.getQuantity(0), parts[0].quantity + 5)
+                self.assertEqual(manager.addInventoryBatch([(1, 2), (99, 1), (1, 3)]), [(1, 99, "Part not found in inventory.")])
+                self.assertEqual(manager.getQuantity(1), parts[1].quantity + 5)
+                manager.addPart(Wire(sku=4, last_updated=datetime.now(), gauge=10.0, length=1.0))
+                self.assertEqual(manager.search(EthernetCable, sku=4), [])
+                pages, cursor = manager.listParts("quantity", part_class=Wire, limit=4)
+                self.assertEqual([part.getSku() for part in pages],
+                                 [part.getSku() for part in sorted(manager.search(Wire), key=lambda part: (part.quantity, part.getSku()))][:4])
+                self.assertEqual(len(list(manager.iterParts(pageSize=7))), 50)
+                self.assertEqual(manager.deleteParts([4, 4, 98]), [(1, 4, "Error, Part not found in inventory."), (2, 98, "Error, Part not found in inventory.")])
+                with self.assertRaises(ValueError):
+                    manager.getPart(4)
+                self.assertEqual(len(manager.getInventory()), 49)
+
+                manager.createIndex(Wire, "gauge")
+                manager.createSortedIndex(Wire, "length")
+                self.assertEqual(len(manager.search(Wire, gauge=22.0)), len(memory.search(Wire, gauge=22.0)))
+                manager.dropIndex(Wire, "gauge")
+                manager.dropSortedIndex(Wire, "length")
+                with self.assertRaises(ValueError):
+                    manager.dropIndex(Wire, "gauge")
+                with self.assertRaises(ValueError):
+                    manager.dropSortedIndex(Resistor, "length")
+            finally:
+                manager.close()
+
+    def testCompatibleCables(self):
+        """
+        Test the Ethernet cable compatibility query.
+
+        This test case checks that either cable orientation matches, that slower, shorter and out-of-stock
+        cables are left out, that results come shortest first and that the index follows later changes.
+        """
+        manager = InventoryManager()
+        cables = [(1, EthernetAlphaType.MALE, EthernetBetaType.FEMALE, EthernetSpeed._1GBPS, 48.0),
+                  (2, EthernetAlphaType.FEMALE, EthernetBetaType.MALE, EthernetSpeed._10GBPS, 24.0),
+                  (3, EthernetAlphaType.MALE, EthernetBetaType.FEMALE, EthernetSpeed._100MBPS, 12.0),
+                  (4, EthernetAlphaType.MALE, EthernetBetaType.MALE, EthernetSpeed._10GBPS, 36.0),
+                  (5, EthernetAlphaType.FEMALE, EthernetBetaType.MALE, EthernetSpeed._1GBPS, 6.0),
+                  (6, EthernetAlphaType.MALE, EthernetBetaType.FEMALE, EthernetSpeed._10GBPS, 30.0)]
+        for sku, alpha, beta, speed, length in cables:
+            manager.addPart(EthernetCable(sku=sku, last_updated=datetime.now(), alpha_type=alpha, beta_type=beta, speed=speed, length=length))
+            manager.addInventory(sku, 1 if sku != 6 else 0)
+
+        found = manager.compatibleCables("male", EthernetAlphaType.FEMALE, minSpeed=EthernetSpeed._1GBPS, minLength=10)
+        self.assertEqual([cable.getSku() for cable in found], [2, 1])
+        manager.addInventory(6, 2)
+        manager.addInventory(2, -1)
+        manager.getPart(5).length = 40.0
+        found = manager.compatibleCables(EthernetBetaType.FEMALE, EthernetBetaType.MALE, minSpeed=EthernetSpeed._1GBPS, minLength=10)
+        self.assertEqual([cable.getSku() for cable in found], [6, 5, 1])
+        self.assertEqual([cable.getSku() for cable in manager.compatibleCables("male", "female", limit=2)], [3, 6])
+        manager.deletePart(6)
+        self.assertEqual([cable.getSku() for cable in manager.compatibleCables("male", "male")], [4])
+        with self.assertRaises(ValueError):
+            manager.compatibleCables("male", "rj45")
+        with self.assertRaises(ValueError):
+            manager.compatibleCables("male", "female", minSpeed="1GBPS")
+
+    def testNearestColors(self):
+        """
+        Test packed RGB colors and the nearest-color query for display cables.
+
+        This test case checks that colors are normalized to packed integers, that the nearest cables are found per
+        display type with the length and stock filters applied, and that the index follows color changes and
+        deletes.
+        """
+        manager = InventoryManager()
+        self.assertEqual(DisplayCable(sku=0, last_updated=datetime.now(), cable_type=DisplayType.VGA, length=1.0, color="#1aF").rgb, 0x11AAFF)
+        colors = [(1, DisplayType.HDMI, 36.0, "#202020"), (2, DisplayType.HDMI, 6.0, "#1b1b1b"), (3, DisplayType.VGA, 36.0, "#1a1a1a"),
+                  (4, DisplayType.HDMI, 72.0, "#000"), (5, DisplayType.HDMI, 48.0, "#ffffff")]
+        for sku, kind, length, color in colors:
+            manager.addPart(DisplayCable(sku=sku, last_updated=datetime.now(), cable_type=kind, length=length, color=color))
+            manager.addInventory(sku, 1)
+        for sku in range(10, 400):  # Enough cables for the grid to be walked instead of scanned
+            manager.addPart(DisplayCable(sku=sku, last_updated=datetime.now(), cable_type=DisplayType.DISPLAYPORT, length=12.0, color="#%06x" % (sku * 40503)))
+
+        self.assertEqual([cable.getSku() for cable in manager.nearestColors("#1a1a1a", k=2, displayType=DisplayType.HDMI)], [2, 1])
+        self.assertEqual([cable.getSku() for cable in manager.nearestColors(0x1A1A1A, k=2, displayType=DisplayType.HDMI, minLength=12)], [1, 4])
+        self.assertEqual([cable.getSku() for cable in manager.nearestColors("#1a1a1a")], [3])
+        manager.createIndex(DisplayCable, "rgb")
+        self.assertEqual([cable.getSku() for cable in manager.search(DisplayCable, rgb=0xFFFFFF)], [5])
+        manager.addInventory(2, -1)
+        manager.getPart(5).color = "#191919"
+        manager.deletePart(3)
+        self.assertEqual([cable.getSku() for cable in manager.nearestColors("#1a1a1a", k=2)], [5, 1])
+        self.assertEqual(manager.search(DisplayCable, rgb=0xFFFFFF), [])
+        self.assertEqual([cable.getSku() for cable in manager.search(DisplayCable, rgb=0x191919)], [5])
+        self.assertEqual(len(manager.nearestColors("#808080", k=5, displayType=DisplayType.DISPLAYPORT, inStock=False)), 5)
+        with self.assertRaises(ValueError):
+            manager.nearestColors("1a1a1a")
+
+    def testResistorSolver(self):
+        """
+        Test the resistor series/parallel network solver.
+
+        This test case checks that the closest networks are found within the tolerance, that stocked quantities
+        and tolerances limit the networks used, that the results follow inventory changes that matter to them, and
+        that a concurrent inventory answers queries while other threads read it.
+        """
+        manager = InventoryManager()
+        for sku, resistance, tolerance, quantity in [(1, 100, 1, 2), (2, 47, 1, 1), (3, 220, 1, 1), (4, 1000, 5, 4), (5, 330, 1, 1)]:
+            manager.addPart(Resistor(sku=sku, last_updated=datetime.now(), resistance=resistance, tolerance=tolerance))
+            manager.addInventory(sku, quantity)
+
+        best = manager.solveResistance(147)[0]
+        self.assertEqual((best.expression, best.resistance, sorted(best.skus)), ("47 + 100", 147, [1, 2]))
+        best = manager.solveResistance(50, maxResistors=2)[0]
+        self.assertEqual((best.expression, sorted(best.skus)), ("100 || 100", [1, 1]))
+        self.assertEqual(manager.solveResistance(500, tolerance=1), [])  # 1000 || 1000 needs 5% parts
+        self.assertEqual(manager.solveResistance(500, tolerance=5)[0].expression, "1000 || 1000")
+        networks = manager.solveResistance(367, limit=3)
+        self.assertEqual(networks[0].expression, "47 + 100 + 220")
+        self.assertTrue(all(abs(network.error) <= 0.01 for network in networks))
+        self.assertEqual(manager.solveResistance(200)[0].expression, "100 + 100")
+        version = manager.resistorSolver.version
+        manager.addInventory(4, 3)  # Seven 1000 ohm resistors allow no more networks than four
+        self.assertEqual(manager.resistorSolver.version, version)
+        manager.addInventory(1, -1)  # A single 100 ohm resistor left
+        self.assertEqual(manager.resistorSolver.version, version + 1)
+        self.assertNotIn("100 + 100", [network.expression for network in manager.solveResistance(200)])
+        with self.assertRaises(ValueError):
+            manager.solveResistance(100, maxResistors=4)
+
+        concurrent = ConcurrentInventoryManager()
+        concurrent.addPart(Resistor(sku=1, last_updated=datetime.now(), resistance=100, tolerance=1))
+        concurrent.addInventory(1, 2)
+        concurrent.solveResistance(50)
+        expressions = []
+        with concurrent._lock.reading():  # Queries do not wait for readers to finish
+            worker = threading.Thread(target=lambda: expressions.append(concurrent.solveResistance(200)[0].expression))
+            worker.start()
+            worker.join(5)
+            self.assertEqual(expressions, ["100 + 100"])
+
+    def testCutPlanner(self):
+        """
+        Test the cut-list planner for wire and solder spools.
+
+        This test case checks that every piece is placed on a spool of the requested gauge or type with room for
+        it, that the exact mode finds the plan with the least waste, and that pieces that do not fit are
+        reported.
+        """
+        manager = InventoryManager()
+        manager.addPart(Wire(sku=1, last_updated=datetime.now(), gauge=22, length=100))
+        manager.addPart(Wire(sku=2, last_updated=datetime.now(), gauge=22, length=60))
+        manager.addPart(Wire(sku=3, last_updated=datetime.now(), gauge=18, length=1000))
+        manager.addPart(Solder(sku=4, last_updated=datetime.now(), solder_type=SolderType.LEAD_FREE, length=50))
+        manager.addInventory(1, 2)
+        manager.addInventory(2, 2)
+        manager.addInventory(3, 1)
+        manager.addInventory(4, 1)
+
+        pieces = {40: 2, 30: 3, 20: 2}
+        plan = manager.planCuts(pieces, gauge=22)
+        self.assertEqual(sorted(piece for spool in plan.spools for piece in spool.pieces), [20, 20, 30, 30, 30, 40, 40])
+        self.assertTrue(all(spool.sku in (1, 2) and sum(spool.pieces) <= spool.length for spool in plan.spools))
+        self.assertEqual(plan.unplaced, [])
+        exact = manager.planCuts(pieces, gauge=22, exact=True)
+        self.assertTrue(exact.optimal)
+        self.assertEqual(exact.waste, 10)  # 40 + 20 and 40 + 20 on the 60s, 30 + 30 + 30 on a 100
+        self.assertLessEqual(exact.waste, plan.waste)
+        plan = manager.planCuts([30, 30, 60], solderType=SolderType.LEAD_FREE, kerf=1)
+        self.assertEqual(([spool.pieces for spool in plan.spools], plan.unplaced), ([[30]], [60, 30]))
+        self.assertEqual(plan.spools[0].leftover, 20)
+        with self.assertRaises(ValueError):
+            manager.planCuts([10])
+
 if __name__ == '__main__':
     unittest.main()